@@ -0,0 +1,86 @@
+"""
+Content-addressed, compressed storage for raw page HTML.
+"""
+import gzip
+import hashlib
+import os
+from datetime import datetime
+
+def content_hash(data):
+    """SHA-256 hex digest of text or bytes."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+def compress(text, level=6):
+    """Gzip-compress text."""
+    return gzip.compress(text.encode('utf-8'), compresslevel=level)
+
+def decompress(data):
+    """Decompress gzip data back to text."""
+    return gzip.decompress(data).decode('utf-8')
+
+class MongoBlobStore:
+    """Blob store in a MongoDB collection, one document per distinct blob keyed by hash."""
+    
+    def __init__(self, collection):
+        """Initialize blob store on a collection."""
+        self.collection = collection
+    
+    def put(self, text):
+        """Store text if not already present and return its hash."""
+        digest = content_hash(text)
+        
+        # Identical pages share one blob
+        if self.collection.find_one({'_id': digest}, {'_id': 1}) is None:
+            data = compress(text)
+            self.collection.update_one(
+                {'_id': digest},
+                {'$setOnInsert': {
+                    'data': data,
+                    'size': len(text),
+                    'compressed_size': len(data),
+                    'stored_at': datetime.now()
+                }},
+                upsert=True
+            )
+        
+        return digest
+    
+    def get(self, digest):
+        """Get stored text by hash, or None."""
+        blob = self.collection.find_one({'_id': digest}, {'data': 1})
+        return decompress(blob['data']) if blob else None
+
+class FileBlobStore:
+    """Blob store of gzip files named by hash under a directory."""
+    
+    def __init__(self, directory):
+        """Initialize blob store in a directory."""
+        self.directory = directory
+    
+    def _path(self, digest):
+        """Path of a blob, fanned out by hash prefix."""
+        return os.path.join(self.directory, digest[:2], f'{digest}.gz')
+    
+    def put(self, text):
+        """Store text if not already present and return its hash."""
+        digest = content_hash(text)
+        path = self._path(digest)
+        
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f'{path}.{os.getpid()}.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(compress(text))
+            os.replace(temp_path, path)
+        
+        return digest
+    
+    def get(self, digest):
+        """Get stored text by hash, or None."""
+        path = self._path(digest)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return decompress(f.read())
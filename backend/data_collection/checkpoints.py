@@ -0,0 +1,121 @@
+"""
+Crawl checkpoints, so long crawls can resume after a crash or deploy.
+"""
+import json
+import os
+import time
+from datetime import datetime
+from . import config
+from .blob_store import content_hash
+
+class MongoCheckpointStore:
+    """Checkpoint store in a MongoDB collection, one document per checkpoint key."""
+    
+    def __init__(self, collection):
+        """Initialize checkpoint store on a collection."""
+        self.collection = collection
+    
+    def save(self, key, state):
+        """Save a checkpoint, replacing the previous one."""
+        self.collection.replace_one(
+            {'_id': key},
+            {'_id': key, 'state': state, 'saved_at': datetime.now()},
+            upsert=True
+        )
+    
+    def load(self, key):
+        """Get the last checkpoint state, or None."""
+        checkpoint = self.collection.find_one({'_id': key}, {'state': 1})
+        return checkpoint['state'] if checkpoint else None
+    
+    def delete(self, key):
+        """Remove a checkpoint."""
+        self.collection.delete_one({'_id': key})
+
+class FileCheckpointStore:
+    """Checkpoint store of JSON files named by key hash under a directory."""
+    
+    def __init__(self, directory):
+        """Initialize checkpoint store in a directory."""
+        self.directory = directory
+    
+    def _path(self, key):
+        """Path of a checkpoint file."""
+        return os.path.join(self.directory, f'{content_hash(key)}.json')
+    
+    def save(self, key, state):
+        """Save a checkpoint, replacing the previous one atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'state': state}, f)
+        os.replace(temp_path, path)
+    
+    def load(self, key):
+        """Get the last checkpoint state, or None."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['state']
+    
+    def delete(self, key):
+        """Remove a checkpoint."""
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+class CrawlCheckpoint:
+    """Periodic checkpoints of one crawl in a checkpoint store.
+    
+    The crawl saves its state after every collected page and otherwise every
+    config.CHECKPOINT_EVERY_FETCHES fetches or config.CHECKPOINT_SECONDS,
+    whichever comes first, and clears it when it finishes. With `resume`,
+    a crawl continues from the last saved state instead of starting over.
+    """
+    
+    def __init__(self, store, key, resume=False):
+        """Initialize checkpoint `key` in a store (MongoCheckpointStore or FileCheckpointStore)."""
+        self.store = store
+        self.key = key
+        self.resume = resume
+        self.fetches = 0
+        self.saved_at = time.monotonic()
+    
+    def load(self):
+        """Get the state to resume from, or None to start over."""
+        if not self.resume or self.store is None:
+            return None
+        try:
+            return self.store.load(self.key)
+        except Exception as e:
+            print(f"Error loading checkpoint {self.key}: {str(e)}")
+            return None
+    
+    def save(self, state):
+        """Save the crawl state now."""
+        if self.store is None:
+            return
+        try:
+            self.store.save(self.key, state)
+        except Exception as e:
+            print(f"Error saving checkpoint {self.key}: {str(e)}")
+        self.fetches = 0
+        self.saved_at = time.monotonic()
+    
+    def fetched(self, state, force=False):
+        """Count a fetch, saving `state()` when a checkpoint is due or forced."""
+        self.fetches += 1
+        if force or self.fetches >= config.CHECKPOINT_EVERY_FETCHES or \
+                time.monotonic() - self.saved_at >= config.CHECKPOINT_SECONDS:
+            self.save(state())
+    
+    def clear(self):
+        """Remove the checkpoint of a finished crawl."""
+        if self.store is None:
+            return
+        try:
+            self.store.delete(self.key)
+        except Exception as e:
+            print(f"Error clearing checkpoint {self.key}: {str(e)}")
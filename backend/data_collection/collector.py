@@ -1,92 +1,193 @@
 """
 Main data collector module that integrates all data collection components.
 """
+from collections import OrderedDict
 from . import config
 from .twitter_connector import TwitterConnector
 from .web_scraper import WebScraper
 from .content_processor import ContentProcessor
 from .database import Database
+from .search_index import ContentIndex
+from .checkpoints import CrawlCheckpoint
+from .twitter_scheduler import TwitterFetchScheduler
+from .tweet_archive import TweetArchive
 
 class DataCollector:
     """Main data collector that integrates all data collection components."""
     
-    def __init__(self):
-        """Initialize data collector."""
-        self.twitter = TwitterConnector()
+    def __init__(self, db=None):
+        """Initialize data collector, optionally on a different storage backend such as LocalDatabase."""
+        self.db = db or Database()
+        self.twitter = TwitterConnector(archive=TweetArchive(self.db))
         self.scraper = WebScraper()
-        self.processor = ContentProcessor()
-        self.db = Database()
+        self.processor = ContentProcessor(document_frequencies=self.db.document_frequencies)
+        self.indexes = OrderedDict()
+    
+    def get_content_index(self, user_id):
+        """Get the retrieval index for a user, keeping the config.MAX_OPEN_INDEXES most recently used open."""
+        if user_id in self.indexes:
+            self.indexes.move_to_end(user_id)
+            return self.indexes[user_id]
+        
+        # Indexes are flushed after every collection, so closing one loses nothing
+        while len(self.indexes) >= config.MAX_OPEN_INDEXES:
+            _, index = self.indexes.popitem(last=False)
+            index.close()
+        
+        self.indexes[user_id] = ContentIndex(user_id)
+        return self.indexes[user_id]
+    
+    def search_content(self, user_id, query, top_k=5):
+        """Search a user's collected content for passages relevant to a query."""
+        return self.get_content_index(user_id).search(query, top_k=top_k)
     
     def collect_twitter_data(self, username, user_id):
-        """Collect Twitter data for a user."""
-        print(f"Collecting Twitter data for {username}...")
-        
-        # Get user profile
-        profile = self.twitter.get_user_profile(username)
-        
-        if not profile:
-            print(f"Failed to get Twitter profile for {username}")
-            return False
-        
-        # Save profile to database
-        self.db.save_profile(profile, user_id)
-        
-        # Get user tweets
-        tweets = self.twitter.get_user_tweets(
-            username,
-            count=config.MAX_TWEETS,
-            days_back=config.MAX_CONTENT_AGE_DAYS
-        )
+        """Collect Twitter data for a user.
         
+        Returns False if the profile or timeline could not be fetched, and
+        True otherwise, also when there are no tweets in the window.
+        """
+        print(f"Collecting Twitter data for {username}...")
+        return self._collect_twitter_accounts({user_id: username})[user_id]
+    
+    def collect_twitter_data_for_users(self, accounts):
+        """Collect Twitter data for many users (user_id -> username), sharing the rate limit fairly.
+        
+        Timeline pages are interleaved across users, stalest users first,
+        and each user's tweets are saved as soon as their timeline is done.
+        Returns user_id -> success, as for collect_twitter_data.
+        """
+        print(f"Collecting Twitter data for {len(accounts)} users...")
+        return self._collect_twitter_accounts(accounts)
+    
+    def _collect_twitter_accounts(self, accounts):
+        """Collect the profiles and timelines of user_id -> username accounts."""
+        self.twitter.start_job()
+        
+        scheduler = TwitterFetchScheduler(self.twitter)
+        results = {}
+        for user_id, username in accounts.items():
+            # Staleness is the time of the last profile collection
+            last_collected = max(
+                (profile['collected_at'] for profile in self.db.get_profiles(user_id)
+                 if profile.get('platform') == 'twitter' and profile.get('collected_at')),
+                default=None
+            )
+            
+            # From the API, since the archive is refreshed from what is collected
+            profile = self.twitter.get_user_profile(username, use_archive=False)
+            if not profile:
+                print(f"Failed to get Twitter profile for {username}")
+                results[user_id] = False
+                continue
+            self.db.save_profile(profile, user_id)
+            
+            scheduler.add_user(username, key=user_id, last_collected=last_collected,
+                               count=config.MAX_TWEETS, days_back=config.MAX_CONTENT_AGE_DAYS)
+        
+        def store(user_id, tweets):
+            if user_id in scheduler.failed:
+                print(f"Failed to get tweets for {accounts[user_id]}")
+                results[user_id] = False
+            else:
+                results[user_id] = self._store_tweets(accounts[user_id], tweets, user_id)
+        
+        scheduler.run(on_complete=store)
+        return results
+    
+    def _store_tweets(self, username, tweets, user_id):
+        """Process, save and index a user's collected tweets."""
         if not tweets:
+            # Nothing posted within the collection window is not a failure
             print(f"No tweets found for {username}")
-            return False
+            return True
         
         # Process tweets
         processed_tweets = self.processor.batch_process_tweets(tweets)
         
         # Save tweets to database
-        self.db.save_tweets(tweets, user_id)
+        if not self.db.save_tweets(tweets, user_id):
+            print(f"Failed to save tweets for {username}")
+            return False
+        
+        # Index tweets for retrieval
+        index = self.get_content_index(user_id)
+        index.add_tweets(processed_tweets)
+        index.flush()
         
         print(f"Collected {len(tweets)} tweets for {username}")
         return True
     
-    def collect_web_content(self, url, user_id):
-        """Collect web content for a user."""
+    def collect_web_content(self, url, user_id, resume=False):
+        """Collect web content for a user.
+        
+        Pages are saved as soon as they are fetched and crawls are
+        checkpointed, so with `resume` an interrupted collection continues
+        where it stopped instead of starting over.
+        """
         print(f"Collecting web content from {url}...")
+        self.scraper.start_job()
+        
+        checkpoint = CrawlCheckpoint(self.db.get_crawl_checkpoints(), f"{user_id}:{url}", resume=resume)
+        
+        def save_page(page):
+            self.db.save_web_content(page, user_id)
         
         # Check if URL is a blog
         is_blog = '/blog/' in url or 'blog.' in url
         
         if is_blog:
-            # Get blog posts
+            # Get blog posts, skipping those unchanged since the last collection
+            known_lastmod = {
+                page['url']: page.get('lastmod')
+                for page in self.db.iter_web_content(user_id, fields=['url', 'lastmod'])
+            }
             pages = self.scraper.get_blog_posts(
                 url,
-                max_posts=config.MAX_PAGES_PER_SITE
+                max_posts=config.MAX_PAGES_PER_SITE,
+                known_lastmod=known_lastmod,
+                checkpoint=checkpoint,
+                on_page=save_page
             )
         else:
             # Crawl website
             pages = self.scraper.crawl_website(
                 url,
-                max_pages=config.MAX_PAGES_PER_SITE
+                max_pages=config.MAX_PAGES_PER_SITE,
+                checkpoint=checkpoint,
+                on_page=save_page
             )
         
+        # Pages saved before an interruption still need to be indexed
+        resumed_pages = set(self.scraper.crawl_stats.get('resumed_pages', []))
+        if resumed_pages:
+            pages = [
+                page for page in self.db.iter_web_content(
+                    user_id, fields=['url', 'title', 'description', 'content', 'links', 'images'])
+                if page['url'] in resumed_pages
+            ] + pages
+        
         if not pages:
+            # Every post is already stored and unchanged
+            if self.scraper.crawl_stats.get('unchanged'):
+                print(f"No new or changed content at {url}")
+                return True
             print(f"No content found at {url}")
             return False
         
         # Process web content
         processed_pages = self.processor.batch_process_web_content(pages)
         
-        # Save web content to database
-        for page in pages:
-            self.db.save_web_content(page, user_id)
+        # Index pages for retrieval
+        index = self.get_content_index(user_id)
+        index.add_web_content(processed_pages)
+        index.flush()
         
         print(f"Collected {len(pages)} pages from {url}")
         return True
     
-    def collect_all_data(self, user_id, sources):
-        """Collect all data for a user from multiple sources."""
+    def collect_all_data(self, user_id, sources, resume=False):
+        """Collect all data for a user from multiple sources, optionally resuming an interrupted crawl."""
         results = {
             'twitter': False,
             'web': False,
@@ -101,12 +202,9 @@ class DataCollector:
         # Collect web content if available
         website_url = sources.get('website_url')
         if website_url:
-            results['web'] = self.collect_web_content(website_url, user_id)
-        
-        # Get total collected items
-        tweets = self.db.get_tweets(user_id)
-        web_content = self.db.get_web_content(user_id)
+            results['web'] = self.collect_web_content(website_url, user_id, resume=resume)
         
-        results['total_items'] = len(tweets) + len(web_content)
+        # Count total collected items without loading them
+        results['total_items'] = self.db.count_tweets(user_id) + self.db.count_web_content(user_id)
         
         return results
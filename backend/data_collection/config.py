@@ -7,6 +7,17 @@ TWITTER_API_KEY = "your_twitter_api_key"
 TWITTER_API_SECRET = "your_twitter_api_secret"
 TWITTER_ACCESS_TOKEN = "your_twitter_access_token"
 TWITTER_ACCESS_SECRET = "your_twitter_access_secret"
+TWITTER_API_HOST = "api.twitter.com"
+TWITTER_PAGE_SIZE = 200  # tweets per timeline page
+# Calls per window (seconds) per endpoint, until response headers report the actual budget
+TWITTER_RATE_LIMITS = {
+    'statuses/user_timeline': (900, 15 * 60),
+    'users/show': (900, 15 * 60)
+}
+TWITTER_DEFAULT_RATE_LIMIT = (15, 15 * 60)
+TWEET_ARCHIVE_TTL = 6 * 60 * 60  # seconds before archived profiles and tweets are refetched
+RECENT_TWEETS_PER_USER = 200
+RECENT_CACHE_USERS = 1000
 
 # Database configuration
 MONGODB_URI = "mongodb://localhost:27017/linkfo"
@@ -14,18 +25,83 @@ DB_NAME = "linkfo"
 COLLECTION_TWEETS = "tweets"
 COLLECTION_PROFILES = "profiles"
 COLLECTION_CONTENT = "web_content"
+COLLECTION_DAILY_ROLLUPS = "daily_rollups"
+COLLECTION_CONTENT_STATE = "content_state"
+COLLECTION_PERSONA_CACHE = "persona_cache"
+COLLECTION_TERM_STATS = "term_stats"
+COLLECTION_HTML_BLOBS = "html_blobs"
+COLLECTION_CRAWL_FRONTIER = "crawl_frontier"
+COLLECTION_CRAWL_HOSTS = "crawl_hosts"
+COLLECTION_CRAWL_CHECKPOINTS = "crawl_checkpoints"
+COLLECTION_REFRESH_STATE = "refresh_state"
 
 # Web scraping configuration
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 REQUEST_TIMEOUT = 30  # seconds
+CONNECT_TIMEOUT = 5  # seconds
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds
+MAX_RETRY_DELAY = 60  # seconds
+MAX_RETRY_AFTER = 2 * 60  # longest server-requested wait honored outside a job time budget
+MAX_JOB_SECONDS = 15 * 60
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 5 * 60
+HTTP_POOL_CONNECTIONS = 20  # hosts with pooled connections
+HTTP_POOL_MAXSIZE = 4  # kept-alive connections per host
+HTTP_HOST_POOL_SIZES = {}  # per-host overrides, e.g. {'linktr.ee': 8}
+DNS_CACHE_SECONDS = 5 * 60  # async client only
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+MAX_SKIPPED_URLS = 10000  # most recently skipped URLs remembered per scraper
+MIN_HOST_INTERVAL = 1.0  # seconds between requests to the same host
+ROBOTS_USER_AGENT = "Linkfo"
+ROBOTS_CACHE_SECONDS = 24 * 60 * 60
+ROBOTS_RETRY_SECONDS = 5 * 60  # unreachable robots.txt disallows the host until retried
+FRONTIER_LEASE_SECONDS = 2 * 60  # shared frontier leases of crashed workers expire after this
+FRONTIER_POLL_SECONDS = 1.0
+MAX_LEASE_ATTEMPTS = 3
+CHECKPOINT_EVERY_FETCHES = 10
+CHECKPOINT_SECONDS = 30
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+SKIP_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico', '.mp3', '.mp4', '.mov',
+    '.avi', '.zip', '.gz', '.tar', '.rar', '.7z', '.exe', '.dmg', '.doc', '.docx', '.xls',
+    '.xlsx', '.ppt', '.pptx', '.css', '.js', '.json', '.xml'
+)
+
+# Blog discovery configuration
+POST_URL_PATTERN = r'/\d{4}/\d{2}/|/blog/|/post/|/article/'
+NON_POST_URL_PATTERN = r'/(tag|tags|category|categories|author|page|archive|archives|feed)/'
+MAX_SITEMAPS = 20
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
 
 # Content limits
 MAX_TWEETS = 1000
 MAX_PAGES_PER_SITE = 50
 MAX_CONTENT_AGE_DAYS = 365  # 1 year
 
+# Database read configuration
+READ_BATCH_SIZE = 500
+
 # Processing configuration
 LANGUAGE = "en"
 MIN_CONTENT_LENGTH = 50  # characters
+
+# Retrieval index configuration
+INDEX_DIRECTORY = "data/index"
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_INDEX_SEGMENTS = 8
+MAX_OPEN_INDEXES = 32  # per collector; each holds a file and mmap per segment
+
+# Local corpus store configuration
+LOCAL_STORE_DIRECTORY = "data/corpus"
+LOCAL_SEGMENT_BYTES = 64 * 1024 * 1024
+
+# Refresh scheduling configuration
+MIN_REFRESH_INTERVAL = 60 * 60  # seconds
+MAX_REFRESH_INTERVAL = 7 * 24 * 60 * 60
+DEFAULT_REFRESH_INTERVAL = 24 * 60 * 60  # until a user's activity has been observed
+REFRESH_RETRY_SECONDS = 60 * 60  # after a failed collection, doubled on each repeated failure
+REFRESH_RATE_SMOOTHING = 0.5  # weight of the latest observed change rate
+REFRESH_RELOAD_SECONDS = 60
+REFRESH_PATTERN_TWEETS = 200
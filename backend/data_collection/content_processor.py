@@ -7,6 +7,7 @@ from nltk.tokenize import word_tokenize, sent_tokenize
 from nltk.corpus import stopwords
 from datetime import datetime
 from . import config
+from .sketches import SpaceSaving
 
 # Download NLTK resources
 try:
@@ -22,9 +23,17 @@ except LookupError:
 class ContentProcessor:
     """Content processor for cleaning and structuring collected data."""
     
-    def __init__(self):
-        """Initialize content processor."""
+    def __init__(self, trends=None, document_frequencies=None):
+        """Initialize content processor.
+        
+        If a TrendTracker is given, hashtags, mentions and keywords of every
+        processed item are also fed into its heavy-hitter sketches. If
+        DocumentFrequencies are given, keywords are ranked by TF-IDF instead
+        of raw frequency.
+        """
         self.stop_words = set(stopwords.words('english'))
+        self.trends = trends
+        self.document_frequencies = document_frequencies
     
     def clean_text(self, text):
         """Clean text by removing special characters and extra whitespace."""
@@ -46,8 +55,13 @@ class ContentProcessor:
         
         return text
     
-    def extract_keywords(self, text, max_keywords=10):
-        """Extract keywords from text."""
+    def extract_keywords(self, text, max_keywords=10, sketch=None, sketch_capacity=None):
+        """Extract keywords from text.
+        
+        Words are also added to `sketch` when given. With sketch_capacity set,
+        per-document frequencies are kept in a bounded Space-Saving sketch
+        instead of a full dictionary.
+        """
         # Clean text
         clean_text = self.clean_text(text)
         
@@ -57,6 +71,12 @@ class ContentProcessor:
         # Remove stop words
         words = [word for word in words if word not in self.stop_words and len(word) > 2]
         
+        if sketch is not None:
+            sketch.update(words)
+        
+        if sketch_capacity:
+            return [word for word, freq in SpaceSaving(sketch_capacity).update(words).most_common(max_keywords)]
+        
         # Count word frequency
         word_freq = {}
         for word in words:
@@ -65,8 +85,12 @@ class ContentProcessor:
             else:
                 word_freq[word] = 1
         
-        # Sort by frequency
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
+        # Sort by frequency, weighted by how rare each word is in the corpus
+        if self.document_frequencies is not None and self.document_frequencies.document_count > 0:
+            idf = self.document_frequencies.idf
+            sorted_words = sorted(word_freq.items(), key=lambda x: x[1] * idf(x[0]), reverse=True)
+        else:
+            sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
         
         # Return top keywords
         return [word for word, freq in sorted_words[:max_keywords]]
@@ -100,7 +124,7 @@ class ContentProcessor:
             'text': tweet['full_text'],
             'clean_text': self.clean_text(tweet['full_text']),
             'created_at': tweet['created_at'],
-            'keywords': self.extract_keywords(tweet['full_text'], max_keywords=5),
+            'keywords': self.extract_keywords(tweet['full_text'], max_keywords=5, sketch=self._keyword_sketch()),
             'engagement': {
                 'retweets': tweet['retweet_count'],
                 'likes': tweet['favorite_count']
@@ -112,8 +136,15 @@ class ContentProcessor:
             'mentions': tweet['mentions']
         }
         
+        if self.trends is not None:
+            self.trends.add_tweet(tweet)
+        
         return processed
     
+    def _keyword_sketch(self):
+        """Keyword sketch of the attached trend tracker, if any."""
+        return self.trends.keywords if self.trends is not None else None
+    
     def process_web_content(self, content):
         """Process web content to extract structured information."""
         processed = {
@@ -121,7 +152,7 @@ class ContentProcessor:
             'title': content['title'],
             'description': content['description'],
             'clean_content': self.clean_text(content['content']),
-            'keywords': self.extract_keywords(content['content'], max_keywords=15),
+            'keywords': self.extract_keywords(content['content'], max_keywords=15, sketch=self._keyword_sketch()),
             'key_sentences': self.extract_sentences(content['content'], max_sentences=10),
             'links': content['links'],
             'images': content['images']
@@ -4,6 +4,15 @@ Database module for storing collected data.
 import pymongo
 from datetime import datetime
 from . import config
+from .tweet_batch import TweetBatch
+from .rollups import RollupIndex, rollup_increments
+from .term_stats import DocumentFrequencies, document_terms, content_hash
+from .blob_store import MongoBlobStore
+from .checkpoints import MongoCheckpointStore
+from .shared_frontier import SharedFrontier
+
+# Term stats key holding the number of documents, never produced by document_terms
+DOCUMENT_COUNT_TERM = ''
 
 class Database:
     """Database connection and operations for data collection."""
@@ -13,14 +22,24 @@ class Database:
         self.client = None
         self.db = None
         self.connected = False
+        self.content_listeners = []
+        self.document_frequencies = DocumentFrequencies()
+        self.html_blobs = None
+        self.crawl_checkpoints = None
     
     def connect(self):
         """Connect to MongoDB database."""
         try:
             self.client = pymongo.MongoClient(config.MONGODB_URI)
             self.db = self.client[config.DB_NAME]
+            self.html_blobs = MongoBlobStore(self.db[config.COLLECTION_HTML_BLOBS])
+            self.crawl_checkpoints = MongoCheckpointStore(self.db[config.COLLECTION_CRAWL_CHECKPOINTS])
+            self.db[config.COLLECTION_PROFILES].create_index(
+                [('platform', pymongo.ASCENDING), ('username_lower', pymongo.ASCENDING), ('collected_at', pymongo.DESCENDING)]
+            )
             self.connected = True
             print(f"Connected to database: {config.DB_NAME}")
+            self._load_document_frequencies()
             return True
         except Exception as e:
             print(f"Error connecting to database: {str(e)}")
@@ -41,6 +60,7 @@ class Database:
                 return False
         
         collection = self.db[config.COLLECTION_TWEETS]
+        new_tweets = []
         
         for tweet in tweets:
             # Add metadata
@@ -51,9 +71,37 @@ class Database:
             existing = collection.find_one({'id_str': tweet['id_str']})
             if not existing:
                 collection.insert_one(tweet)
+                new_tweets.append(tweet)
+        
+        # Keep daily rollups and document frequencies in step with newly stored tweets
+        self._update_daily_rollups(new_tweets, user_id)
+        self._update_document_frequencies(
+            [document_terms(tweet['full_text']) for tweet in new_tweets if 'full_text' in tweet]
+        )
+        
+        if new_tweets:
+            self._content_changed(user_id)
+        
+        # Stored tweets are current as of this collection, also when none were new
+        self.db[config.COLLECTION_CONTENT_STATE].update_one(
+            {'user_id': user_id},
+            {'$set': {'tweets_collected_at': datetime.now()}},
+            upsert=True
+        )
         
         return True
     
+    def _update_daily_rollups(self, tweets, user_id):
+        """Add newly saved tweets to the user's daily rollup documents."""
+        collection = self.db[config.COLLECTION_DAILY_ROLLUPS]
+        
+        for day, increment in rollup_increments(tweets).items():
+            collection.update_one(
+                {'user_id': user_id, 'day': day},
+                {'$inc': increment},
+                upsert=True
+            )
+    
     def save_profile(self, profile, user_id):
         """Save social media profile to database."""
         if not self.connected:
@@ -66,6 +114,10 @@ class Database:
         profile['user_id'] = user_id
         profile['collected_at'] = datetime.now()
         
+        # Usernames are case-insensitive on the platforms, so they are looked up lowercased
+        if profile.get('username'):
+            profile['username_lower'] = profile['username'].lower()
+        
         # Check if profile already exists and update
         existing = collection.find_one({
             'platform': profile['platform'],
@@ -94,19 +146,158 @@ class Database:
         content['user_id'] = user_id
         content['collected_at'] = datetime.now()
         
+        # Keep raw HTML out of the document, in the compressed blob store
+        html = content.pop('html', None)
+        if html:
+            content['html_hash'] = self.html_blobs.put(html)
+        
         # Check if content already exists and update
         existing = collection.find_one({
             'url': content['url']
         })
         
+        # Date the page by when its text last changed, so unchanged re-crawls are not new content
+        if existing and content_hash(existing) == content_hash(content):
+            content['changed_at'] = existing.get('changed_at', existing['collected_at'])
+        else:
+            content['changed_at'] = content['collected_at']
+        
         if existing:
             collection.update_one(
                 {'_id': existing['_id']},
-                {'$set': content}
+                {'$set': content, '$unset': {'html': ''}}
             )
         else:
             collection.insert_one(content)
         
+        # Replace the old version's terms with the new ones
+        if existing and 'content' in existing:
+            self._update_document_frequencies([document_terms(existing['content'])], count=-1)
+        if 'content' in content:
+            self._update_document_frequencies([document_terms(content['content'])])
+        
+        self._content_changed(user_id)
+        
+        return True
+    
+    def _update_document_frequencies(self, documents, count=1):
+        """Add (or remove) the term sets of saved documents to the corpus document frequencies."""
+        if not documents:
+            return
+        
+        increments = {DOCUMENT_COUNT_TERM: count * len(documents)}
+        for terms in documents:
+            self.document_frequencies.add_document(terms, count)
+            for term in terms:
+                increments[term] = increments.get(term, 0) + count
+        
+        # Keyed by _id, whose unique index makes concurrent upserts of a new term safe
+        try:
+            self.db[config.COLLECTION_TERM_STATS].bulk_write([
+                pymongo.UpdateOne({'_id': term}, {'$inc': {'df': increment}}, upsert=True)
+                for term, increment in increments.items()
+            ], ordered=False)
+        except Exception as e:
+            print(f"Error updating document frequencies: {str(e)}")
+    
+    def _load_document_frequencies(self):
+        """Load corpus document frequencies into memory."""
+        try:
+            document_count = 0
+            term_counts = []
+            for stats in self.db[config.COLLECTION_TERM_STATS].find({}, {'_id': 1, 'df': 1}):
+                if stats['_id'] == DOCUMENT_COUNT_TERM:
+                    document_count = stats['df']
+                elif stats['df'] > 0:
+                    term_counts.append((stats['_id'], stats['df']))
+            self.document_frequencies.load(document_count, term_counts)
+        except Exception as e:
+            print(f"Error loading document frequencies: {str(e)}")
+    
+    def get_document_frequencies(self):
+        """Get the in-memory corpus document frequencies, kept current as content is saved."""
+        if not self.connected:
+            self.connect()
+        return self.document_frequencies
+    
+    def get_crawl_checkpoints(self):
+        """Get the store of crawl checkpoints, or None."""
+        if not self.connected:
+            self.connect()
+        return self.crawl_checkpoints
+    
+    def add_content_listener(self, listener):
+        """Register a callback invoked with user_id whenever new content is saved."""
+        self.content_listeners.append(listener)
+    
+    def _content_changed(self, user_id):
+        """Bump the user's content version and notify listeners."""
+        self.db[config.COLLECTION_CONTENT_STATE].update_one(
+            {'user_id': user_id},
+            {'$inc': {'version': 1}, '$set': {'updated_at': datetime.now()}},
+            upsert=True
+        )
+        
+        for listener in self.content_listeners:
+            listener(user_id)
+    
+    def get_content_version(self, user_id):
+        """Get the user's content version, which changes whenever content is saved."""
+        if not self.connected:
+            if not self.connect():
+                return None
+        
+        state = self.db[config.COLLECTION_CONTENT_STATE].find_one({'user_id': user_id})
+        return state.get('version', 0) if state else 0
+    
+    def get_tweets_collected_at(self, user_id):
+        """Get when the user's tweets were last saved from a collection, or None."""
+        if not self.connected:
+            if not self.connect():
+                return None
+        
+        state = self.db[config.COLLECTION_CONTENT_STATE].find_one({'user_id': user_id}, {'tweets_collected_at': 1})
+        return state.get('tweets_collected_at') if state else None
+    
+    def get_crawl_frontier(self, crawl_id, score=None, interval=None):
+        """Get the MongoDB-backed frontier of a crawl shared by several workers, or None."""
+        if not self.connected:
+            if not self.connect():
+                return None
+        
+        return SharedFrontier(
+            self.db[config.COLLECTION_CRAWL_FRONTIER],
+            self.db[config.COLLECTION_CRAWL_HOSTS],
+            crawl_id,
+            score=score,
+            interval=interval
+        )
+    
+    def get_cached_persona(self, user_id):
+        """Get the cached persona entry for a user, or None."""
+        if not self.connected:
+            if not self.connect():
+                return None
+        
+        return self.db[config.COLLECTION_PERSONA_CACHE].find_one({'user_id': user_id}, {'_id': 0})
+    
+    def save_cached_persona(self, user_id, fingerprint, persona):
+        """Save an encoded persona model to the persona cache."""
+        if not self.connected:
+            if not self.connect():
+                return False
+        
+        self.db[config.COLLECTION_PERSONA_CACHE].update_one(
+            {'user_id': user_id},
+            {'$set': {
+                'user_id': user_id,
+                'fingerprint': fingerprint,
+                'persona': persona,
+                'cached_at': datetime.now()
+            }},
+            upsert=True
+        )
+        
         return True
     
     def get_tweets(self, user_id, limit=100):
@@ -123,6 +314,125 @@ class Database:
         
         return tweets
     
+    def iter_tweets(self, user_id, fields=None, since=None, until=None, limit=None, batch_size=None):
+        """Stream tweets for a user, newest first.
+        
+        Only `fields` are returned when given. `since`/`until` bound
+        created_at to [since, until) and accept datetimes or ISO strings.
+        """
+        if isinstance(since, datetime):
+            since = since.isoformat()
+        if isinstance(until, datetime):
+            until = until.isoformat()
+        
+        return self._iter_documents(config.COLLECTION_TWEETS, user_id, 'created_at',
+                                    fields, since, until, limit, batch_size)
+    
+    def iter_web_content(self, user_id, fields=None, since=None, until=None, limit=None, batch_size=None):
+        """Stream web content for a user, most recently collected first.
+        
+        Only `fields` are returned when given. `since`/`until` bound
+        collected_at to [since, until).
+        """
+        return self._iter_documents(config.COLLECTION_CONTENT, user_id, 'collected_at',
+                                    fields, since, until, limit, batch_size)
+    
+    def _iter_documents(self, collection_name, user_id, time_field, fields, since, until, limit, batch_size):
+        """Stream a user's documents from a collection with a projection and time range."""
+        if not self.connected:
+            if not self.connect():
+                return
+        
+        query = {'user_id': user_id}
+        if since is not None or until is not None:
+            query[time_field] = {}
+            if since is not None:
+                query[time_field]['$gte'] = since
+            if until is not None:
+                query[time_field]['$lt'] = until
+        
+        projection = {'_id': 0}
+        if fields:
+            projection.update({field: 1 for field in fields})
+        
+        collection = self.db[collection_name]
+        cursor = collection.find(query, projection).sort(time_field, -1)
+        cursor = cursor.batch_size(batch_size or config.READ_BATCH_SIZE)
+        if limit:
+            cursor = cursor.limit(limit)
+        
+        try:
+            for document in cursor:
+                yield document
+        finally:
+            cursor.close()
+    
+    def count_tweets(self, user_id):
+        """Count stored tweets for a user."""
+        return self._count_documents(config.COLLECTION_TWEETS, {'user_id': user_id})
+    
+    def count_web_content(self, user_id, changed_since=None):
+        """Count stored web pages for a user, or only those whose text changed since a datetime."""
+        query = {'user_id': user_id}
+        if changed_since is not None:
+            query['changed_at'] = {'$gte': changed_since}
+        return self._count_documents(config.COLLECTION_CONTENT, query)
+    
+    def _count_documents(self, collection_name, query):
+        """Count the documents of a collection matching a query."""
+        if not self.connected:
+            if not self.connect():
+                return 0
+        
+        return self.db[collection_name].count_documents(query)
+    
+    def get_tweet_batch(self, user_id, limit=None, keep_text=False):
+        """Get tweets for a user as a columnar TweetBatch."""
+        if not self.connected:
+            if not self.connect():
+                return TweetBatch.from_documents([])
+        
+        projection = {
+            '_id': 0,
+            'id_str': 1,
+            'created_at': 1,
+            'favorite_count': 1,
+            'retweet_count': 1,
+            'is_reply': 1,
+            'is_retweet': 1,
+            'hashtags': 1,
+            'mentions': 1,
+            'full_text': 1
+        }
+        
+        collection = self.db[config.COLLECTION_TWEETS]
+        cursor = collection.find({'user_id': user_id}, projection).sort('created_at', -1)
+        if limit:
+            cursor = cursor.limit(limit)
+        
+        return TweetBatch.from_documents(cursor, keep_text=keep_text)
+    
+    def get_daily_rollups(self, user_id, start=None, end=None):
+        """Get daily rollup documents for a user, optionally for days in [start, end)."""
+        if not self.connected:
+            if not self.connect():
+                return []
+        
+        query = {'user_id': user_id}
+        if start or end:
+            query['day'] = {}
+            if start:
+                query['day']['$gte'] = str(start)
+            if end:
+                query['day']['$lt'] = str(end)
+        
+        collection = self.db[config.COLLECTION_DAILY_ROLLUPS]
+        return list(collection.find(query, {'_id': 0, 'user_id': 0}).sort('day', 1))
+    
+    def get_rollup_index(self, user_id):
+        """Get a RollupIndex for fast time-window queries over a user's activity."""
+        return RollupIndex.from_documents(self.get_daily_rollups(user_id))
+    
     def get_profiles(self, user_id):
         """Get social media profiles for a user."""
         if not self.connected:
@@ -137,6 +447,73 @@ class Database:
         
         return profiles
     
+    def get_profile_by_username(self, platform, username):
+        """Get the latest stored profile of a platform username, or None."""
+        if not self.connected:
+            if not self.connect():
+                return None
+        
+        return self.db[config.COLLECTION_PROFILES].find_one(
+            {'platform': platform, 'username_lower': username.lower()},
+            {'_id': 0},
+            sort=[('collected_at', -1)]
+        )
+    
+    def get_refresh_states(self):
+        """Get the refresh scheduling state of every scheduled user source."""
+        if not self.connected:
+            if not self.connect():
+                return []
+        
+        return list(self.db[config.COLLECTION_REFRESH_STATE].find({}, {'_id': 0}))
+    
+    def save_refresh_state(self, state):
+        """Save the refresh scheduling state of a user source."""
+        if not self.connected:
+            if not self.connect():
+                return False
+        
+        self.db[config.COLLECTION_REFRESH_STATE].update_one(
+            {'user_id': state['user_id'], 'source': state['source']},
+            {'$set': state},
+            upsert=True
+        )
+        return True
+    
+    def get_page_html(self, url, user_id=None):
+        """Get the raw HTML of a collected page from the blob store, or None."""
+        if not self.connected:
+            if not self.connect():
+                return None
+        
+        query = {'url': url}
+        if user_id is not None:
+            query['user_id'] = user_id
+        
+        page = self.db[config.COLLECTION_CONTENT].find_one(query, {'html_hash': 1, 'html': 1})
+        if not page:
+            return None
+        if 'html' in page:
+            return page['html']
+        return self.html_blobs.get(page['html_hash']) if 'html_hash' in page else None
+    
+    def migrate_inline_html(self):
+        """Move raw HTML stored inline in web content documents into the blob store."""
+        if not self.connected:
+            if not self.connect():
+                return 0
+        
+        collection = self.db[config.COLLECTION_CONTENT]
+        migrated = 0
+        for page in collection.find({'html': {'$exists': True}}, {'html': 1}):
+            collection.update_one(
+                {'_id': page['_id']},
+                {'$set': {'html_hash': self.html_blobs.put(page['html'])}, '$unset': {'html': ''}}
+            )
+            migrated += 1
+        
+        return migrated
+    
     def get_web_content(self, user_id, limit=100):
         """Get web content for a user."""
         if not self.connected:
@@ -0,0 +1,98 @@
+"""
+Priority crawl frontier and URL scoring for focused crawls.
+"""
+import heapq
+import re
+from urllib.parse import urlparse
+from . import config
+
+def score_url(url, anchor_text='', depth=0):
+    """Score how likely a URL is to be a blog post, higher first.
+    
+    Combines the post URL patterns, anchor text length (post links are
+    usually titles, navigation links are one or two words) and link depth.
+    """
+    parsed = urlparse(url)
+    path = parsed.path
+    score = 0.0
+    
+    if re.search(config.POST_URL_PATTERN, path):
+        score += 3.0
+    if re.search(config.NON_POST_URL_PATTERN, path):
+        score -= 3.0
+    if parsed.query:
+        score -= 1.0
+    
+    # A slug with several words looks like a title
+    slug = path.rstrip('/').rsplit('/', 1)[-1]
+    if slug.count('-') >= 2:
+        score += 1.0
+    
+    words = len(anchor_text.split())
+    score += min(words, 8) / 4
+    
+    return score - 0.5 * depth
+
+class CrawlFrontier:
+    """Heap-ordered set of URLs to visit.
+    
+    URLs are popped highest score first, in insertion order among equal
+    scores, so a frontier without a scoring function behaves like a FIFO
+    queue. Each URL is queued at most once.
+    """
+    
+    # Host spacing is left to the politeness scheduler
+    reserves_hosts = False
+    
+    def __init__(self, score=None):
+        """Initialize frontier with an optional score(url, anchor_text, depth) function."""
+        self.score = score
+        self.heap = []
+        self.seen = set()
+        self.counter = 0
+    
+    def push(self, url, depth=0, anchor_text=''):
+        """Queue a URL unless it was queued before."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        
+        priority = self.score(url, anchor_text, depth) if self.score else 0.0
+        heapq.heappush(self.heap, (-priority, self.counter, url, depth))
+        self.counter += 1
+        return True
+    
+    def pop(self):
+        """Pop the highest-priority (url, depth)."""
+        _, _, url, depth = heapq.heappop(self.heap)
+        return url, depth
+    
+    def ack(self, url):
+        """Mark a popped URL as done; a local frontier has nothing to record."""
+    
+    def fail(self, url):
+        """Mark a popped URL as failed; a local crawl does not retry it."""
+    
+    def to_state(self):
+        """JSON-serializable state of the queue and the URLs seen so far."""
+        return {
+            'heap': [list(entry) for entry in self.heap],
+            'seen': list(self.seen),
+            'counter': self.counter
+        }
+    
+    @classmethod
+    def from_state(cls, state, score=None):
+        """Restore a frontier saved with to_state."""
+        frontier = cls(score)
+        frontier.heap = [tuple(entry) for entry in state['heap']]
+        heapq.heapify(frontier.heap)
+        frontier.seen = set(state['seen'])
+        frontier.counter = state['counter']
+        return frontier
+    
+    def __len__(self):
+        return len(self.heap)
+    
+    def __contains__(self, url):
+        return url in self.seen
@@ -0,0 +1,212 @@
+"""
+Shared HTTP client with tuned connection pools and transfer metrics for all scrapers.
+"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+from . import config
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+class HttpMetrics:
+    """Thread-safe counters of requests, connections and bytes transferred."""
+    
+    def __init__(self):
+        """Initialize zeroed counters."""
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.bytes_received = 0
+    
+    def add(self, requests=0, connections=0, bytes_received=0):
+        """Add to the counters."""
+        with self.lock:
+            self.requests += requests
+            self.connections_opened += connections
+            self.bytes_received += bytes_received
+    
+    def snapshot(self):
+        """Get the counters and the connection reuse rate."""
+        with self.lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections_opened,
+                'connections_reused': reused,
+                'reuse_rate': reused / self.requests if self.requests else 0.0,
+                'bytes_received': self.bytes_received
+            }
+
+class MeteredAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count every new connection they open."""
+    
+    def __init__(self, metrics, **kwargs):
+        """Initialize adapter reporting to `metrics`."""
+        self.metrics = metrics
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        """Create the pool manager with counting connection pools."""
+        super().init_poolmanager(*args, **kwargs)
+        metrics = self.metrics
+        
+        class CountingHTTPConnectionPool(HTTPConnectionPool):
+            def _new_conn(self):
+                metrics.add(connections=1)
+                return super()._new_conn()
+        
+        class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            def _new_conn(self):
+                metrics.add(connections=1)
+                return super()._new_conn()
+        
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool
+        }
+
+class HttpClient:
+    """requests.Session with keep-alive pools sized per host, compression and metrics.
+    
+    Every host gets up to config.HTTP_POOL_MAXSIZE kept-alive connections,
+    overridden per host by config.HTTP_HOST_POOL_SIZES. Requests use
+    separate connect and read timeouts.
+    """
+    
+    def __init__(self, user_agent=None, pool_maxsize=None, host_pool_sizes=None):
+        """Initialize client."""
+        self.metrics = HttpMetrics()
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent or config.USER_AGENT,
+            # Every encoding urllib3 can decode here, including br when brotli is installed
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive'
+        })
+        
+        adapter = MeteredAdapter(
+            self.metrics,
+            pool_connections=config.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or config.HTTP_POOL_MAXSIZE
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Dedicated pools for hosts that need more (or fewer) parallel connections
+        host_pool_sizes = config.HTTP_HOST_POOL_SIZES if host_pool_sizes is None else host_pool_sizes
+        for host, size in host_pool_sizes.items():
+            host_adapter = MeteredAdapter(self.metrics, pool_connections=1, pool_maxsize=size)
+            self.session.mount(f'http://{host}/', host_adapter)
+            self.session.mount(f'https://{host}/', host_adapter)
+    
+    def get(self, url, stream=False, timeout=None, **kwargs):
+        """Send a GET request; bytes are counted once the body is read or the response closed."""
+        response = self.session.get(
+            url,
+            stream=stream,
+            timeout=timeout or (config.CONNECT_TIMEOUT, config.REQUEST_TIMEOUT),
+            **kwargs
+        )
+        self.metrics.add(requests=1)
+        
+        if not stream:
+            self._record_bytes(response)
+        else:
+            close = response.close
+            
+            def close_and_record():
+                self._record_bytes(response)
+                close()
+            
+            response.close = close_and_record
+        
+        return response
+    
+    def _record_bytes(self, response):
+        """Count the bytes a response pulled over the wire."""
+        # Count each response once, even if it is closed repeatedly
+        if getattr(response, '_bytes_recorded', False):
+            return
+        response._bytes_recorded = True
+        
+        # tell() is the position in the (possibly compressed) wire body
+        raw = response.raw
+        if raw is not None and hasattr(raw, 'tell'):
+            self.metrics.add(bytes_received=raw.tell())
+    
+    def stats(self):
+        """Get connection reuse and transfer metrics."""
+        return self.metrics.snapshot()
+    
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+class AsyncHttpClient:
+    """asyncio counterpart of HttpClient, available when aiohttp is installed.
+    
+    Uses a TCPConnector with the same per-host limits and a DNS cache.
+    """
+    
+    def __init__(self, user_agent=None, limit_per_host=None):
+        """Initialize client; the aiohttp session is created on first use."""
+        if aiohttp is None:
+            raise ImportError("AsyncHttpClient requires aiohttp")
+        self.user_agent = user_agent or config.USER_AGENT
+        self.limit_per_host = limit_per_host or config.HTTP_POOL_MAXSIZE
+        self.metrics = HttpMetrics()
+        self.session = None
+    
+    async def _session(self):
+        """Get the aiohttp session, creating it inside the running event loop."""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=config.HTTP_POOL_CONNECTIONS * self.limit_per_host,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=config.DNS_CACHE_SECONDS
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'User-Agent': self.user_agent},
+                timeout=aiohttp.ClientTimeout(sock_connect=config.CONNECT_TIMEOUT, sock_read=config.REQUEST_TIMEOUT)
+            )
+        return self.session
+    
+    async def get(self, url, max_bytes=None):
+        """Fetch a URL, returning (status, headers, body bytes) with the body capped at max_bytes."""
+        session = await self._session()
+        async with session.get(url) as response:
+            self.metrics.add(requests=1)
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(65536):
+                body.extend(chunk)
+                if max_bytes and len(body) > max_bytes:
+                    break
+            self.metrics.add(bytes_received=len(body))
+            return response.status, dict(response.headers), bytes(body)
+    
+    def stats(self):
+        """Get request and transfer metrics."""
+        return self.metrics.snapshot()
+    
+    async def close(self):
+        """Close the aiohttp session."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Get the process-wide HttpClient, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+    return _client
@@ -6,5 +6,20 @@ from .collector import DataCollector
 from .twitter_connector import TwitterConnector
 from .web_scraper import WebScraper
 from .content_processor import ContentProcessor
+from .tweet_batch import TweetBatch
+from .sketches import SpaceSaving, TrendTracker
+from .rollups import RollupIndex
+from .search_index import ContentIndex
+from .term_stats import DocumentFrequencies
+from .local_store import LocalDatabase
+from .blob_store import MongoBlobStore, FileBlobStore
+from .http_client import HttpClient
+from .checkpoints import CrawlCheckpoint
+from .twitter_scheduler import TwitterFetchScheduler
+from .tweet_archive import TweetArchive
+from .refresh_scheduler import RefreshScheduler
 
-__all__ = ['DataCollector', 'TwitterConnector', 'WebScraper', 'ContentProcessor']
+__all__ = ['DataCollector', 'TwitterConnector', 'WebScraper', 'ContentProcessor', 'TweetBatch',
+           'SpaceSaving', 'TrendTracker', 'RollupIndex', 'ContentIndex', 'DocumentFrequencies',
+           'LocalDatabase', 'MongoBlobStore', 'FileBlobStore', 'HttpClient',
+           'CrawlCheckpoint', 'TwitterFetchScheduler', 'TweetArchive', 'RefreshScheduler']
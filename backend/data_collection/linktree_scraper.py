@@ -1,28 +1,35 @@
 # backend/data_collection/linktree_scraper.py
 
-import requests
 from bs4 import BeautifulSoup
 import re
 import json
 from urllib.parse import urlparse
+from .resilience import Deadline, call_with_retries
+from .http_client import get_client
 
 class LinktreeScraper:
     """Specialized scraper for Linktree pages."""
     
     def __init__(self):
         """Initialize Linktree scraper."""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.http = get_client()
+        self.deadline = None
+    
+    def start_job(self, seconds=None):
+        """Start a job time budget shared by all following fetches."""
+        self.deadline = Deadline(seconds)
     
     def extract_profile(self, username):
         """Extract profile data from a Linktree page."""
         url = f"https://linktr.ee/{username}"
         
         try:
-            response = self.session.get(url, timeout=30) 
-            response.raise_for_status()
+            def fetch():
+                response = self.http.get(url)
+                response.raise_for_status()
+                return response
+            
+            response = call_with_retries(fetch, host=url, deadline=self.deadline)
             
             soup = BeautifulSoup(response.text, 'html.parser')
             
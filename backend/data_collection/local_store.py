@@ -0,0 +1,550 @@
+"""
+Memory-mapped append-only local corpus store, usable in place of the MongoDB Database.
+"""
+import base64
+import hashlib
+import json
+import mmap
+import os
+import struct
+from datetime import datetime
+import numpy as np
+from . import config
+from .tweet_batch import TweetBatch
+from .rollups import RollupIndex, rollup_increments
+from .term_stats import DocumentFrequencies, document_terms, content_hash
+from .blob_store import FileBlobStore
+from .checkpoints import FileCheckpointStore
+
+# Every record in a segment file is a little-endian uint32 length followed by a JSON payload
+RECORD_LENGTH = struct.Struct('<I')
+
+# Per-user offset index entries: segment number, record offset, payload length, key digest, sort time
+INDEX_DTYPE = np.dtype([('segment', '<u4'), ('offset', '<u8'), ('length', '<u4'), ('key', 'V16'),
+                        ('time', '<i8')])
+
+# Sort time of entries whose document has no time field
+MISSING_TIME = -2 ** 62
+
+# Field each collection's documents are ordered by when reading the newest
+TIME_FIELDS = {
+    config.COLLECTION_TWEETS: 'created_at',
+    config.COLLECTION_CONTENT: 'collected_at'
+}
+
+# Index name holding the refresh scheduling states of all users
+REFRESH_STATE_OWNER = '@refresh'
+
+def _encode_value(value):
+    """JSON encoder hook for datetimes and bytes."""
+    if isinstance(value, datetime):
+        return {'$date': value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {'$binary': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"Cannot store value of type {type(value).__name__}")
+
+def _decode_value(value):
+    """JSON decoder hook restoring datetimes and bytes."""
+    if len(value) == 1:
+        if '$date' in value:
+            return datetime.fromisoformat(value['$date'])
+        if '$binary' in value:
+            return base64.b64decode(value['$binary'])
+    return value
+
+def sort_time(value):
+    """Epoch microseconds of an ISO string or datetime, or MISSING_TIME."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return MISSING_TIME
+    if not isinstance(value, datetime):
+        return MISSING_TIME
+    return int(value.timestamp() * 1000000)
+
+def encode_record(document):
+    """Encode a document as a length-prefixed record."""
+    payload = json.dumps(document, default=_encode_value, separators=(',', ':')).encode('utf-8')
+    return RECORD_LENGTH.pack(len(payload)) + payload
+
+def decode_record(payload):
+    """Decode a record payload (bytes or memoryview) into a document."""
+    return json.loads(bytes(payload), object_hook=_decode_value)
+
+class SegmentLog:
+    """Append-only log of records split across segment files, read through mmap."""
+    
+    def __init__(self, directory, segment_bytes=None):
+        """Open (or create) a log in a directory."""
+        self.directory = directory
+        self.segment_bytes = segment_bytes or config.LOCAL_SEGMENT_BYTES
+        os.makedirs(directory, exist_ok=True)
+        
+        segments = sorted(int(name[:-4]) for name in os.listdir(directory) if name.endswith('.log'))
+        self.active = segments[-1] if segments else 0
+        self.file = open(self._path(self.active), 'ab')
+        self.maps = {}
+    
+    def _path(self, segment):
+        """Path of a segment file."""
+        return os.path.join(self.directory, f'{segment:08d}.log')
+    
+    def append(self, document):
+        """Append a document, returning (segment, payload offset, payload length)."""
+        record = encode_record(document)
+        
+        if self.file.tell() and self.file.tell() + len(record) > self.segment_bytes:
+            self.file.close()
+            self.active += 1
+            self.file = open(self._path(self.active), 'ab')
+        
+        offset = self.file.tell() + RECORD_LENGTH.size
+        self.file.write(record)
+        return self.active, offset, len(record) - RECORD_LENGTH.size
+    
+    def flush(self):
+        """Flush appended records to disk."""
+        self.file.flush()
+    
+    def view(self, segment, offset, length):
+        """Get a memoryview of a record payload in the segment's mmap."""
+        mapped = self.maps.get(segment)
+        if mapped is None or offset + length > len(mapped):
+            # The active segment grows, so remap it when reading past the mapped end
+            if segment == self.active:
+                self.flush()
+            if mapped is not None:
+                mapped.close()
+            with open(self._path(segment), 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.maps[segment] = mapped
+        return memoryview(mapped)[offset:offset + length]
+    
+    def close(self):
+        """Close the active segment and all maps."""
+        self.file.close()
+        for mapped in self.maps.values():
+            mapped.close()
+        self.maps = {}
+
+class LocalDatabase:
+    """Local corpus store with the same save_*/get_* interface as Database.
+    
+    Each collection is a SegmentLog plus one offset index file per user,
+    holding fixed-size entries that point at that user's records. Saving a
+    document with an existing key appends a new version; reads resolve each
+    key to its latest entry. Entries also carry the document's sort time, so
+    the newest documents are found from the index and only the records
+    returned are JSON-decoded.
+    """
+    
+    def __init__(self, directory=None):
+        """Initialize local store."""
+        self.directory = directory or config.LOCAL_STORE_DIRECTORY
+        self.logs = {}
+        self.indexes = {}
+        self.connected = False
+        self.content_listeners = []
+        self.document_frequencies = DocumentFrequencies()
+        self.html_blobs = FileBlobStore(os.path.join(self.directory, 'html'))
+        self.crawl_checkpoints = FileCheckpointStore(os.path.join(self.directory, 'checkpoints'))
+    
+    def connect(self):
+        """Open the store directory."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.connected = True
+            self._load_document_frequencies()
+            return True
+        except Exception as e:
+            print(f"Error opening local store: {str(e)}")
+            self.connected = False
+            return False
+    
+    def disconnect(self):
+        """Close all segment files."""
+        for log in self.logs.values():
+            log.close()
+        self.logs = {}
+        self.indexes = {}
+        self.connected = False
+    
+    def _log(self, collection):
+        """Get the segment log of a collection."""
+        if collection not in self.logs:
+            self.logs[collection] = SegmentLog(os.path.join(self.directory, collection, 'segments'))
+        return self.logs[collection]
+    
+    def _index_path(self, collection, user_id):
+        """Path of a user's offset index file."""
+        name = hashlib.sha1(str(user_id).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, collection, 'index', f'{name}.idx')
+    
+    @staticmethod
+    def _read_index(path):
+        """Read an offset index file as a structured array."""
+        if not os.path.exists(path):
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        with open(path, 'rb') as f:
+            return np.frombuffer(f.read(), dtype=INDEX_DTYPE)
+    
+    def _index(self, collection, user_id):
+        """Get a user's index entries as a structured array."""
+        key = (collection, user_id)
+        if key not in self.indexes:
+            self.indexes[key] = self._read_index(self._index_path(collection, user_id))
+        return self.indexes[key]
+    
+    def _latest(self, collection, user_id):
+        """Index entries of the latest version of each key, in insertion order."""
+        return self._latest_entries(self._index(collection, user_id))
+    
+    @staticmethod
+    def _latest_entries(entries):
+        """Entries of the latest version of each key, in insertion order."""
+        if not len(entries):
+            return entries
+        
+        # np.unique keeps the first occurrence, so search from the end
+        _, last = np.unique(entries['key'][::-1], return_index=True)
+        return entries[np.sort(len(entries) - 1 - last)]
+    
+    def _append(self, collection, user_id, documents):
+        """Append (key, document) pairs for a user and index them, returning the index entries."""
+        log = self._log(collection)
+        time_field = TIME_FIELDS.get(collection)
+        entries = np.zeros(len(documents), dtype=INDEX_DTYPE)
+        for i, (key, document) in enumerate(documents):
+            segment, offset, length = log.append(document)
+            time = sort_time(document.get(time_field)) if time_field else MISSING_TIME
+            entries[i] = (segment, offset, length, hashlib.md5(key.encode('utf-8')).digest(), time)
+        log.flush()
+        
+        self._add_index_entries(collection, user_id, entries)
+        return entries
+    
+    def _add_index_entries(self, collection, user_id, entries):
+        """Append index entries to a user's index."""
+        # Load the existing index before the file grows
+        existing = self._index(collection, user_id)
+        
+        path = self._index_path(collection, user_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'ab') as f:
+            f.write(entries.tobytes())
+        
+        self.indexes[(collection, user_id)] = np.concatenate([existing, entries])
+    
+    def _find(self, collection, user_id, key):
+        """Latest version of a user's document with a key, or None."""
+        entries = self._index(collection, user_id)
+        matches = np.flatnonzero(entries['key'] == np.void(hashlib.md5(key.encode('utf-8')).digest()))
+        if not matches.size:
+            return None
+        
+        return next(self._read(collection, entries[matches[-1:]]))
+    
+    def _keys(self, collection, user_id):
+        """Key digests already stored for a user."""
+        return set(self._index(collection, user_id)['key'].tolist())
+    
+    def _read(self, collection, entries):
+        """Decode the records of index entries, in order."""
+        log = self._log(collection)
+        for entry in entries:
+            yield decode_record(log.view(int(entry['segment']), int(entry['offset']), int(entry['length'])))
+    
+    def iter_documents(self, collection, user_id):
+        """Yield the latest version of each of a user's documents, in insertion order."""
+        if not self.connected:
+            if not self.connect():
+                return
+        
+        yield from self._read(collection, self._latest(collection, user_id))
+    
+    def save_tweets(self, tweets, user_id):
+        """Save tweets to the local store."""
+        if not self.connected:
+            if not self.connect():
+                return False
+        
+        existing = self._keys(config.COLLECTION_TWEETS, user_id)
+        new_tweets = []
+        
+        for tweet in tweets:
+            digest = hashlib.md5(tweet['id_str'].encode('utf-8')).digest()
+            if digest in existing:
+                continue
+            existing.add(digest)
+            
+            tweet['user_id'] = user_id
+            tweet['collected_at'] = datetime.now()
+            new_tweets.append((tweet['id_str'], tweet))
+        
+        if new_tweets:
+            self._append(config.COLLECTION_TWEETS, user_id, new_tweets)
+            for _, tweet in new_tweets:
+                if 'full_text' in tweet:
+                    self.document_frequencies.add_document(document_terms(tweet['full_text']))
+            self._content_changed(user_id)
+        
+        # Stored tweets are current as of this collection, also when none were new
+        self._append(config.COLLECTION_CONTENT_STATE, user_id, [(str(user_id), {
+            'user_id': user_id,
+            'tweets_collected_at': datetime.now()
+        })])
+        return True
+    
+    def save_profile(self, profile, user_id):
+        """Save social media profile to the local store."""
+        if not self.connected:
+            if not self.connect():
+                return False
+        
+        profile['user_id'] = user_id
+        profile['collected_at'] = datetime.now()
+        
+        key = f"{profile['platform']}:{profile['platform_id']}"
+        entries = self._append(config.COLLECTION_PROFILES, user_id, [(key, profile)])
+        
+        # Also index the record under its username, for lookups without the user_id
+        if profile.get('username'):
+            self._add_index_entries(config.COLLECTION_PROFILES,
+                                    self._username_alias(profile['platform'], profile['username']), entries)
+        return True
+    
+    @staticmethod
+    def _username_alias(platform, username):
+        """Index name under which profiles are also found by username."""
+        return f"@{platform}:{username.lower()}"
+    
+    def save_web_content(self, content, user_id):
+        """Save web content to the local store."""
+        if not self.connected:
+            if not self.connect():
+                return False
+        
+        content['user_id'] = user_id
+        content['collected_at'] = datetime.now()
+        
+        # Keep raw HTML out of the record, in the compressed blob store
+        html = content.pop('html', None)
+        if html:
+            content['html_hash'] = self.html_blobs.put(html)
+        
+        existing = self._find(config.COLLECTION_CONTENT, user_id, content['url'])
+        
+        # Date the page by when its text last changed, so unchanged re-crawls are not new content
+        if existing and content_hash(existing) == content_hash(content):
+            content['changed_at'] = existing.get('changed_at', existing['collected_at'])
+        else:
+            content['changed_at'] = content['collected_at']
+        
+        self._append(config.COLLECTION_CONTENT, user_id, [(content['url'], content)])
+        
+        # Replace the old version's terms with the new ones
+        if existing and 'content' in existing:
+            self.document_frequencies.add_document(document_terms(existing['content']), count=-1)
+        if 'content' in content:
+            self.document_frequencies.add_document(document_terms(content['content']))
+        self._content_changed(user_id)
+        return True
+    
+    def _load_document_frequencies(self):
+        """Rebuild corpus document frequencies from the latest stored tweets and pages.
+        
+        Only the offset indexes are persisted, so the table is recomputed
+        from every user's index when the store is opened.
+        """
+        self.document_frequencies.load(0, [])
+        for collection, field in ((config.COLLECTION_TWEETS, 'full_text'), (config.COLLECTION_CONTENT, 'content')):
+            index_directory = os.path.join(self.directory, collection, 'index')
+            if not os.path.isdir(index_directory):
+                continue
+            
+            for name in os.listdir(index_directory):
+                if not name.endswith('.idx'):
+                    continue
+                entries = self._latest_entries(self._read_index(os.path.join(index_directory, name)))
+                for document in self._read(collection, entries):
+                    if field in document:
+                        self.document_frequencies.add_document(document_terms(document[field]))
+    
+    def get_document_frequencies(self):
+        """Get the in-memory corpus document frequencies, kept current as content is saved."""
+        if not self.connected:
+            self.connect()
+        return self.document_frequencies
+    
+    def get_crawl_checkpoints(self):
+        """Get the store of crawl checkpoints."""
+        return self.crawl_checkpoints
+    
+    def add_content_listener(self, listener):
+        """Register a callback invoked with user_id whenever new content is saved."""
+        self.content_listeners.append(listener)
+    
+    def _content_changed(self, user_id):
+        """Notify listeners of new content."""
+        for listener in self.content_listeners:
+            listener(user_id)
+    
+    def get_content_version(self, user_id):
+        """Get the user's content version, which changes whenever content is saved."""
+        return len(self._index(config.COLLECTION_TWEETS, user_id)) + \
+            len(self._index(config.COLLECTION_CONTENT, user_id))
+    
+    def get_tweets_collected_at(self, user_id):
+        """Get when the user's tweets were last saved from a collection, or None."""
+        if not self.connected:
+            if not self.connect():
+                return None
+        
+        state = self._find(config.COLLECTION_CONTENT_STATE, user_id, str(user_id))
+        return state['tweets_collected_at'] if state else None
+    
+    def get_cached_persona(self, user_id):
+        """Get the cached persona entry for a user, or None."""
+        entry = None
+        for entry in self.iter_documents(config.COLLECTION_PERSONA_CACHE, user_id):
+            pass
+        return entry
+    
+    def save_cached_persona(self, user_id, fingerprint, persona):
+        """Save an encoded persona model to the persona cache."""
+        if not self.connected:
+            if not self.connect():
+                return False
+        
+        self._append(config.COLLECTION_PERSONA_CACHE, user_id, [(str(user_id), {
+            'user_id': user_id,
+            'fingerprint': fingerprint,
+            'persona': persona,
+            'cached_at': datetime.now()
+        })])
+        return True
+    
+    def get_tweets(self, user_id, limit=100):
+        """Get tweets for a user, newest first."""
+        return list(self._iter_filtered(config.COLLECTION_TWEETS, user_id, None, None, None, limit, newest_first=True))
+    
+    def iter_tweets(self, user_id, fields=None, since=None, until=None, limit=None, batch_size=None):
+        """Stream tweets for a user; newest first when limited, otherwise in storage order."""
+        if isinstance(since, datetime):
+            since = since.isoformat()
+        if isinstance(until, datetime):
+            until = until.isoformat()
+        
+        return self._iter_filtered(config.COLLECTION_TWEETS, user_id, fields, since, until, limit)
+    
+    def iter_web_content(self, user_id, fields=None, since=None, until=None, limit=None, batch_size=None):
+        """Stream web content for a user; most recent first when limited, otherwise in storage order."""
+        return self._iter_filtered(config.COLLECTION_CONTENT, user_id, fields, since, until, limit)
+    
+    def _iter_filtered(self, collection, user_id, fields, since, until, limit, newest_first=False):
+        """Stream a user's documents with a projection and time range.
+        
+        Records are already memory-mapped, so batch sizes do not apply. The
+        time range and newest-first order come from the sort times in the
+        index, so only the returned records are decoded.
+        """
+        if not self.connected:
+            if not self.connect():
+                return
+        
+        entries = self._latest(collection, user_id)
+        if since is not None or until is not None:
+            times = entries['time']
+            keep = times != MISSING_TIME
+            if since is not None:
+                keep &= times >= sort_time(since)
+            if until is not None:
+                keep &= times < sort_time(until)
+            entries = entries[keep]
+        if limit or newest_first:
+            # Stable, so documents with equal times keep their insertion order
+            entries = entries[np.argsort(-entries['time'], kind='stable')[:limit or None]]
+        
+        for document in self._read(collection, entries):
+            yield {field: document[field] for field in fields if field in document} if fields else document
+    
+    def count_tweets(self, user_id):
+        """Count stored tweets for a user."""
+        return len(self._latest(config.COLLECTION_TWEETS, user_id))
+    
+    def count_web_content(self, user_id, changed_since=None):
+        """Count stored web pages for a user, or only those whose text changed since a datetime."""
+        if changed_since is None:
+            return len(self._latest(config.COLLECTION_CONTENT, user_id))
+        return sum(1 for page in self._iter_filtered(config.COLLECTION_CONTENT, user_id, ['changed_at'], None, None, None)
+                   if page.get('changed_at') and page['changed_at'] >= changed_since)
+    
+    def get_tweet_batch(self, user_id, limit=None, keep_text=False):
+        """Get tweets for a user as a columnar TweetBatch."""
+        tweets = self.iter_documents(config.COLLECTION_TWEETS, user_id)
+        if limit:
+            tweets = self.get_tweets(user_id, limit=limit)
+        return TweetBatch.from_documents(tweets, keep_text=keep_text)
+    
+    def get_daily_rollups(self, user_id, start=None, end=None):
+        """Get daily rollup documents for a user, computed from stored tweets."""
+        increments = rollup_increments(self.iter_documents(config.COLLECTION_TWEETS, user_id))
+        
+        rollups = []
+        for day in sorted(increments):
+            if (start and day < str(start)) or (end and day >= str(end)):
+                continue
+            rollup = {'day': day}
+            rollup.update(increments[day])
+            rollups.append(rollup)
+        return rollups
+    
+    def get_rollup_index(self, user_id):
+        """Get a RollupIndex for fast time-window queries over a user's activity."""
+        return RollupIndex.from_documents(self.get_daily_rollups(user_id))
+    
+    def get_profiles(self, user_id):
+        """Get social media profiles for a user."""
+        return list(self.iter_documents(config.COLLECTION_PROFILES, user_id))
+    
+    def get_profile_by_username(self, platform, username):
+        """Get the latest stored profile of a platform username, or None."""
+        profile = None
+        for profile in self.iter_documents(config.COLLECTION_PROFILES, self._username_alias(platform, username)):
+            pass
+        return profile
+    
+    def get_refresh_states(self):
+        """Get the refresh scheduling state of every scheduled user source."""
+        return list(self.iter_documents(config.COLLECTION_REFRESH_STATE, REFRESH_STATE_OWNER))
+    
+    def save_refresh_state(self, state):
+        """Save the refresh scheduling state of a user source."""
+        if not self.connected:
+            if not self.connect():
+                return False
+        
+        key = f"{state['user_id']}:{state['source']}"
+        self._append(config.COLLECTION_REFRESH_STATE, REFRESH_STATE_OWNER, [(key, dict(state))])
+        return True
+    
+    def get_page_html(self, url, user_id=None):
+        """Get the raw HTML of a user's collected page from the blob store, or None.
+        
+        Pages are indexed per user, so user_id is required here.
+        """
+        if user_id is None:
+            return None
+        
+        page = None
+        for document in self.iter_documents(config.COLLECTION_CONTENT, user_id):
+            if document['url'] == url:
+                page = document
+        if not page or 'html_hash' not in page:
+            return None
+        return self.html_blobs.get(page['html_hash'])
+    
+    def get_web_content(self, user_id, limit=100):
+        """Get web content for a user, most recently collected first."""
+        return list(self._iter_filtered(config.COLLECTION_CONTENT, user_id, None, None, None, limit, newest_first=True))
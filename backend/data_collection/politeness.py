@@ -0,0 +1,120 @@
+"""
+Process-wide per-host politeness: cached robots.txt rules and crawl delays.
+"""
+import threading
+import time
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+from . import config
+from .http_client import get_client
+
+class PolitenessScheduler:
+    """Per-host request spacing shared by every crawler in the process.
+    
+    Each host gets a reservation time for its next request, so concurrent
+    crawls of one host are spaced at least the host's interval apart while
+    requests to other hosts go ahead without waiting. The interval is the
+    larger of config.MIN_HOST_INTERVAL and the robots.txt Crawl-delay.
+    
+    As usual for robots.txt, a missing file (404) allows everything and a
+    401/403 disallows everything. When it cannot be fetched (error or 5xx)
+    the host is disallowed and retried after config.ROBOTS_RETRY_SECONDS.
+    """
+    
+    def __init__(self, http=None):
+        """Initialize scheduler, fetching robots.txt with an HttpClient (default the shared one)."""
+        self.http = http
+        self.lock = threading.Lock()
+        self.robots = {}
+        self.robots_locks = {}
+        self.next_request = {}
+    
+    @staticmethod
+    def _host(url):
+        """Scheme and host of a URL, the unit of politeness."""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+    
+    def _rules(self, url):
+        """Get the cached robots.txt rules for a URL's host, fetching them if stale."""
+        host = self._host(url)
+        with self.lock:
+            cached = self.robots.get(host)
+            if cached and time.time() < cached[0]:
+                return cached[1]
+            host_lock = self.robots_locks.setdefault(host, threading.Lock())
+        
+        # Only one thread fetches a host's robots.txt, the others wait for its result
+        with host_lock:
+            cached = self.robots.get(host)
+            if cached and time.time() < cached[0]:
+                return cached[1]
+            
+            parser = self._fetch_rules(host)
+            lifetime = config.ROBOTS_RETRY_SECONDS if parser.unreachable else config.ROBOTS_CACHE_SECONDS
+            
+            with self.lock:
+                self.robots[host] = (time.time() + lifetime, parser)
+            return parser
+    
+    def _fetch_rules(self, host):
+        """Fetch and parse a host's robots.txt."""
+        parser = RobotFileParser(f"{host}/robots.txt")
+        parser.unreachable = False
+        try:
+            response = (self.http or get_client()).get(f"{host}/robots.txt")
+        except Exception as e:
+            print(f"Error fetching robots.txt for {host}: {str(e)}")
+            response = None
+        
+        if response is None or response.status_code >= 500:
+            parser.disallow_all = True
+            parser.unreachable = True
+        elif response.status_code in (401, 403):
+            parser.disallow_all = True
+        elif response.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(response.text.splitlines())
+        return parser
+    
+    def allowed(self, url):
+        """Check whether robots.txt allows fetching a URL."""
+        return self._rules(url).can_fetch(config.ROBOTS_USER_AGENT, url)
+    
+    def unreachable(self, url):
+        """Check whether the host's robots.txt could not be fetched, so it is disallowed until retried."""
+        return self._rules(url).unreachable
+    
+    def sitemaps(self, url):
+        """Sitemap URLs listed in the host's robots.txt."""
+        return self._rules(url).site_maps() or []
+    
+    def interval(self, url):
+        """Minimum seconds between requests to a URL's host."""
+        delay = self._rules(url).crawl_delay(config.ROBOTS_USER_AGENT)
+        return max(config.MIN_HOST_INTERVAL, float(delay or 0))
+    
+    def wait(self, url):
+        """Block until a request to the URL's host is allowed, then reserve the next slot."""
+        host = self._host(url)
+        interval = self.interval(url)
+        
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_request.get(host, now))
+            self.next_request[host] = start + interval
+        
+        if start > now:
+            time.sleep(start - now)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Get the process-wide scheduler, creating it on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PolitenessScheduler()
+    return _scheduler
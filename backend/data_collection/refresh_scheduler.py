@@ -0,0 +1,277 @@
+"""
+Adaptive re-collection scheduling driven by each user's posting activity.
+"""
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
+from . import config
+
+# Sources the scheduler refreshes, with the collect_all_data source field naming their target
+REFRESH_SOURCES = {
+    'twitter': 'twitter_username',
+    'web': 'website_url'
+}
+
+def next_content_time(start, posts_per_day, hour_distribution=None, target=1.0):
+    """Predict when `target` new items will have appeared since `start` (epoch seconds).
+    
+    Items arrive at `posts_per_day`, spread over the hours of the day as in
+    `hour_distribution` (UTC hour -> count), so a user who posts in the
+    evening is predicted to have new content after their next evening.
+    The prediction is clamped to config.MIN_REFRESH_INTERVAL and
+    config.MAX_REFRESH_INTERVAL from `start`.
+    """
+    earliest = start + config.MIN_REFRESH_INTERVAL
+    latest = start + config.MAX_REFRESH_INTERVAL
+    if not posts_per_day or posts_per_day <= 0:
+        return latest
+    
+    weights = [0.0] * 24
+    if hour_distribution:
+        total = sum(hour_distribution.values())
+        for hour, count in hour_distribution.items():
+            weights[int(hour) % 24] = count / total if total else 0.0
+    if not any(weights):
+        weights = [1 / 24] * 24
+    
+    # Walk forward hour by hour until the expected number of new items reaches the target
+    expected = 0.0
+    moment = start
+    while moment < latest:
+        hour_end = (moment // 3600 + 1) * 3600
+        hour = datetime.fromtimestamp(moment, timezone.utc).hour
+        rate = posts_per_day * weights[hour] / 3600  # items per second in this hour
+        needed = target - expected
+        if rate > 0 and rate * (hour_end - moment) >= needed:
+            return min(latest, max(earliest, moment + needed / rate))
+        expected += rate * (hour_end - moment)
+        moment = hour_end
+    
+    return latest
+
+class RefreshScheduler:
+    """Priority queue of user re-collections keyed by predicted next-new-content time.
+    
+    Each (user, source) pair has a state persisted in the database with the
+    observed rate of new items per day, smoothed over collections, and for
+    Twitter the posting rate and hours from the posting pattern analyzer.
+    The pair whose new content is expected first is collected first, so API
+    and crawl budget goes where new content is likely to be.
+    """
+    
+    def __init__(self, collector, analyzer=None):
+        """Initialize scheduler on a DataCollector.
+        
+        `analyzer` is an engagement analyzer whose analyze_posting_patterns
+        (posts_per_day, hour_distribution) refines Twitter predictions, such
+        as persona_learning's VectorizedEngagementAnalyzer.
+        """
+        self.collector = collector
+        self.db = collector.db
+        self.analyzer = analyzer
+        self.states = {}
+        self.heap = []
+        self.loaded_at = None
+        self.stop_event = threading.Event()
+    
+    @staticmethod
+    def _key(user_id, source):
+        return f"{user_id}:{source}"
+    
+    def _push(self, state):
+        """Queue a state at its due time."""
+        heapq.heappush(self.heap, (state['next_due'], self._key(state['user_id'], state['source'])))
+    
+    def load(self):
+        """Load all states from the database, picking up users scheduled by other processes."""
+        self.states = {}
+        self.heap = []
+        for state in self.db.get_refresh_states():
+            self.states[self._key(state['user_id'], state['source'])] = state
+            self._push(state)
+        self.loaded_at = time.time()
+    
+    def schedule_user(self, user_id, sources):
+        """Register a user's sources (as for collect_all_data) for refreshing, due now if new."""
+        for source, field in REFRESH_SOURCES.items():
+            target = sources.get(field)
+            if not target:
+                continue
+            
+            key = self._key(user_id, source)
+            state = self.states.get(key)
+            if state is None:
+                state = {
+                    'user_id': user_id,
+                    'source': source,
+                    'target': target,
+                    'next_due': time.time(),
+                    'last_run': None,
+                    'item_count': None,
+                    'change_rate': None,
+                    'posts_per_day': None,
+                    'hour_distribution': None,
+                    'runs': 0,
+                    'failures': 0
+                }
+            else:
+                state['target'] = target
+            
+            self.states[key] = state
+            self.db.save_refresh_state(state)
+            self._push(state)
+    
+    def _count_items(self, user_id, source):
+        """Number of stored items of a source, without loading them."""
+        if source == 'twitter':
+            return self.db.count_tweets(user_id)
+        return self.db.count_web_content(user_id)
+    
+    def _new_items(self, state, before, started):
+        """Number of items a collection added or changed."""
+        if state['source'] == 'twitter':
+            # Tweets never change, so new tweets are the growth of the stored count
+            return max(self._count_items(state['user_id'], 'twitter') - before, 0)
+        
+        # Re-crawled pages replace their stored version, so count pages whose text changed
+        return self.db.count_web_content(state['user_id'], changed_since=datetime.fromtimestamp(started))
+    
+    def _collect(self, states):
+        """Re-collect due sources, returning user source key -> success.
+        
+        Due Twitter users are collected together, so their timelines share
+        the rate limit fairly; web sources are collected one at a time.
+        """
+        results = {}
+        
+        accounts = {state['user_id']: state['target'] for state in states if state['source'] == 'twitter'}
+        if accounts:
+            try:
+                collected = self.collector.collect_twitter_data_for_users(accounts)
+            except Exception as e:
+                print(f"Error refreshing twitter for {len(accounts)} users: {str(e)}")
+                collected = {}
+            for user_id in accounts:
+                results[self._key(user_id, 'twitter')] = collected.get(user_id, False)
+        
+        for state in states:
+            if state['source'] != 'web':
+                continue
+            try:
+                success = self.collector.collect_web_content(state['target'], state['user_id'], resume=True)
+            except Exception as e:
+                print(f"Error refreshing web for {state['user_id']}: {str(e)}")
+                success = False
+            results[self._key(state['user_id'], 'web')] = success
+        
+        return results
+    
+    def _posting_patterns(self, user_id):
+        """Posting patterns of a user's recent tweets, or None."""
+        if self.analyzer is None:
+            return None
+        tweets = list(self.db.iter_tweets(user_id, fields=['created_at'], limit=config.REFRESH_PATTERN_TWEETS))
+        return self.analyzer.analyze_posting_patterns(tweets)
+    
+    def refresh(self, state):
+        """Collect a due source, update its observed rates and schedule its next run."""
+        return self.refresh_all([state])[self._key(state['user_id'], state['source'])]
+    
+    def refresh_all(self, states):
+        """Collect due sources together, then update and reschedule each, returning key -> success."""
+        before = {
+            self._key(state['user_id'], state['source']):
+                self._count_items(state['user_id'], state['source']) if state['item_count'] is None else state['item_count']
+            for state in states
+        }
+        
+        started = time.time()
+        results = self._collect(states)
+        for state in states:
+            key = self._key(state['user_id'], state['source'])
+            self._reschedule(state, results[key], before[key], started)
+        return results
+    
+    def _reschedule(self, state, success, before, started):
+        """Update a collected source's observed rates and schedule its next run."""
+        user_id = state['user_id']
+        source = state['source']
+        
+        # Observed new items per day since the last run, smoothed over runs
+        if success and state['last_run'] is not None:
+            days = max(started - state['last_run'], 1.0) / 86400
+            observed = self._new_items(state, before, started) / days
+            if state['change_rate'] is None:
+                state['change_rate'] = observed
+            else:
+                alpha = config.REFRESH_RATE_SMOOTHING
+                state['change_rate'] = alpha * observed + (1 - alpha) * state['change_rate']
+        
+        if source == 'twitter' and success:
+            patterns = self._posting_patterns(user_id)
+            if patterns:
+                state['posts_per_day'] = patterns['posts_per_day']
+                state['hour_distribution'] = {str(hour): count for hour, count in patterns['hour_distribution'].items()}
+        
+        state['runs'] += 1
+        state['item_count'] = self._count_items(user_id, source)
+        if success:
+            state['last_run'] = started
+            state['failures'] = 0
+        else:
+            state['failures'] = state.get('failures', 0) + 1
+        
+        # Blend the long-term posting rate with the recently observed change rate
+        rates = [rate for rate in (state['change_rate'], state['posts_per_day']) if rate is not None]
+        if not success:
+            # Back off exponentially, so sources that keep failing are not retried every hour
+            delay = config.REFRESH_RETRY_SECONDS * 2 ** (state['failures'] - 1)
+            next_due = time.time() + min(delay, config.MAX_REFRESH_INTERVAL)
+        elif rates:
+            rate = sum(rates) / len(rates)
+            next_due = next_content_time(time.time(), rate, state['hour_distribution'])
+        else:
+            next_due = time.time() + config.DEFAULT_REFRESH_INTERVAL
+        state['next_due'] = next_due
+        
+        self.db.save_refresh_state(state)
+        self._push(state)
+    
+    def run_due(self, limit=None):
+        """Refresh every due source, earliest first, returning the number refreshed."""
+        due_states = []
+        while self.heap and self.heap[0][0] <= time.time() and not self.stop_event.is_set():
+            if limit is not None and len(due_states) >= limit:
+                break
+            due, key = heapq.heappop(self.heap)
+            state = self.states.get(key)
+            
+            # Skip entries superseded by a later reschedule
+            if state is None or state['next_due'] != due:
+                continue
+            
+            due_states.append(state)
+        
+        if due_states:
+            self.refresh_all(due_states)
+        return len(due_states)
+    
+    def run(self):
+        """Run as a daemon loop until stop() is called."""
+        self.load()
+        while not self.stop_event.is_set():
+            self.run_due()
+            
+            if time.time() - self.loaded_at >= config.REFRESH_RELOAD_SECONDS:
+                self.load()
+            
+            # Sleep until the next source is due, waking up to reload new registrations
+            wait = config.REFRESH_RELOAD_SECONDS
+            if self.heap:
+                wait = min(wait, max(0.0, self.heap[0][0] - time.time()))
+            self.stop_event.wait(wait)
+    
+    def stop(self):
+        """Stop the daemon loop after the current refresh."""
+        self.stop_event.set()
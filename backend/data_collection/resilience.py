@@ -0,0 +1,170 @@
+"""
+Retries with backoff, per-host circuit breakers and job time budgets for outbound calls.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from . import config
+
+# Status codes worth retrying: rate limiting and server-side failures
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+class CircuitOpenError(Exception):
+    """Raised when a host's circuit breaker is open."""
+
+class DeadlineExceeded(Exception):
+    """Raised when a job has used up its time budget."""
+
+class Deadline:
+    """Total time budget for a job, shared by all of its calls."""
+    
+    def __init__(self, seconds=None):
+        """Start a budget of `seconds` (default config.MAX_JOB_SECONDS)."""
+        self.expires_at = time.monotonic() + (seconds if seconds is not None else config.MAX_JOB_SECONDS)
+    
+    def remaining(self):
+        """Seconds left in the budget."""
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def expired(self):
+        """Check whether the budget is used up."""
+        return self.remaining() <= 0
+
+class CircuitBreaker:
+    """Stops calls to a host after repeated failures, retrying it after a cool-down.
+    
+    After `threshold` consecutive failures the circuit opens and calls fail
+    fast for `reset_seconds`; then one trial call is let through, closing the
+    circuit on success or reopening it on failure.
+    """
+    
+    def __init__(self, threshold=None, reset_seconds=None):
+        """Initialize a closed circuit."""
+        self.threshold = threshold or config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_seconds = reset_seconds or config.CIRCUIT_RESET_SECONDS
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+    
+    def allow(self):
+        """Check whether a call may go ahead."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                # Half-open: let one trial call through
+                self.opened_at = time.monotonic()
+                return True
+            return False
+    
+    def record_success(self):
+        """Close the circuit."""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+    
+    def record_failure(self):
+        """Count a failure, opening the circuit at the threshold."""
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(url_or_host):
+    """Get the process-wide circuit breaker for a URL's host."""
+    host = urlparse(url_or_host).netloc or url_or_host
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker()
+        return _breakers[host]
+
+def _status_code(error):
+    """HTTP status of a failed call (requests or tweepy exceptions), or None."""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+def is_retryable(error):
+    """Check whether a failed call is worth retrying."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    
+    # Connection errors and timeouts have no response; match requests' exception names too
+    return isinstance(error, (ConnectionError, TimeoutError)) or \
+        type(error).__name__ in ('ConnectionError', 'Timeout', 'ReadTimeout', 'ConnectTimeout', 'ChunkedEncodingError')
+
+def retry_after(error):
+    """Seconds the server asked us to wait, from Retry-After or rate limit reset headers."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    
+    value = headers.get('Retry-After')
+    if value:
+        if value.strip().isdigit():
+            return float(value)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    
+    # Twitter reports the epoch second its rate limit window resets
+    reset = headers.get('x-rate-limit-reset')
+    if reset and reset.isdigit():
+        return max(0.0, int(reset) - time.time())
+    
+    return None
+
+def backoff_delay(attempt, base_delay=None, max_delay=None):
+    """Exponential backoff with full jitter for a 0-based retry attempt."""
+    base_delay = config.RETRY_DELAY if base_delay is None else base_delay
+    max_delay = config.MAX_RETRY_DELAY if max_delay is None else max_delay
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+def call_with_retries(func, host=None, deadline=None, retries=None, base_delay=None):
+    """Call func(), retrying transient failures with backoff.
+    
+    Honors Retry-After, skips hosts whose circuit breaker is open, and
+    never sleeps past the deadline, or without one longer than
+    config.MAX_RETRY_AFTER. Non-retryable errors are raised immediately;
+    the last error is raised once retries are exhausted.
+    """
+    retries = config.MAX_RETRIES if retries is None else retries
+    breaker = get_breaker(host) if host else None
+    attempt = 0
+    
+    while True:
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded(f"Time budget exhausted before calling {host or 'service'}")
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {host}")
+        
+        try:
+            result = func()
+        except Exception as e:
+            retryable = is_retryable(e)
+            if breaker is not None and retryable:
+                breaker.record_failure()
+            if not retryable or attempt >= retries:
+                raise
+            
+            delay = retry_after(e)
+            if delay is None:
+                delay = backoff_delay(attempt, base_delay)
+            elif deadline is None and delay > config.MAX_RETRY_AFTER:
+                # Without a job budget, give up rather than block for the server's full wait
+                raise
+            if deadline is not None and delay >= deadline.remaining():
+                raise DeadlineExceeded(f"Retrying {host or 'service'} would exceed the time budget") from e
+            
+            time.sleep(delay)
+            attempt += 1
+            continue
+        
+        if breaker is not None:
+            breaker.record_success()
+        return result
@@ -0,0 +1,184 @@
+"""
+Per-user daily rollups of tweet activity with fast time-window queries.
+"""
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+
+# Counters kept per day, followed by a 24-bucket hour histogram
+ROLLUP_METRICS = ('posts', 'likes', 'retweets', 'replies')
+HOURS = 24
+
+def tweet_day_and_hour(tweet):
+    """Get the UTC day ('YYYY-MM-DD') and hour of a tweet, or (None, None)."""
+    created_at = tweet.get('created_at')
+    if isinstance(created_at, str):
+        try:
+            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        except ValueError:
+            return None, None
+    if not isinstance(created_at, datetime):
+        return None, None
+    
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    
+    return created_at.date().isoformat(), created_at.hour
+
+def rollup_increments(tweets):
+    """Group tweets into per-day counter increments for rollup documents."""
+    increments = {}
+    
+    for tweet in tweets:
+        day, hour = tweet_day_and_hour(tweet)
+        if day is None:
+            continue
+        
+        inc = increments.setdefault(day, {})
+        inc['posts'] = inc.get('posts', 0) + 1
+        inc['likes'] = inc.get('likes', 0) + (tweet.get('favorite_count') or 0)
+        inc['retweets'] = inc.get('retweets', 0) + (tweet.get('retweet_count') or 0)
+        inc['replies'] = inc.get('replies', 0) + (1 if tweet.get('is_reply') else 0)
+        hour_key = f'hours.{hour}'
+        inc[hour_key] = inc.get(hour_key, 0) + 1
+    
+    return increments
+
+class FenwickTree:
+    """Binary indexed tree over rows of fixed-width integer vectors."""
+    
+    def __init__(self, size, width):
+        """Initialize an all-zero tree with `size` positions."""
+        self.size = size
+        self.tree = np.zeros((size + 1, width), dtype=np.int64)
+    
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a tree from a 2D array of per-position values in O(n)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        fenwick = cls(rows.shape[0], rows.shape[1])
+        fenwick.tree[1:] = rows
+        for i in range(1, fenwick.size + 1):
+            parent = i + (i & -i)
+            if parent <= fenwick.size:
+                fenwick.tree[parent] += fenwick.tree[i]
+        return fenwick
+    
+    def add(self, position, values):
+        """Add a vector of values at a 0-based position."""
+        i = position + 1
+        while i <= self.size:
+            self.tree[i] += values
+            i += i & -i
+    
+    def prefix(self, position):
+        """Sum of positions [0, position)."""
+        total = np.zeros(self.tree.shape[1], dtype=np.int64)
+        i = min(position, self.size)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+    
+    def range(self, start, end):
+        """Sum of positions [start, end)."""
+        return self.prefix(end) - self.prefix(start)
+
+class RollupIndex:
+    """Window queries over one user's daily rollups in O(log n) per query."""
+    
+    def __init__(self, first_day, rows):
+        """Initialize index from a per-day metrics matrix starting at `first_day`."""
+        self.first_day = first_day
+        self.fenwick = FenwickTree.from_rows(rows)
+    
+    @classmethod
+    def from_documents(cls, documents, margin_days=365):
+        """Build an index from daily rollup documents."""
+        rows = {}
+        for document in documents:
+            rows[date.fromisoformat(document['day'])] = cls._to_row(document)
+        
+        first_day = min(rows) if rows else datetime.now(timezone.utc).date()
+        days = (max(rows) - first_day).days + 1 + margin_days if rows else margin_days
+        
+        matrix = np.zeros((days, len(ROLLUP_METRICS) + HOURS), dtype=np.int64)
+        for day, row in rows.items():
+            matrix[(day - first_day).days] = row
+        
+        return cls(first_day, matrix)
+    
+    @staticmethod
+    def _to_row(document):
+        """Flatten a rollup document or increment into a metrics vector."""
+        row = np.zeros(len(ROLLUP_METRICS) + HOURS, dtype=np.int64)
+        for i, metric in enumerate(ROLLUP_METRICS):
+            row[i] = document.get(metric, 0)
+        
+        hours = document.get('hours', {})
+        for hour, count in hours.items():
+            row[len(ROLLUP_METRICS) + int(hour)] = count
+        
+        # Dotted keys as produced by rollup_increments
+        for key, count in document.items():
+            if key.startswith('hours.'):
+                row[len(ROLLUP_METRICS) + int(key[6:])] = count
+        
+        return row
+    
+    def add(self, day, increment):
+        """Apply a rollup increment for a 'YYYY-MM-DD' day."""
+        day = date.fromisoformat(day)
+        position = (day - self.first_day).days
+        
+        if position < 0 or position >= self.fenwick.size:
+            self._grow(day)
+            position = (day - self.first_day).days
+        
+        self.fenwick.add(position, self._to_row(increment))
+    
+    def _grow(self, day):
+        """Rebuild the index so that it covers `day`."""
+        size = self.fenwick.size
+        rows = np.array([self.fenwick.range(i, i + 1) for i in range(size)]).reshape(size, -1)
+        
+        first_day = min(self.first_day, day)
+        shift = (self.first_day - first_day).days
+        days = max(shift + size, (day - first_day).days + 1) * 2
+        
+        matrix = np.zeros((days, rows.shape[1]), dtype=np.int64)
+        matrix[shift:shift + size] = rows
+        
+        self.first_day = first_day
+        self.fenwick = FenwickTree.from_rows(matrix)
+    
+    def window(self, start, end):
+        """Aggregate rollups for days in [start, end), given as dates or ISO strings."""
+        if isinstance(start, str):
+            start = date.fromisoformat(start)
+        if isinstance(end, str):
+            end = date.fromisoformat(end)
+        
+        days = (end - start).days
+        low = max((start - self.first_day).days, 0)
+        high = max((end - self.first_day).days, 0)
+        totals = self.fenwick.range(low, high) if high > low else np.zeros(self.fenwick.tree.shape[1], dtype=np.int64)
+        
+        result = {metric: int(totals[i]) for i, metric in enumerate(ROLLUP_METRICS)}
+        result['days'] = days
+        result['posts_per_day'] = result['posts'] / days if days > 0 else 0
+        result['avg_likes'] = result['likes'] / result['posts'] if result['posts'] else 0
+        result['avg_retweets'] = result['retweets'] / result['posts'] if result['posts'] else 0
+        result['hour_distribution'] = {
+            hour: int(count) for hour, count in enumerate(totals[len(ROLLUP_METRICS):]) if count
+        }
+        return result
+    
+    def last_days(self, days, end=None):
+        """Aggregate rollups for the `days` days up to and including `end` (default today, UTC)."""
+        if end is None:
+            end = datetime.now(timezone.utc).date()
+        elif isinstance(end, str):
+            end = date.fromisoformat(end)
+        
+        end = end + timedelta(days=1)
+        return self.window(end - timedelta(days=days), end)
@@ -0,0 +1,346 @@
+"""
+Per-user BM25 retrieval index over collected content for chat grounding.
+"""
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import uuid
+import numpy as np
+from . import config
+
+# Segment file layout: header, doc lengths, postings, JSON metadata
+SEGMENT_MAGIC = b'LKIX'
+SEGMENT_VERSION = 1
+SEGMENT_HEADER = struct.Struct('<4sHIIQQ')
+
+TOKEN_PATTERN = re.compile(r'[^\W\d_]+')
+
+def tokenize(text):
+    """Split text into lowercase word tokens, matching ContentProcessor.clean_text."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def tweet_passages(processed_tweet):
+    """Passages for a tweet processed by ContentProcessor.process_tweet."""
+    tokens = tokenize(processed_tweet.get('clean_text', '')) + processed_tweet.get('keywords', [])
+    return [{
+        'source': f"tweet:{processed_tweet['id']}",
+        'text': processed_tweet.get('text', ''),
+        'created_at': processed_tweet.get('created_at'),
+        'tokens': tokens
+    }]
+
+def web_passages(processed_page):
+    """Passages for a page processed by ContentProcessor.process_web_content."""
+    source = f"web:{processed_page['url']}"
+    keywords = processed_page.get('keywords', [])
+    title = processed_page.get('title') or ''
+    passages = []
+    
+    heading = ' '.join(part for part in [title, processed_page.get('description') or ''] if part)
+    if heading:
+        passages.append({'source': source, 'url': processed_page['url'], 'text': heading,
+                         'tokens': tokenize(heading) + keywords})
+    
+    for sentence in processed_page.get('key_sentences', []):
+        passages.append({'source': source, 'url': processed_page['url'], 'title': title, 'text': sentence,
+                         'tokens': tokenize(sentence)})
+    
+    return passages
+
+class IndexSegment:
+    """Immutable on-disk index segment, read through mmap."""
+    
+    def __init__(self, path):
+        """Open a segment file."""
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, self.doc_count, self.term_count, postings_offset, meta_offset = \
+            SEGMENT_HEADER.unpack_from(self._mmap, 0)
+        if magic != SEGMENT_MAGIC or version > SEGMENT_VERSION:
+            raise ValueError(f"Unsupported index segment: {path}")
+        
+        self.doc_lengths = np.frombuffer(self._mmap, dtype=np.uint32, count=self.doc_count,
+                                         offset=SEGMENT_HEADER.size)
+        self._postings_offset = postings_offset
+        
+        meta = json.loads(self._mmap[meta_offset:].decode('utf-8'))
+        self.terms = meta['terms']
+        self.docs = meta['docs']
+    
+    @staticmethod
+    def write(path, passages):
+        """Write passages as a new segment file."""
+        postings = {}
+        doc_lengths = np.zeros(len(passages), dtype=np.uint32)
+        
+        for doc_id, passage in enumerate(passages):
+            doc_lengths[doc_id] = len(passage['tokens'])
+            counts = {}
+            for token in passage['tokens']:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings.setdefault(token, ([], []))
+                postings[token][0].append(doc_id)
+                postings[token][1].append(min(count, 0xFFFF))
+        
+        IndexSegment._write_postings(
+            path, doc_lengths,
+            ((term, np.array(ids, dtype=np.uint32), np.array(tfs, dtype=np.uint16))
+             for term, (ids, tfs) in sorted(postings.items())),
+            [{key: value for key, value in passage.items() if key != 'tokens'} for passage in passages]
+        )
+    
+    @staticmethod
+    def _write_postings(path, doc_lengths, term_postings, docs):
+        """Write a segment from per-term (doc ids, term frequencies) arrays."""
+        terms = {}
+        chunks = []
+        offset = 0
+        
+        for term, doc_ids, tfs in term_postings:
+            terms[term] = [offset, len(doc_ids)]
+            chunks.append(doc_ids.astype('<u4').tobytes())
+            chunks.append(tfs.astype('<u2').tobytes())
+            offset += len(doc_ids) * 6
+        
+        lengths = doc_lengths.astype('<u4').tobytes()
+        postings_offset = SEGMENT_HEADER.size + len(lengths)
+        meta_offset = postings_offset + offset
+        meta = json.dumps({'terms': terms, 'docs': docs}, separators=(',', ':')).encode('utf-8')
+        
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, len(doc_lengths), len(terms),
+                                        postings_offset, meta_offset))
+            f.write(lengths)
+            for chunk in chunks:
+                f.write(chunk)
+            f.write(meta)
+        os.replace(temp_path, path)
+    
+    def postings(self, term):
+        """Get (doc ids, term frequencies) arrays for a term, without copying."""
+        entry = self.terms.get(term)
+        if entry is None:
+            return None, None
+        
+        offset, df = entry
+        start = self._postings_offset + offset
+        doc_ids = np.frombuffer(self._mmap, dtype=np.uint32, count=df, offset=start)
+        tfs = np.frombuffer(self._mmap, dtype=np.uint16, count=df, offset=start + df * 4)
+        return doc_ids, tfs
+    
+    def close(self):
+        """Close the segment file."""
+        self.doc_lengths = None
+        self._mmap.close()
+        self._file.close()
+
+class ContentIndex:
+    """Incrementally updated BM25 index over one user's tweets and web pages.
+    
+    New items are buffered and flushed as immutable segment files; a JSON
+    manifest lists the live segments and deleted passages. Segments are
+    merged once there are more than config.MAX_INDEX_SEGMENTS.
+    """
+    
+    def __init__(self, user_id, directory=None):
+        """Open (or create) the index for a user."""
+        self.user_id = user_id
+        self.directory = os.path.join(directory or config.INDEX_DIRECTORY, str(user_id))
+        os.makedirs(self.directory, exist_ok=True)
+        
+        self.manifest_path = os.path.join(self.directory, 'manifest.json')
+        self.manifest = {'segments': [], 'deleted': {}}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        
+        self.segments = {name: IndexSegment(os.path.join(self.directory, name))
+                         for name in self.manifest['segments']}
+        self.pending = []
+        
+        # Where each source's passages currently live
+        self.sources = {}
+        for name, segment in self.segments.items():
+            deleted = set(self.manifest['deleted'].get(name, []))
+            for doc_id, doc in enumerate(segment.docs):
+                if doc_id not in deleted:
+                    self.sources.setdefault(doc['source'], []).append((name, doc_id))
+    
+    def add_tweets(self, processed_tweets):
+        """Queue processed tweets for indexing."""
+        for tweet in processed_tweets:
+            self._add_passages(tweet_passages(tweet))
+    
+    def add_web_content(self, processed_pages):
+        """Queue processed web pages for indexing."""
+        for page in processed_pages:
+            self._add_passages(web_passages(page))
+    
+    def _add_passages(self, passages):
+        """Queue passages, replacing any earlier version of the same source."""
+        if not passages:
+            return
+        
+        source = passages[0]['source']
+        self.pending = [passage for passage in self.pending if passage['source'] != source]
+        for name, doc_id in self.sources.pop(source, []):
+            self.manifest['deleted'].setdefault(name, []).append(doc_id)
+        
+        self.pending.extend(passages)
+    
+    def flush(self):
+        """Write queued passages to a new segment and update the manifest."""
+        if self.pending:
+            name = f'{uuid.uuid4().hex}.seg'
+            IndexSegment.write(os.path.join(self.directory, name), self.pending)
+            segment = IndexSegment(os.path.join(self.directory, name))
+            self.segments[name] = segment
+            self.manifest['segments'].append(name)
+            for doc_id, doc in enumerate(segment.docs):
+                self.sources.setdefault(doc['source'], []).append((name, doc_id))
+            self.pending = []
+        
+        if len(self.segments) > config.MAX_INDEX_SEGMENTS:
+            self.merge()
+        else:
+            self._save_manifest()
+    
+    def _save_manifest(self):
+        """Atomically write the manifest."""
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(temp_path, self.manifest_path)
+    
+    def merge(self):
+        """Merge all segments into one, dropping deleted passages."""
+        if not self.segments:
+            return
+        
+        docs = []
+        doc_lengths = []
+        remaps = {}
+        for name in self.manifest['segments']:
+            segment = self.segments[name]
+            remap = np.full(segment.doc_count, -1, dtype=np.int64)
+            deleted = set(self.manifest['deleted'].get(name, []))
+            for doc_id in range(segment.doc_count):
+                if doc_id not in deleted:
+                    remap[doc_id] = len(docs)
+                    docs.append(segment.docs[doc_id])
+                    doc_lengths.append(int(segment.doc_lengths[doc_id]))
+            remaps[name] = remap
+        
+        def merged_postings():
+            terms = sorted(set().union(*(segment.terms for segment in self.segments.values())))
+            for term in terms:
+                all_ids = []
+                all_tfs = []
+                for name in self.manifest['segments']:
+                    doc_ids, tfs = self.segments[name].postings(term)
+                    if doc_ids is None:
+                        continue
+                    new_ids = remaps[name][doc_ids]
+                    live = new_ids >= 0
+                    all_ids.append(new_ids[live])
+                    all_tfs.append(tfs[live])
+                doc_ids = np.concatenate(all_ids) if all_ids else np.array([], dtype=np.int64)
+                if doc_ids.size:
+                    yield term, doc_ids, np.concatenate(all_tfs)
+        
+        name = f'{uuid.uuid4().hex}.seg'
+        IndexSegment._write_postings(os.path.join(self.directory, name),
+                                     np.array(doc_lengths, dtype=np.uint32), merged_postings(), docs)
+        
+        old_names = list(self.manifest['segments'])
+        for segment in self.segments.values():
+            segment.close()
+        
+        self.manifest = {'segments': [name], 'deleted': {}}
+        self._save_manifest()
+        for old_name in old_names:
+            os.remove(os.path.join(self.directory, old_name))
+        
+        segment = IndexSegment(os.path.join(self.directory, name))
+        self.segments = {name: segment}
+        self.sources = {}
+        for doc_id, doc in enumerate(segment.docs):
+            self.sources.setdefault(doc['source'], []).append((name, doc_id))
+    
+    def search(self, query, top_k=5):
+        """Get the top_k passages for a query, ranked by BM25."""
+        terms = set(tokenize(query))
+        if not terms or not self.segments:
+            return []
+        
+        live = {}
+        total_docs = 0
+        total_length = 0
+        for name, segment in self.segments.items():
+            mask = np.ones(segment.doc_count, dtype=bool)
+            deleted = self.manifest['deleted'].get(name)
+            if deleted:
+                mask[deleted] = False
+            live[name] = mask
+            total_docs += int(mask.sum())
+            total_length += int(segment.doc_lengths[mask].sum())
+        
+        if not total_docs:
+            return []
+        avg_length = total_length / total_docs
+        
+        # Document frequencies of live passages across segments, so replaced versions do not count
+        postings = {}
+        doc_freq = dict.fromkeys(terms, 0)
+        for name, segment in self.segments.items():
+            has_deleted = bool(self.manifest['deleted'].get(name))
+            for term in terms:
+                doc_ids, tfs = segment.postings(term)
+                if doc_ids is None:
+                    continue
+                postings[name, term] = doc_ids, tfs
+                doc_freq[term] += int(live[name][doc_ids].sum()) if has_deleted else len(doc_ids)
+        
+        k1 = config.BM25_K1
+        b = config.BM25_B
+        candidates = []
+        
+        for name, segment in self.segments.items():
+            scores = np.zeros(segment.doc_count, dtype=np.float64)
+            norm = k1 * (1 - b + b * segment.doc_lengths / avg_length)
+            
+            for term in terms:
+                if (name, term) not in postings:
+                    continue
+                doc_ids, tfs = postings[name, term]
+                idf = math.log(1 + (total_docs - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                tf = tfs.astype(np.float64)
+                scores[doc_ids] += idf * tf * (k1 + 1) / (tf + norm[doc_ids])
+            
+            scores[~live[name]] = 0
+            matched = np.flatnonzero(scores)
+            if matched.size > top_k:
+                matched = matched[np.argpartition(-scores[matched], top_k)[:top_k]]
+            candidates.extend((float(scores[doc_id]), name, int(doc_id)) for doc_id in matched)
+        
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        
+        results = []
+        for score, name, doc_id in candidates[:top_k]:
+            passage = dict(self.segments[name].docs[doc_id])
+            passage['score'] = score
+            results.append(passage)
+        return results
+    
+    def close(self):
+        """Close all segment files."""
+        for segment in self.segments.values():
+            segment.close()
+        self.segments = {}
@@ -0,0 +1,232 @@
+"""
+Crawl frontier shared by several collection nodes through MongoDB.
+"""
+import os
+import socket
+import threading
+import time
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from urllib.parse import urlparse
+from . import config
+
+# Frontier collections whose indexes were created by this process
+_indexed = set()
+_indexed_lock = threading.Lock()
+
+def _ensure_indexes(urls):
+    """Create the indexes of a frontier URL collection once per process."""
+    with _indexed_lock:
+        if urls.full_name in _indexed:
+            return
+        urls.create_index([('crawl_id', ASCENDING), ('url', ASCENDING)], unique=True)
+        urls.create_index([('crawl_id', ASCENDING), ('state', ASCENDING),
+                           ('priority', DESCENDING), ('seq', ASCENDING)])
+        _indexed.add(urls.full_name)
+
+class SharedFrontier:
+    """Crawl frontier stored in MongoDB, leased URL by URL to cooperating workers.
+    
+    Workers atomically lease the highest-priority queued URL and ack it once
+    fetched, or fail it to have it fetched again. Leases are renewed in the
+    background while the worker holds them; leases of crashed workers expire
+    after `lease_seconds`. A URL is handed out at most
+    config.MAX_LEASE_ATTEMPTS times. Requests
+    to a host are spaced across all workers through a shared per-host
+    reservation, so workers move on to URLs of other hosts while a host is
+    cooling down. Worker clocks are assumed to be roughly in sync.
+    
+    Has the same push/pop/ack/fail/len/contains interface as CrawlFrontier.
+    """
+    
+    # pop() already reserved the host's request slot across workers
+    reserves_hosts = True
+    
+    def __init__(self, urls, hosts, crawl_id, score=None, interval=None, worker_id=None, lease_seconds=None):
+        """Initialize frontier on the `urls` and `hosts` collections.
+        
+        `score(url, anchor_text, depth)` ranks URLs and `interval(url)` gives
+        the minimum seconds between requests to a URL's host.
+        """
+        self.urls = urls
+        self.hosts = hosts
+        self.crawl_id = crawl_id
+        self.score = score
+        self.interval = interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds or config.FRONTIER_LEASE_SECONDS
+        
+        # URLs this worker already queued, to save round trips
+        self.seen = set()
+        
+        # URLs leased by this worker, renewed by a heartbeat thread
+        self.leased = set()
+        self.leased_lock = threading.Lock()
+        self.heartbeat = None
+        self.stop_event = threading.Event()
+        
+        _ensure_indexes(self.urls)
+    
+    def push(self, url, depth=0, anchor_text=''):
+        """Queue a URL unless some worker queued it before."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        
+        priority = self.score(url, anchor_text, depth) if self.score else 0.0
+        try:
+            result = self.urls.update_one(
+                {'crawl_id': self.crawl_id, 'url': url},
+                {'$setOnInsert': {
+                    'host': urlparse(url).netloc,
+                    'depth': depth,
+                    'priority': priority,
+                    'seq': time.time(),
+                    'state': 'queued',
+                    'attempts': 0
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another worker inserted it concurrently
+            return False
+        return result.upserted_id is not None
+    
+    def _lease(self, busy_hosts):
+        """Lease the best available URL on a host not known to be cooling down."""
+        now = time.time()
+        return self.urls.find_one_and_update(
+            {
+                'crawl_id': self.crawl_id,
+                'host': {'$nin': list(busy_hosts)},
+                'attempts': {'$lt': config.MAX_LEASE_ATTEMPTS},
+                '$or': [
+                    {'state': 'queued'},
+                    {'state': 'leased', 'lease_expires': {'$lt': now}}
+                ]
+            },
+            {
+                '$set': {'state': 'leased', 'worker': self.worker_id, 'lease_expires': now + self.lease_seconds},
+                '$inc': {'attempts': 1}
+            },
+            sort=[('priority', DESCENDING), ('seq', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+    
+    def _release(self, url):
+        """Put a leased URL back in the queue without counting the attempt."""
+        self._forget(url)
+        self.urls.update_one(
+            {'crawl_id': self.crawl_id, 'url': url, 'worker': self.worker_id},
+            {'$set': {'state': 'queued', 'worker': None}, '$inc': {'attempts': -1}}
+        )
+    
+    def _hold(self, url):
+        """Track a leased URL, starting the heartbeat that renews leases if needed."""
+        with self.leased_lock:
+            self.leased.add(url)
+            if self.heartbeat is None:
+                self.heartbeat = threading.Thread(target=self._renew_leases, daemon=True)
+                self.heartbeat.start()
+    
+    def _forget(self, url):
+        """Stop tracking a URL that is no longer leased."""
+        with self.leased_lock:
+            self.leased.discard(url)
+    
+    def _renew_leases(self):
+        """Extend this worker's leases well before they expire, until close()."""
+        while not self.stop_event.wait(self.lease_seconds / 3):
+            with self.leased_lock:
+                urls = list(self.leased)
+            if not urls:
+                continue
+            try:
+                self.urls.update_many(
+                    {'crawl_id': self.crawl_id, 'url': {'$in': urls}, 'worker': self.worker_id, 'state': 'leased'},
+                    {'$set': {'lease_expires': time.time() + self.lease_seconds}}
+                )
+            except Exception as e:
+                print(f"Error renewing frontier leases: {str(e)}")
+    
+    def _reserve_host(self, url):
+        """Reserve the next request slot of a URL's host, returning 0 or the seconds until it is free."""
+        host = urlparse(url).netloc
+        interval = self.interval(url) if self.interval else config.MIN_HOST_INTERVAL
+        now = time.time()
+        try:
+            # Matches only when the host is free; otherwise the upsert collides with the existing slot
+            self.hosts.find_one_and_update(
+                {'_id': host, 'next_request': {'$lte': now}},
+                {'$set': {'next_request': now + interval}},
+                upsert=True
+            )
+            return 0.0
+        except DuplicateKeyError:
+            slot = self.hosts.find_one({'_id': host})
+            return max(0.0, slot['next_request'] - now) if slot else 0.0
+    
+    def pop(self):
+        """Lease the highest-priority (url, depth) whose host may be fetched now.
+        
+        Blocks while all remaining URLs are leased by other workers or wait on
+        their host; returns None once the crawl has no URLs left.
+        """
+        busy_hosts = {}
+        while True:
+            now = time.time()
+            busy_hosts = {host: free_at for host, free_at in busy_hosts.items() if free_at > now}
+            
+            leased = self._lease(busy_hosts)
+            if leased is None:
+                if not len(self):
+                    return None
+                # Wait for a host to cool down or for other workers to ack or queue URLs
+                wait = min(busy_hosts.values()) - now if busy_hosts else config.FRONTIER_POLL_SECONDS
+                time.sleep(max(0.0, min(wait, config.FRONTIER_POLL_SECONDS)))
+                continue
+            
+            self._hold(leased['url'])
+            wait = self._reserve_host(leased['url'])
+            if not wait:
+                return leased['url'], leased['depth']
+            
+            self._release(leased['url'])
+            busy_hosts[leased['host']] = now + wait
+    
+    def ack(self, url):
+        """Mark a leased URL as done."""
+        self._forget(url)
+        self.urls.update_one(
+            {'crawl_id': self.crawl_id, 'url': url, 'worker': self.worker_id},
+            {'$set': {'state': 'done'}, '$unset': {'lease_expires': ''}}
+        )
+    
+    def fail(self, url):
+        """Requeue a leased URL whose fetch failed, or give up on it after its last attempt."""
+        self._forget(url)
+        leased = {'crawl_id': self.crawl_id, 'url': url, 'worker': self.worker_id, 'state': 'leased'}
+        result = self.urls.update_one(
+            dict(leased, attempts={'$lt': config.MAX_LEASE_ATTEMPTS}),
+            {'$set': {'state': 'queued', 'worker': None}, '$unset': {'lease_expires': ''}}
+        )
+        if not result.modified_count:
+            self.urls.update_one(leased, {'$set': {'state': 'failed'}, '$unset': {'lease_expires': ''}})
+    
+    def close(self):
+        """Stop renewing leases."""
+        self.stop_event.set()
+    
+    def __len__(self):
+        """Number of URLs queued or still leased."""
+        return self.urls.count_documents({
+            'crawl_id': self.crawl_id,
+            '$or': [
+                {'state': 'queued'},
+                {'state': 'leased', 'lease_expires': {'$gte': time.time()}},
+                {'state': 'leased', 'attempts': {'$lt': config.MAX_LEASE_ATTEMPTS}}
+            ]
+        })
+    
+    def __contains__(self, url):
+        return url in self.seen or self.urls.count_documents({'crawl_id': self.crawl_id, 'url': url}, limit=1) > 0
@@ -0,0 +1,51 @@
+"""
+Parsing of XML sitemaps and sitemap indexes.
+"""
+import zlib
+from datetime import datetime, timezone
+from xml.etree import ElementTree
+from . import config
+
+def decompress_sitemap(body):
+    """Decompress a gzipped sitemap, leaving plain XML unchanged."""
+    if not body.startswith(b'\x1f\x8b'):
+        return body
+    
+    # Bound the output so a small archive cannot expand without limit
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = decompressor.decompress(body, config.MAX_SITEMAP_BYTES)
+    if decompressor.unconsumed_tail:
+        raise ValueError("Sitemap exceeds the maximum size")
+    return data
+
+def parse_lastmod(value):
+    """Parse a W3C datetime lastmod value into an aware UTC datetime, or None."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def parse_sitemap(body):
+    """Parse sitemap XML into ('index' | 'urlset', [(loc, lastmod string)])."""
+    root = ElementTree.fromstring(decompress_sitemap(body))
+    
+    # Tags are namespaced, e.g. {http://www.sitemaps.org/schemas/sitemap/0.9}url
+    kind = 'index' if root.tag.endswith('sitemapindex') else 'urlset'
+    entries = []
+    for element in root:
+        loc = None
+        lastmod = None
+        for child in element:
+            if child.tag.endswith('loc'):
+                loc = (child.text or '').strip()
+            elif child.tag.endswith('lastmod'):
+                lastmod = (child.text or '').strip() or None
+        if loc:
+            entries.append((loc, lastmod))
+    
+    return kind, entries
@@ -0,0 +1,156 @@
+"""
+Bounded-memory heavy-hitter sketches for hashtags, mentions and keywords.
+"""
+import heapq
+import math
+
+class SpaceSaving:
+    """Space-Saving top-k sketch (Metwally et al.).
+    
+    Tracks at most `capacity` items. Every reported count overestimates the
+    true count by at most `error(item)`, which is bounded by total / capacity,
+    and any item with true frequency above total / capacity is guaranteed to
+    be tracked.
+    """
+    
+    def __init__(self, capacity=1000):
+        """Initialize sketch with a fixed number of counters."""
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        self._heap = []
+    
+    @classmethod
+    def from_error(cls, epsilon):
+        """Create a sketch whose overestimation is at most epsilon * total."""
+        if not 0 < epsilon < 1:
+            raise ValueError("epsilon must be between 0 and 1")
+        return cls(capacity=math.ceil(1 / epsilon))
+    
+    def add(self, item, count=1):
+        """Add an occurrence of an item."""
+        self.total += count
+        
+        if item in self.counts:
+            self.counts[item] += count
+            heapq.heappush(self._heap, (self.counts[item], item))
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+        else:
+            # Replace the smallest counter, inheriting its count as error
+            evicted, minimum = self._pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = minimum + count
+            self.errors[item] = minimum
+            heapq.heappush(self._heap, (self.counts[item], item))
+        
+        # Drop stale heap entries once they dominate the heap
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+    
+    def update(self, items):
+        """Add every item from an iterable."""
+        for item in items:
+            self.add(item)
+        return self
+    
+    def _pop_min(self):
+        """Pop the item with the smallest current count."""
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item, count
+    
+    def _rebuild_heap(self):
+        """Rebuild the heap from the current counters."""
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+    
+    def min_count(self):
+        """Smallest tracked count, or 0 while the sketch is not full."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+    
+    def estimate(self, item):
+        """Estimated count of an item (an upper bound on its true count)."""
+        return self.counts.get(item, self.min_count())
+    
+    def error(self, item):
+        """Maximum overestimation of an item's count."""
+        return self.errors.get(item, self.min_count())
+    
+    def most_common(self, n=None):
+        """Top items as (item, estimated count) pairs, like Counter.most_common."""
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return items if n is None else items[:n]
+    
+    def merge(self, other):
+        """Merge another sketch into this one (mergeable summaries, Agarwal et al.)."""
+        self_min = self.min_count()
+        other_min = other.min_count()
+        
+        counts = {}
+        errors = {}
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = self.counts.get(item, self_min) + other.counts.get(item, other_min)
+            errors[item] = self.errors.get(item, self_min) + other.errors.get(item, other_min)
+        
+        # Keep the largest counters that fit
+        capacity = max(self.capacity, other.capacity)
+        kept = heapq.nlargest(capacity, counts.items(), key=lambda item: item[1])
+        
+        self.capacity = capacity
+        self.counts = dict(kept)
+        self.errors = {item: errors[item] for item in self.counts}
+        self.total += other.total
+        self._rebuild_heap()
+        return self
+    
+    def __len__(self):
+        return len(self.counts)
+    
+    def __contains__(self, item):
+        return item in self.counts
+
+class TrendTracker:
+    """Heavy-hitter sketches for hashtags, mentions and keywords.
+    
+    Trackers for different users can be merged for global trending analysis.
+    """
+    
+    def __init__(self, capacity=1000):
+        """Initialize trend tracker with a counter budget per sketch."""
+        self.hashtags = SpaceSaving(capacity)
+        self.mentions = SpaceSaving(capacity)
+        self.keywords = SpaceSaving(capacity)
+    
+    def add_tweet(self, tweet):
+        """Add the hashtags and mentions of a tweet."""
+        self.hashtags.update(tweet.get('hashtags', []))
+        self.mentions.update(tweet.get('mentions', []))
+    
+    def add_keywords(self, keywords):
+        """Add keyword occurrences."""
+        self.keywords.update(keywords)
+    
+    def merge(self, other):
+        """Merge another tracker into this one."""
+        self.hashtags.merge(other.hashtags)
+        self.mentions.merge(other.mentions)
+        self.keywords.merge(other.keywords)
+        return self
+    
+    def top(self, n=10):
+        """Get the top hashtags, mentions and keywords."""
+        return {
+            'hashtags': self.hashtags.most_common(n),
+            'mentions': self.mentions.most_common(n),
+            'keywords': self.keywords.most_common(n)
+        }
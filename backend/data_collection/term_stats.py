@@ -0,0 +1,66 @@
+"""
+Corpus document frequencies for weighting keywords by how distinctive they are.
+"""
+import hashlib
+import math
+import re
+from array import array
+from .tweet_batch import Vocabulary
+
+URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+TAG_PATTERN = re.compile(r'<.*?>')
+NON_WORD_PATTERN = re.compile(r'[^\w\s]|\d+')
+
+def document_terms(text):
+    """Distinct candidate keyword terms of a document, cleaned like ContentProcessor.clean_text."""
+    text = URL_PATTERN.sub('', text.lower())
+    text = TAG_PATTERN.sub('', text)
+    text = NON_WORD_PATTERN.sub('', text)
+    return {word for word in text.split() if len(word) > 2}
+
+def content_hash(page):
+    """Digest of a page's extracted text, telling changed pages from unchanged re-crawls."""
+    return hashlib.sha1(page.get('content', '').encode('utf-8')).hexdigest()
+
+class DocumentFrequencies:
+    """In-memory document frequency table backed by a vocabulary and an int array.
+    
+    Lookups are a dict probe plus an array index, so weighting the words of
+    a document is O(document length) regardless of corpus size.
+    """
+    
+    def __init__(self):
+        """Initialize an empty table."""
+        self.vocabulary = Vocabulary()
+        self.counts = array('l')
+        self.document_count = 0
+    
+    def add_document(self, terms, count=1):
+        """Add (or, with count=-1, remove) a document's distinct terms."""
+        self.document_count += count
+        for term in terms:
+            term_id = self.vocabulary.intern(term)
+            if term_id == len(self.counts):
+                self.counts.append(0)
+            self.counts[term_id] += count
+    
+    def load(self, document_count, term_counts):
+        """Replace the table with stored totals and (term, df) pairs."""
+        self.vocabulary = Vocabulary()
+        self.counts = array('l')
+        self.document_count = document_count
+        for term, df in term_counts:
+            self.vocabulary.intern(term)
+            self.counts.append(df)
+    
+    def document_frequency(self, term):
+        """Number of documents containing a term."""
+        term_id = self.vocabulary.ids.get(term)
+        return self.counts[term_id] if term_id is not None else 0
+    
+    def idf(self, term):
+        """Smoothed inverse document frequency of a term."""
+        return math.log((1 + self.document_count) / (1 + self.document_frequency(term))) + 1
+    
+    def __len__(self):
+        return len(self.vocabulary)
@@ -0,0 +1,118 @@
+"""
+Local archive of Twitter profiles and recent tweets, so queries avoid the live API.
+"""
+import threading
+import time
+from collections import OrderedDict
+from . import config
+
+# Storage fields that are not part of the API data
+STORAGE_FIELDS = ('_id', 'user_id', 'collected_at', 'username_lower')
+
+class TweetArchive:
+    """Serves profiles and recent tweets from memory or the database while fresh.
+    
+    The last fetched profile and newest config.RECENT_TWEETS_PER_USER tweets
+    of up to config.RECENT_CACHE_USERS users are kept in memory. Older data
+    comes from the database (Database or LocalDatabase), where collected
+    tweets are stored. Anything collected more than `ttl` seconds ago is
+    stale, and callers then go to the live API.
+    """
+    
+    def __init__(self, db=None, ttl=None):
+        """Initialize archive on an optional database."""
+        self.db = db
+        self.ttl = config.TWEET_ARCHIVE_TTL if ttl is None else ttl
+        self.recent = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def _fresh(self, collected_at):
+        """Check whether data collected at a timestamp (or datetime) is within the TTL."""
+        if collected_at is None:
+            return False
+        if hasattr(collected_at, 'timestamp'):
+            collected_at = collected_at.timestamp()
+        return time.time() - collected_at < self.ttl
+    
+    def _entry(self, username):
+        """Get a user's in-memory entry, marking it recently used."""
+        key = username.lower()
+        with self.lock:
+            entry = self.recent.get(key)
+            if entry is not None:
+                self.recent.move_to_end(key)
+            return entry
+    
+    def remember(self, username, profile=None, tweets=None, complete=False, collected_at=None):
+        """Keep a profile and/or newest-first tweets in memory, fetched now or at `collected_at`.
+        
+        `complete` marks tweets as all the user has in the collection window,
+        so smaller requests can be answered from them.
+        """
+        key = username.lower()
+        now = collected_at.timestamp() if collected_at is not None else time.time()
+        with self.lock:
+            entry = self.recent.setdefault(key, {})
+            if profile is not None:
+                entry['profile'] = profile
+                entry['profile_at'] = now
+            if tweets is not None:
+                entry['tweets'] = tweets[:config.RECENT_TWEETS_PER_USER]
+                entry['complete'] = complete and len(tweets) <= config.RECENT_TWEETS_PER_USER
+                entry['tweets_at'] = now
+            self.recent.move_to_end(key)
+            
+            while len(self.recent) > config.RECENT_CACHE_USERS:
+                self.recent.popitem(last=False)
+    
+    def _stored_profile(self, username):
+        """Get the stored Twitter profile of a username if it is fresh, or None."""
+        if self.db is None:
+            return None
+        stored = self.db.get_profile_by_username('twitter', username)
+        if stored and self._fresh(stored.get('collected_at')):
+            return stored
+        return None
+    
+    def get_profile(self, username):
+        """Get a fresh profile from memory or the database, or None."""
+        entry = self._entry(username)
+        if entry and 'profile' in entry and self._fresh(entry['profile_at']):
+            return dict(entry['profile'])
+        
+        stored = self._stored_profile(username)
+        if stored is None:
+            return None
+        
+        profile = {key: value for key, value in stored.items() if key not in STORAGE_FIELDS}
+        self.remember(username, profile=profile, collected_at=stored['collected_at'])
+        return dict(profile)
+    
+    def get_tweets(self, username, count=100):
+        """Get up to `count` fresh newest-first tweets from memory or the database, or None."""
+        entry = self._entry(username)
+        if entry and 'tweets' in entry and self._fresh(entry['tweets_at']):
+            if len(entry['tweets']) >= count or entry['complete']:
+                return entry['tweets'][:count]
+        
+        if self.db is None:
+            return None
+        stored = self.db.get_profile_by_username('twitter', username)
+        if stored is None:
+            return None
+        
+        # Stored tweets are as fresh as the last timeline collection that saved them
+        collected_at = self.db.get_tweets_collected_at(stored['user_id'])
+        if not self._fresh(collected_at):
+            return None
+        
+        tweets = [
+            {key: value for key, value in tweet.items() if key not in STORAGE_FIELDS}
+            for tweet in self.db.get_tweets(stored['user_id'], limit=count)
+        ]
+        if not tweets:
+            return None
+        
+        # The collector stores every tweet in the window, so fewer than asked is all there is
+        self.remember(username, tweets=tweets, complete=len(tweets) < count, collected_at=collected_at)
+        return tweets
@@ -0,0 +1,169 @@
+"""
+Columnar tweet batch for moving large tweet histories between components.
+"""
+from array import array
+from datetime import datetime, timezone
+import numpy as np
+
+# Sentinel for missing timestamps and counts
+MISSING = -1
+
+class Vocabulary:
+    """Interning table mapping strings to dense integer ids in first-seen order."""
+    
+    def __init__(self):
+        """Initialize vocabulary."""
+        self.ids = {}
+        self.terms = []
+    
+    def intern(self, term):
+        """Return the id for a term, adding it if needed."""
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.ids[term] = term_id
+            self.terms.append(term)
+        return term_id
+    
+    def __len__(self):
+        return len(self.terms)
+
+class TweetBatch:
+    """Struct-of-arrays representation of a list of tweets.
+    
+    Each column is a NumPy array indexed by tweet position. Hashtags and
+    mentions are stored as interned ids in a flat array with per-tweet
+    offsets, so tweet i's hashtags are
+    hashtag_ids[hashtag_offsets[i]:hashtag_offsets[i + 1]].
+    """
+    
+    # Marks missing timestamps and counts in the columns
+    MISSING = MISSING
+    
+    def __init__(self, ids, created_at, favorite_count, retweet_count, reply_bits, retweet_bits,
+                 question_marks, hashtag_offsets, hashtag_ids, hashtag_vocab,
+                 mention_offsets, mention_ids, mention_vocab, texts=None):
+        """Initialize tweet batch from prebuilt columns."""
+        self.ids = ids
+        self.created_at = created_at
+        self.favorite_count = favorite_count
+        self.retweet_count = retweet_count
+        self.reply_bits = reply_bits
+        self.retweet_bits = retweet_bits
+        self.question_marks = question_marks
+        self.hashtag_offsets = hashtag_offsets
+        self.hashtag_ids = hashtag_ids
+        self.hashtag_vocab = hashtag_vocab
+        self.mention_offsets = mention_offsets
+        self.mention_ids = mention_ids
+        self.mention_vocab = mention_vocab
+        self.texts = texts
+    
+    @classmethod
+    def from_documents(cls, documents, keep_text=False):
+        """Build a batch from tweet dicts, e.g. a MongoDB cursor or connector output."""
+        ids = array('q')
+        created_at = array('q')
+        favorite_count = array('l')
+        retweet_count = array('l')
+        is_reply = bytearray()
+        is_retweet = bytearray()
+        question_marks = array('H')
+        hashtag_offsets = array('l', [0])
+        hashtag_ids = array('l')
+        mention_offsets = array('l', [0])
+        mention_ids = array('l')
+        hashtag_vocab = Vocabulary()
+        mention_vocab = Vocabulary()
+        texts = [] if keep_text else None
+        
+        for document in documents:
+            ids.append(int(document.get('id_str', 0)))
+            created_at.append(cls._to_epoch(document.get('created_at')))
+            favorite_count.append(cls._to_count(document.get('favorite_count')))
+            retweet_count.append(cls._to_count(document.get('retweet_count')))
+            is_reply.append(1 if document.get('is_reply') else 0)
+            is_retweet.append(1 if document.get('is_retweet') else 0)
+            
+            text = document.get('full_text') or ''
+            question_marks.append(min(text.count('?'), 0xFFFF))
+            if keep_text:
+                texts.append(text)
+            
+            hashtag_ids.extend(hashtag_vocab.intern(tag) for tag in document.get('hashtags', []))
+            hashtag_offsets.append(len(hashtag_ids))
+            mention_ids.extend(mention_vocab.intern(name) for name in document.get('mentions', []))
+            mention_offsets.append(len(mention_ids))
+        
+        return cls(
+            ids=np.frombuffer(ids, dtype=np.int64).copy(),
+            created_at=np.frombuffer(created_at, dtype=np.int64).copy(),
+            favorite_count=np.asarray(favorite_count, dtype=np.int32),
+            retweet_count=np.asarray(retweet_count, dtype=np.int32),
+            reply_bits=np.packbits(np.frombuffer(bytes(is_reply), dtype=np.uint8)),
+            retweet_bits=np.packbits(np.frombuffer(bytes(is_retweet), dtype=np.uint8)),
+            question_marks=np.asarray(question_marks, dtype=np.uint16),
+            hashtag_offsets=np.asarray(hashtag_offsets, dtype=np.int32),
+            hashtag_ids=np.asarray(hashtag_ids, dtype=np.int32),
+            hashtag_vocab=hashtag_vocab.terms,
+            mention_offsets=np.asarray(mention_offsets, dtype=np.int32),
+            mention_ids=np.asarray(mention_ids, dtype=np.int32),
+            mention_vocab=mention_vocab.terms,
+            texts=texts
+        )
+    
+    @staticmethod
+    def _to_count(value):
+        """Convert an engagement counter, using MISSING when absent."""
+        return MISSING if value is None else int(value)
+    
+    @staticmethod
+    def _to_epoch(value):
+        """Convert an ISO string or datetime to UTC epoch seconds."""
+        if value is None:
+            return MISSING
+        
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                return MISSING
+        
+        # Naive datetimes (e.g. from MongoDB) are stored in UTC
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        
+        return int(value.timestamp())
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    @property
+    def is_reply(self):
+        """Boolean array of reply flags."""
+        return np.unpackbits(self.reply_bits, count=len(self)).astype(bool)
+    
+    @property
+    def is_retweet(self):
+        """Boolean array of retweet flags."""
+        return np.unpackbits(self.retweet_bits, count=len(self)).astype(bool)
+    
+    def hashtags(self, index):
+        """Get the hashtags of a single tweet."""
+        start, end = self.hashtag_offsets[index], self.hashtag_offsets[index + 1]
+        return [self.hashtag_vocab[term_id] for term_id in self.hashtag_ids[start:end]]
+    
+    def mentions(self, index):
+        """Get the mentions of a single tweet."""
+        start, end = self.mention_offsets[index], self.mention_offsets[index + 1]
+        return [self.mention_vocab[term_id] for term_id in self.mention_ids[start:end]]
+    
+    @property
+    def nbytes(self):
+        """Approximate memory used by the numeric columns, in bytes."""
+        columns = [
+            self.ids, self.created_at, self.favorite_count, self.retweet_count,
+            self.reply_bits, self.retweet_bits, self.question_marks,
+            self.hashtag_offsets, self.hashtag_ids, self.mention_offsets, self.mention_ids
+        ]
+        return sum(column.nbytes for column in columns)
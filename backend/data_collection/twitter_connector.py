@@ -2,17 +2,41 @@
 Twitter API connector for collecting tweets and profile information.
 """
 import tweepy
-import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from . import config
+from .tweet_batch import TweetBatch
+from .resilience import Deadline, call_with_retries
+from .twitter_scheduler import get_budget
 
 class TwitterConnector:
     """Twitter API connector for data collection."""
     
-    def __init__(self):
-        """Initialize Twitter API connection."""
+    def __init__(self, archive=None):
+        """Initialize Twitter API connection, with an optional TweetArchive serving fresh data locally."""
         self.api = None
         self.connected = False
+        self.deadline = None
+        self.archive = archive
+    
+    def start_job(self, seconds=None):
+        """Start a job time budget shared by all following API calls."""
+        self.deadline = Deadline(seconds)
+    
+    def _call(self, method, endpoint, **kwargs):
+        """Call an API method within its endpoint's rate budget, retrying rate limits and server errors."""
+        budget = get_budget(endpoint)
+        
+        def call():
+            budget.acquire(self.deadline)
+            try:
+                return method(**kwargs)
+            finally:
+                # tweepy keeps the last response, also when the call failed
+                response = getattr(self.api, 'last_response', None)
+                if response is not None:
+                    budget.update(response.headers)
+        
+        return call_with_retries(call, host=config.TWITTER_API_HOST, deadline=self.deadline)
     
     def connect(self):
         """Connect to Twitter API."""
@@ -26,7 +50,8 @@ class TwitterConnector:
                 config.TWITTER_ACCESS_SECRET
             )
             
-            self.api = tweepy.API(auth, wait_on_rate_limit=True)
+            # Rate limits are waited out by call_with_retries, within the job's time budget
+            self.api = tweepy.API(auth, host=config.TWITTER_API_HOST, wait_on_rate_limit=False)
             self.api.verify_credentials()
             self.connected = True
             print("Connected to Twitter API")
@@ -36,14 +61,19 @@ class TwitterConnector:
             self.connected = False
             return False
     
-    def get_user_profile(self, username):
-        """Get Twitter user profile."""
+    def get_user_profile(self, username, use_archive=True):
+        """Get Twitter user profile, from the archive while it is fresh unless `use_archive` is False."""
+        if self.archive and use_archive:
+            profile = self.archive.get_profile(username)
+            if profile:
+                return profile
+        
         if not self.connected:
             if not self.connect():
                 return None
         
         try:
-            user = self.api.get_user(screen_name=username)
+            user = self._call(self.api.get_user, 'users/show', screen_name=username)
             
             profile = {
                 'platform': 'twitter',
@@ -60,11 +90,80 @@ class TwitterConnector:
                 'created_at': user.created_at.isoformat() 
             }
             
+            if self.archive:
+                # A copy, since callers add storage fields to the profile they get
+                self.archive.remember(username, profile=dict(profile))
+            
             return profile
         except Exception as e:
             print(f"Error getting Twitter profile for {username}: {str(e)}")
             return None
     
+    def oldest_allowed(self, days_back):
+        """Oldest tweet time to collect, in UTC like the tweets' created_at."""
+        return datetime.now(timezone.utc) - timedelta(days=days_back)
+    
+    def _tweet_data(self, tweet):
+        """Convert a tweepy Status into a tweet document."""
+        tweet_data = {
+            'id_str': tweet.id_str,
+            'created_at': tweet.created_at.isoformat(),
+            'full_text': tweet.full_text,
+            'retweet_count': tweet.retweet_count,
+            'favorite_count': tweet.favorite_count,
+            'hashtags': [h['text'] for h in tweet.entities.get('hashtags', [])],
+            'urls': [u['expanded_url'] for u in tweet.entities.get('urls', [])],
+            'mentions': [m['screen_name'] for m in tweet.entities.get('user_mentions', [])],
+            'is_retweet': hasattr(tweet, 'retweeted_status'),
+            'is_reply': tweet.in_reply_to_status_id is not None
+        }
+        
+        # Add media if available
+        if hasattr(tweet, 'extended_entities') and 'media' in tweet.extended_entities:
+            tweet_data['media'] = [
+                {
+                    'type': m['type'],
+                    'url': m['media_url_https']
+                }
+                for m in tweet.extended_entities['media']
+            ]
+        
+        return tweet_data
+    
+    def get_timeline_page(self, username, count=200, max_id=None, oldest_allowed=None):
+        """Get one page of a user's timeline, returning (tweets, max_id of the next page or None)."""
+        if not self.connected:
+            if not self.connect():
+                return [], None
+        
+        batch = self._call(
+            self.api.user_timeline,
+            'statuses/user_timeline',
+            screen_name=username,
+            count=min(config.TWITTER_PAGE_SIZE, count),
+            tweet_mode='extended',
+            max_id=max_id
+        )
+        
+        if not batch:
+            return [], None
+        
+        tweets = []
+        for tweet in batch:
+            # Skip if tweet is older than allowed
+            created_at = tweet.created_at
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            if oldest_allowed is not None and created_at < oldest_allowed:
+                continue
+            tweets.append(self._tweet_data(tweet))
+        
+        # Timelines are newest first, so a page reaching past the cutoff is the last one
+        if len(tweets) < len(batch):
+            return tweets, None
+        
+        return tweets, batch[-1].id - 1
+    
     def get_user_tweets(self, username, count=200, days_back=30):
         """Get tweets from a user."""
         if not self.connected:
@@ -73,75 +172,47 @@ class TwitterConnector:
         
         tweets = []
         max_id = None
-        oldest_allowed = datetime.now() - timedelta(days=days_back)
+        oldest_allowed = self.oldest_allowed(days_back)
         
         try:
-            # Make multiple requests to get more tweets
-            for _ in range(count // 200 + 1):
-                batch = self.api.user_timeline(
-                    screen_name=username,
-                    count=min(200, count - len(tweets)),
-                    tweet_mode='extended',
-                    max_id=max_id
+            # Page through the timeline; pacing comes from the endpoint's rate budget
+            while len(tweets) < count:
+                page, max_id = self.get_timeline_page(
+                    username,
+                    count=count - len(tweets),
+                    max_id=max_id,
+                    oldest_allowed=oldest_allowed
                 )
+                tweets.extend(page)
                 
-                if not batch:
-                    break
-                
-                for tweet in batch:
-                    # Skip if tweet is older than allowed
-                    if tweet.created_at < oldest_allowed:
-                        continue
-                    
-                    # Process tweet
-                    tweet_data = {
-                        'id_str': tweet.id_str,
-                        'created_at': tweet.created_at.isoformat(),
-                        'full_text': tweet.full_text,
-                        'retweet_count': tweet.retweet_count,
-                        'favorite_count': tweet.favorite_count,
-                        'hashtags': [h['text'] for h in tweet.entities.get('hashtags', [])],
-                        'urls': [u['expanded_url'] for u in tweet.entities.get('urls', [])],
-                        'mentions': [m['screen_name'] for m in tweet.entities.get('user_mentions', [])],
-                        'is_retweet': hasattr(tweet, 'retweeted_status'),
-                        'is_reply': tweet.in_reply_to_status_id is not None
-                    }
-                    
-                    # Add media if available
-                    if hasattr(tweet, 'extended_entities') and 'media' in tweet.extended_entities:
-                        tweet_data['media'] = [
-                            {
-                                'type': m['type'],
-                                'url': m['media_url_https']
-                            }
-                            for m in tweet.extended_entities['media']
-                        ]
-                    
-                    tweets.append(tweet_data) 
-                
-                # Update max_id for pagination
-                max_id = batch[-1].id - 1
-                
-                # Check if we have enough tweets
-                if len(tweets) >= count:
+                if max_id is None:
                     break
-                
-                # Respect rate limits
-                time.sleep(1)
         
         except Exception as e:
             print(f"Error getting tweets for {username}: {str(e)}")
+            return tweets[:count]
+        
+        if self.archive:
+            self.archive.remember(username, tweets=tweets[:count], complete=max_id is None)
         
         return tweets[:count]
     
+    def get_user_tweet_batch(self, username, count=200, days_back=30, keep_text=False):
+        """Get tweets from a user as a columnar TweetBatch."""
+        return TweetBatch.from_documents(
+            self.get_user_tweets(username, count=count, days_back=days_back),
+            keep_text=keep_text
+        )
+    
     def get_user_engagement(self, username, count=100):
-        """Get engagement metrics for a user's tweets."""
-        if not self.connected:
-            if not self.connect():
-                return None
-        
+        """Get engagement metrics for a user's tweets, from archived tweets while they are fresh."""
         try:
-            tweets = self.get_user_tweets(username, count=count)
+            tweets = self.archive.get_tweets(username, count=count) if self.archive else None
+            if tweets is None:
+                if not self.connected:
+                    if not self.connect():
+                        return None
+                tweets = self.get_user_tweets(username, count=count)
             
             if not tweets:
                 return None
@@ -0,0 +1,159 @@
+"""
+Rate-limit budgets and fair scheduling of Twitter timeline fetches across users.
+"""
+import heapq
+import threading
+import time
+from . import config
+from .resilience import DeadlineExceeded
+
+class RateBudget:
+    """Token bucket for one API endpoint, refilled when its rate limit window resets.
+    
+    Starts from config.TWITTER_RATE_LIMITS and follows the x-rate-limit-*
+    headers of every response, so the budget matches what the API reports.
+    """
+    
+    def __init__(self, limit, window):
+        """Initialize a full bucket of `limit` calls per `window` seconds."""
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = time.time() + window
+        self.lock = threading.Lock()
+    
+    def reserve(self):
+        """Take a call from the budget, returning 0 or the seconds until the window resets."""
+        with self.lock:
+            now = time.time()
+            if now >= self.reset_at:
+                self.remaining = self.limit
+                self.reset_at = now + self.window
+            if self.remaining > 0:
+                self.remaining -= 1
+                return 0.0
+            return self.reset_at - now
+    
+    def acquire(self, deadline=None):
+        """Block until a call is available, without waiting past the deadline."""
+        while True:
+            wait = self.reserve()
+            if not wait:
+                return
+            if deadline is not None and wait >= deadline.remaining():
+                raise DeadlineExceeded("Rate limit window resets after the time budget")
+            time.sleep(wait)
+    
+    def update(self, headers):
+        """Sync the budget with the rate limit headers of a response."""
+        headers = headers or {}
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+        limit = headers.get('x-rate-limit-limit')
+        if remaining is None or reset is None:
+            return
+        
+        with self.lock:
+            if limit is not None:
+                self.limit = int(limit)
+            if int(reset) != int(self.reset_at):
+                # A new window started on the server
+                self.reset_at = float(reset)
+                self.remaining = int(remaining)
+            else:
+                # Same window: calls still in flight may not be counted yet
+                self.remaining = min(self.remaining, int(remaining))
+
+_budgets = {}
+_budgets_lock = threading.Lock()
+
+def get_budget(endpoint):
+    """Get the process-wide rate budget of an API endpoint, e.g. 'statuses/user_timeline'."""
+    with _budgets_lock:
+        if endpoint not in _budgets:
+            limit, window = config.TWITTER_RATE_LIMITS.get(endpoint, config.TWITTER_DEFAULT_RATE_LIMIT)
+            _budgets[endpoint] = RateBudget(limit, window)
+        return _budgets[endpoint]
+
+class TwitterFetchScheduler:
+    """Interleaves timeline pages of many users within the shared rate limit.
+    
+    Users take turns one page at a time, so every user gets their newest
+    tweets before anyone's older pages are fetched; within a turn the
+    users collected longest ago (or never) go first.
+    """
+    
+    def __init__(self, connector):
+        """Initialize scheduler on a TwitterConnector."""
+        self.connector = connector
+        self.jobs = []
+        
+        # Keys of the last run's users whose timeline could not be fetched at all
+        self.failed = set()
+    
+    def add_user(self, username, key=None, last_collected=None, count=200, days_back=30):
+        """Queue a user's timeline; `key` (default username) identifies the user in the results."""
+        self.jobs.append({
+            'username': username,
+            'key': key if key is not None else username,
+            'last_collected': last_collected.timestamp() if last_collected else float('-inf'),
+            'count': count,
+            'days_back': days_back
+        })
+    
+    def run(self, on_complete=None):
+        """Fetch all queued timelines, returning key -> tweets.
+        
+        on_complete(key, tweets) is called as soon as a user's timeline is
+        done, so results can be saved while other users are still fetched.
+        Users whose fetch failed before any tweets arrived are in `failed`
+        by then, telling them apart from users with no tweets in the window.
+        """
+        results = {}
+        heap = []
+        self.failed = set()
+        
+        def complete(job, failed=False):
+            if failed and not job['tweets']:
+                self.failed.add(job['key'])
+            results[job['key']] = job['tweets'][:job['count']]
+            if on_complete:
+                on_complete(job['key'], results[job['key']])
+        
+        for seq, job in enumerate(self.jobs):
+            job.update({'tweets': [], 'max_id': None,
+                        'oldest_allowed': self.connector.oldest_allowed(job['days_back'])})
+            heapq.heappush(heap, (0, job['last_collected'], seq, job))
+        self.jobs = []
+        
+        while heap:
+            pages, last_collected, seq, job = heapq.heappop(heap)
+            
+            try:
+                tweets, next_max_id = self.connector.get_timeline_page(
+                    job['username'],
+                    count=min(config.TWITTER_PAGE_SIZE, job['count'] - len(job['tweets'])),
+                    max_id=job['max_id'],
+                    oldest_allowed=job['oldest_allowed']
+                )
+            except DeadlineExceeded:
+                print(f"Time budget exhausted with {len(heap) + 1} timelines left")
+                # Keep the pages fetched so far
+                complete(job, failed=True)
+                for _, _, _, waiting in heap:
+                    complete(waiting, failed=True)
+                break
+            except Exception as e:
+                print(f"Error getting tweets for {job['username']}: {str(e)}")
+                complete(job, failed=True)
+                continue
+            
+            job['tweets'].extend(tweets)
+            job['max_id'] = next_max_id
+            
+            if next_max_id is None or len(job['tweets']) >= job['count']:
+                complete(job)
+            else:
+                heapq.heappush(heap, (pages + 1, last_collected, seq, job))
+        
+        return results
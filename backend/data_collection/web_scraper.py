@@ -1,34 +1,123 @@
 """
 Web scraper for collecting content from websites and blogs.
 """
-import requests
 from bs4 import BeautifulSoup
-import time
 import re
+from collections import OrderedDict
 from urllib.parse import urljoin, urlparse
 from . import config
+from .sitemaps import parse_sitemap, parse_lastmod
+from .frontier import CrawlFrontier, score_url
+from .politeness import get_scheduler
+from .resilience import Deadline, call_with_retries
+from .http_client import get_client
 
 class WebScraper:
     """Web scraper for collecting content from websites and blogs."""
     
     def __init__(self):
         """Initialize web scraper."""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': config.USER_AGENT
-        })
+        # Pooled keep-alive connections, shared across scrapers
+        self.http = get_client()
+        self.session = self.http.session
     
-    def get_page_content(self, url):
-        """Get content from a single web page."""
-        try:
-            response = self.session.get(
-                url,
-                timeout=config.REQUEST_TIMEOUT
-            )
+        # URLs that were not HTML or too large, with the reason, so they are not fetched again;
+        # the scraper can live as long as its process, so only the most recent are kept
+        self.skipped_urls = OrderedDict()
+        
+        # Fetch efficiency of the last crawl, and the number of HTTP requests sent so far
+        self.crawl_stats = {}
+        self.request_count = 0
+        
+        # Robots.txt rules and per-host request spacing, shared across scrapers
+        self.politeness = get_scheduler()
+        
+        # Time budget of the current job, if any
+        self.deadline = None
+    
+    def start_job(self, seconds=None):
+        """Start a job time budget shared by all following fetches."""
+        self.deadline = Deadline(seconds)
+    
+    def should_skip(self, url):
+        """Check whether a URL was skipped before or obviously points at a non-HTML file."""
+        if url in self.skipped_urls:
+            self.skipped_urls.move_to_end(url)
+            return True
+        
+        path = urlparse(url).path.lower()
+        if path.endswith(config.SKIP_EXTENSIONS):
+            self._skip(url, 'extension')
+            return True
+        
+        return False
+    
+    def _skip(self, url, reason):
+        """Remember a skipped URL, forgetting the least recently seen beyond config.MAX_SKIPPED_URLS."""
+        self.skipped_urls[url] = reason
+        self.skipped_urls.move_to_end(url)
+        while len(self.skipped_urls) > config.MAX_SKIPPED_URLS:
+            self.skipped_urls.popitem(last=False)
+    
+    def _download(self, url, content_types=config.HTML_CONTENT_TYPES, max_bytes=config.MAX_PAGE_BYTES, wait=True):
+        """Download a page, returning (body bytes, declared charset) or None if skipped.
+        
+        The body is streamed so responses of other content types (when
+        `content_types` is set) and oversized responses are abandoned after
+        the headers or as soon as they exceed `max_bytes`. Requests wait for
+        the host's politeness interval, unless `wait` is False because the
+        caller already reserved the host, and URLs disallowed by robots.txt
+        are skipped.
+        """
+        if not self.politeness.allowed(url):
+            # URLs of hosts whose robots.txt is unreachable are tried again later
+            if not self.politeness.unreachable(url):
+                self._skip(url, 'disallowed by robots.txt')
+            return None
+        if wait:
+            self.politeness.wait(url)
+        
+        self.request_count += 1
+        with self.http.get(url, stream=True) as response:
             response.raise_for_status()
             
-            # Parse HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Check content type before reading the body
+            content_type = response.headers.get('Content-Type', '').lower()
+            if content_types and content_type and not any(allowed in content_type for allowed in content_types):
+                self._skip(url, f'content type {content_type.split(";")[0]}')
+                return None
+            
+            # Check declared length
+            declared_length = response.headers.get('Content-Length')
+            if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+                self._skip(url, f'declared length {declared_length}')
+                return None
+            
+            # Read until the size limit
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                body.extend(chunk)
+                if len(body) > max_bytes:
+                    self._skip(url, f'larger than {max_bytes} bytes')
+                    return None
+            
+            charset = response.encoding if 'charset' in content_type else None
+            return bytes(body), charset
+    
+    def get_page_content(self, url, wait=True):
+        """Get content from a single web page, waiting for the host's politeness interval if `wait`."""
+        if self.should_skip(url):
+            return None
+        
+        try:
+            downloaded = call_with_retries(lambda: self._download(url, wait=wait), host=url, deadline=self.deadline)
+            if downloaded is None:
+                return None
+            body, charset = downloaded
+            
+            # Parse HTML, sniffing the encoding from the document if the headers do not declare one
+            soup = BeautifulSoup(body, 'html.parser', from_encoding=charset)
+            html = body.decode(soup.original_encoding or 'utf-8', errors='replace')
             
             # Extract title
             title = soup.title.string if soup.title else ''
@@ -67,8 +156,9 @@ class WebScraper:
             # Clean up content
             content = re.sub(r'\s+', ' ', content).strip()
             
-            # Extract links
+            # Extract links, with their anchor text for crawl prioritization
             links = []
+            link_texts = []
             for a in soup.find_all('a', href=True):
                 href = a['href']
                 if href.startswith('http')  or href.startswith('www'):
@@ -76,6 +166,9 @@ class WebScraper:
                 elif not href.startswith('#') and not href.startswith('javascript:'):
                     # Convert relative URL to absolute
                     links.append(urljoin(url, href))
+                else:
+                    continue
+                link_texts.append(a.get_text(separator=' ', strip=True))
             
             # Extract images
             images = []
@@ -94,8 +187,9 @@ class WebScraper:
                 'description': meta_desc,
                 'content': content,
                 'links': links,
+                'link_texts': link_texts,
                 'images': images,
-                'html': response.text
+                'html': html
             }
             
             return page_data
@@ -104,70 +198,243 @@ class WebScraper:
             print(f"Error scraping {url}: {str(e)}")
             return None
     
-    def crawl_website(self, start_url, max_pages=10):
-        """Crawl a website starting from a URL."""
-        visited = set()
-        to_visit = [start_url]
+    def crawl_website(self, start_url, max_pages=10, score=None, is_useful=None, max_fetches=None, frontier=None,
+                      checkpoint=None, on_page=None):
+        """Crawl a website starting from a URL.
+        
+        With a score(url, anchor_text, depth) function, the highest-scoring
+        queued URL is fetched next instead of the oldest. With is_useful(page),
+        only useful pages are returned and counted towards max_pages, and
+        at most max_fetches pages are fetched. Fetch efficiency is kept in
+        self.crawl_stats.
+        
+        Passing a SharedFrontier lets several workers crawl together; each
+        returns the pages it fetched and the limits apply per worker.
+        
+        With a CrawlCheckpoint, the frontier, fetch count and URLs of the
+        pages collected so far are saved periodically, and a resumed crawl
+        continues from them; on_page(page) is called for each useful page as
+        soon as it is fetched so it can be saved before a crash. Only pages
+        fetched in this run are returned, the URLs of the earlier ones are
+        kept in self.crawl_stats['resumed_pages'].
+        """
+        state = checkpoint.load() if checkpoint else None
+        shared = frontier is not None
+        if not shared:
+            frontier = CrawlFrontier.from_state(state['frontier'], score) if state else CrawlFrontier(score)
+        frontier.push(start_url)
         pages = []
+        page_ids = list(state['page_ids']) if state else []
+        fetched = state['fetched'] if state else 0
+        resumed_pages = list(page_ids)
+        
+        def checkpoint_state():
+            return {
+                # A shared frontier is durable on its own
+                'frontier': None if shared else frontier.to_state(),
+                'page_ids': page_ids,
+                'fetched': fetched
+            }
         
         # Extract domain to stay on the same site
         domain = urlparse(start_url).netloc
         
-        while to_visit and len(pages) < max_pages:
-            # Get next URL to visit
-            url = to_visit.pop(0)
+        while frontier and len(page_ids) < max_pages and (max_fetches is None or fetched < max_fetches):
+            # Stop when the job's time budget is used up
+            if self.deadline is not None and self.deadline.expired():
+                print(f"Time budget exhausted while crawling {start_url}")
+                break
             
-            # Skip if already visited
-            if url in visited:
-                continue
+            # Get next URL to visit; a shared frontier returns None once the crawl is finished
+            popped = frontier.pop()
+            if popped is None:
+                break
+            url, depth = popped
             
-            # Mark as visited
-            visited.add(url)
-            
-            # Get page content
-            page_data = self.get_page_content(url)
+            # Get page content, counting only URLs actually requested (not skipped)
+            requests_before = self.request_count
+            page_data = self.get_page_content(url, wait=not frontier.reserves_hosts)
+            if self.request_count > requests_before:
+                fetched += 1
+            collected = False
             
             if page_data:
                 # Add to pages
-                pages.append(page_data)
+                if is_useful is None or is_useful(page_data):
+                    pages.append(page_data)
+                    page_ids.append(url)
+                    collected = True
+                    if on_page:
+                        on_page(page_data)
                 
                 # Add links to visit queue
-                for link in page_data['links']:
-                    # Only add links from the same domain
-                    if urlparse(link).netloc == domain and link not in visited:
-                        to_visit.append(link)
+                for link, anchor_text in zip(page_data['links'], page_data['link_texts']):
+                    # Only add links from the same domain that were not skipped before
+                    if urlparse(link).netloc == domain and not self.should_skip(link):
+                        frontier.push(link, depth + 1, anchor_text)
+            
+            # Failed fetches (not skipped URLs) can be retried by a shared frontier
+            if page_data is None and url not in self.skipped_urls:
+                frontier.fail(url)
+            else:
+                frontier.ack(url)
             
-            # Respect robots.txt (simplified)
-            time.sleep(1)
+            if checkpoint:
+                # Checkpoint right after collecting a page so it is never fetched twice
+                checkpoint.fetched(checkpoint_state, force=collected)
+        
+        if checkpoint:
+            # Keep the checkpoint of a crawl cut short by its time budget
+            if self.deadline is not None and self.deadline.expired():
+                checkpoint.save(checkpoint_state())
+            else:
+                checkpoint.clear()
+        
+        self.crawl_stats = {
+            'fetched': fetched,
+            'useful': len(page_ids),
+            'efficiency': len(page_ids) / fetched if fetched else 0.0,
+            'resumed_pages': resumed_pages
+        }
         
         return pages
     
-    def get_blog_posts(self, blog_url, max_posts=10):
-        """Get blog posts from a blog URL."""
-        # First, crawl the blog
-        pages = self.crawl_website(blog_url, max_pages=max_posts * 2)
+    def get_sitemap_entries(self, site_url):
+        """Get (url, lastmod) entries from a site's sitemaps, following sitemap indexes.
         
-        # Filter for likely blog post pages
-        blog_posts = []
+        Sitemaps are taken from robots.txt, falling back to /sitemap.xml.
+        Returns an empty list if the site has no readable sitemap.
+        """
+        parsed = urlparse(site_url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
         
-        for page in pages:
-            # Check if page looks like a blog post
-            is_post = False
+        sitemap_urls = list(self.politeness.sitemaps(site_url))
+        if not sitemap_urls:
+            sitemap_urls = [urljoin(root, '/sitemap.xml')]
+        
+        entries = []
+        fetched = set()
+        while sitemap_urls and len(fetched) < config.MAX_SITEMAPS:
+            sitemap_url = sitemap_urls.pop(0)
+            if sitemap_url in fetched:
+                continue
+            fetched.add(sitemap_url)
             
-            # Check URL pattern
-            url_path = urlparse(page['url']).path
-            if re.search(r'/\d{4}/\d{2}/|/blog/|/post/|/article/', url_path):
-                is_post = True
+            try:
+                downloaded = self._download(sitemap_url, content_types=None, max_bytes=config.MAX_SITEMAP_BYTES)
+                if not downloaded:
+                    continue
+                kind, sitemap_entries = parse_sitemap(downloaded[0])
+            except Exception as e:
+                print(f"Error reading sitemap {sitemap_url}: {str(e)}")
+                continue
             
-            # Check content length
-            if len(page['content']) > config.MIN_CONTENT_LENGTH:
-                is_post = True
+            if kind == 'index':
+                # Newest child sitemaps first, since posts are taken most recent first
+                sitemap_entries.sort(key=lambda entry: self._lastmod_key(entry[1]), reverse=True)
+                sitemap_urls.extend(loc for loc, lastmod in sitemap_entries)
+            else:
+                entries.extend(sitemap_entries)
+        
+        return entries
+    
+    @staticmethod
+    def _lastmod_key(lastmod):
+        """Sort key for lastmod strings, with missing or invalid values last."""
+        parsed = parse_lastmod(lastmod)
+        return parsed.timestamp() if parsed else float('-inf')
+    
+    def get_sitemap_posts(self, blog_url, entries, max_posts=10, known_lastmod=None, on_page=None):
+        """Fetch the most recent blog posts listed in sitemap entries.
+        
+        Posts whose lastmod matches `known_lastmod` (url -> lastmod from a
+        previous run) are unchanged and not fetched again, so posts handed to
+        on_page(page) and saved are not refetched after an interruption.
+        The number of post-like URLs and of unchanged posts are kept in
+        self.crawl_stats['candidates'] and self.crawl_stats['unchanged'].
+        """
+        known_lastmod = known_lastmod or {}
+        blog = urlparse(blog_url)
+        blog_path = blog.path.rstrip('/')
+        
+        candidates = []
+        for url, lastmod in entries:
+            parsed = urlparse(url)
+            if parsed.netloc != blog.netloc or parsed.path.rstrip('/') == blog_path:
+                continue
+            if re.search(config.NON_POST_URL_PATTERN, parsed.path):
+                continue
+            # On a blog host (empty blog_path) every page is under the blog, so only post-like paths count
+            if re.search(config.POST_URL_PATTERN, parsed.path) or (blog_path and parsed.path.startswith(blog_path + '/')):
+                candidates.append((url, lastmod))
+        
+        candidates.sort(key=lambda entry: self._lastmod_key(entry[1]), reverse=True)
+        
+        posts = []
+        unchanged = 0
+        for url, lastmod in candidates[:max_posts]:
+            if lastmod and known_lastmod.get(url) == lastmod:
+                unchanged += 1
+                continue
             
-            if is_post:
-                blog_posts.append(page)
-                
-                # Stop if we have enough posts
-                if len(blog_posts) >= max_posts:
-                    break
+            page_data = self.get_page_content(url)
+            if page_data and self.is_blog_post(page_data, blog_url):
+                page_data['lastmod'] = lastmod
+                posts.append(page_data)
+                if on_page:
+                    on_page(page_data)
+        
+        self.crawl_stats = {'candidates': len(candidates), 'unchanged': unchanged}
+        return posts
+    
+    def get_blog_posts(self, blog_url, max_posts=10, known_lastmod=None, checkpoint=None, on_page=None):
+        """Get blog posts from a blog URL.
+        
+        An empty result with self.crawl_stats['unchanged'] set means every
+        listed post is unchanged since the last collection.
+        """
+        self.crawl_stats = {}
+        
+        # Prefer the sitemap, which lists posts directly
+        entries = self.get_sitemap_entries(blog_url)
+        if entries:
+            posts = self.get_sitemap_posts(blog_url, entries, max_posts=max_posts, known_lastmod=known_lastmod,
+                                           on_page=on_page)
+            if self.crawl_stats['candidates']:
+                return posts
+            print(f"Sitemap of {blog_url} lists no posts, crawling instead")
+        
+        # Otherwise, crawl the blog, most post-like links first
+        blog_posts = self.crawl_website(
+            blog_url,
+            max_pages=max_posts,
+            score=score_url,
+            is_useful=lambda page: self.is_blog_post(page, blog_url),
+            max_fetches=max_posts * 2,
+            checkpoint=checkpoint,
+            on_page=on_page
+        )
+        
+        print(f"Crawled {self.crawl_stats['fetched']} pages for {self.crawl_stats['useful']} posts "
+              f"(efficiency {self.crawl_stats['efficiency']:.0%})")
+        
+        http_stats = self.http.stats()
+        print(f"HTTP totals: {http_stats['requests']} requests, {http_stats['reuse_rate']:.0%} on reused "
+              f"connections, {http_stats['bytes_received'] / 1024:.0f} KiB received")
         
         return blog_posts
+    
+    def is_blog_post(self, page, blog_url=None):
+        """Check if a page looks like a blog post."""
+        url_path = urlparse(page['url']).path
+        
+        # Index, tag and archive pages are not posts
+        if page['url'] == blog_url or re.search(config.NON_POST_URL_PATTERN, url_path):
+            return False
+        
+        # Check URL pattern
+        if re.search(config.POST_URL_PATTERN, url_path):
+            return True
+        
+        # Check content length
+        return len(page['content']) > config.MIN_CONTENT_LENGTH
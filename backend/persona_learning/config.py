@@ -7,6 +7,13 @@ MIN_CONTENT_ITEMS = 10
 MAX_CONTENT_ITEMS = 1000
 CONFIDENCE_THRESHOLD = 0.6
 
+# Fields read from stored content when learning a persona
+LEARNING_TWEET_FIELDS = [
+    'id_str', 'full_text', 'created_at', 'favorite_count', 'retweet_count',
+    'is_reply', 'is_retweet', 'hashtags', 'mentions'
+]
+LEARNING_CONTENT_FIELDS = ['url', 'title', 'content']
+
 # Knowledge domains configuration
 DOMAIN_KEYWORDS = {
     'Artificial Intelligence': [
@@ -114,3 +121,13 @@ VALUES_KEYWORDS = [
 
 # Output configuration
 PERSONA_MODEL_VERSION = '0.1'
+
+# Persona vector configuration
+MIN_VECTOR_TOKEN_LENGTH = 3
+SIMILARITY_BLOCK_SIZE = 1024
+# Upper bound on the score nonzeros materialized per block in all_most_similar
+SIMILARITY_BLOCK_NNZ = 10000000
+# Terms used by more than this share of users are left out of the vectors...
+MAX_VECTOR_DOC_FREQ = 0.5
+# ...once the index has this many users
+MIN_USERS_FOR_DF_PRUNING = 100
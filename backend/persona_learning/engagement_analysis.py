@@ -6,13 +6,39 @@ import re
 import statistics
 from datetime import datetime, timedelta
 from . import config
+from .streaming_engagement import EngagementAccumulator
+
+# Sections produced by analyze_all_engagement
+ENGAGEMENT_SECTIONS = (
+    'posting_patterns',
+    'engagement_metrics',
+    'interaction_patterns',
+    'question_handling',
+    'hashtag_usage'
+)
+
+def _mean(values):
+    """Mean matching statistics.mean, with a fast exact path for integer counts."""
+    if all(type(value) is int for value in values):
+        return _exact_mean(sum(values), len(values))
+    return statistics.mean(values)
+
+def _exact_mean(total, count):
+    """Mean of integers from their total, typed like statistics.mean."""
+    if isinstance(total, int):
+        return total // count if total % count == 0 else total / count
+    return total / count
 
 class EngagementAnalyzer:
     """Engagement analyzer for analyzing user interaction patterns."""
     
-    def __init__(self):
-        """Initialize engagement analyzer."""
-        pass
+    def __init__(self, sketch_factory=None):
+        """Initialize engagement analyzer.
+        
+        `sketch_factory(capacity)` builds the heavy-hitter sketch used when a
+        sketch_capacity is given, such as data_collection's SpaceSaving.
+        """
+        self.sketch_factory = sketch_factory
     
     def analyze_posting_patterns(self, tweets):
         """Analyze posting patterns from tweets."""
@@ -29,6 +55,10 @@ class EngagementAnalyzer:
             except (ValueError, KeyError):
                 continue
         
+        return self._summarize_posting_patterns(timestamps)
+    
+    def _summarize_posting_patterns(self, timestamps):
+        """Summarize posting patterns from parsed timestamps."""
         if not timestamps:
             return None
         
@@ -86,17 +116,21 @@ class EngagementAnalyzer:
             except KeyError:
                 continue
         
+        return self._summarize_engagement_metrics(likes, retweets, len(tweets))
+    
+    def _summarize_engagement_metrics(self, likes, retweets, tweet_count):
+        """Summarize engagement metrics from like and retweet counts."""
         if not likes or not retweets:
             return None
         
         # Calculate engagement statistics
-        avg_likes = statistics.mean(likes) if likes else 0
-        avg_retweets = statistics.mean(retweets) if retweets else 0
+        avg_likes = _mean(likes) if likes else 0
+        avg_retweets = _mean(retweets) if retweets else 0
         max_likes = max(likes) if likes else 0
         max_retweets = max(retweets) if retweets else 0
         
         # Calculate engagement rate
-        engagement_rate = (sum(likes) + sum(retweets)) / (len(tweets) * 100) if tweets else 0
+        engagement_rate = (sum(likes) + sum(retweets)) / (tweet_count * 100) if tweet_count else 0
         
         return {
             'avg_likes': avg_likes,
@@ -127,6 +161,10 @@ class EngagementAnalyzer:
             except KeyError:
                 continue
         
+        return self._summarize_interaction_patterns(replies, retweets, original)
+    
+    def _summarize_interaction_patterns(self, replies, retweets, original):
+        """Summarize interaction patterns from reply, retweet and original counts."""
         total = replies + retweets + original
         
         # Calculate percentages
@@ -175,8 +213,12 @@ class EngagementAnalyzer:
             except KeyError:
                 continue
         
+        return self._summarize_question_handling(question_tweets, question_marks, len(tweets))
+    
+    def _summarize_question_handling(self, question_tweets, question_marks, tweet_count):
+        """Summarize question handling from question counts."""
         # Calculate question frequency
-        question_frequency = question_tweets / len(tweets) if tweets else 0
+        question_frequency = question_tweets / tweet_count if tweet_count else 0
         
         # Determine question handling style
         if question_frequency > 0.3:
@@ -193,11 +235,19 @@ class EngagementAnalyzer:
             'question_style': question_style
         }
     
-    def analyze_hashtag_usage(self, tweets):
-        """Analyze hashtag usage patterns."""
+    def analyze_hashtag_usage(self, tweets, sketch_capacity=None):
+        """Analyze hashtag usage patterns.
+        
+        With sketch_capacity set, hashtags are counted in a bounded Space-Saving
+        sketch instead of an exact Counter; top_hashtags counts are then upper
+        bounds, and unique_hashtags and hashtag_frequency are omitted.
+        """
         if not tweets:
             return None
         
+        if sketch_capacity:
+            return self._sketch_hashtag_usage(tweets, self._sketch(sketch_capacity))
+        
         # Extract hashtags
         all_hashtags = []
         
@@ -211,31 +261,232 @@ class EngagementAnalyzer:
         # Count hashtag frequency
         hashtag_counts = Counter(all_hashtags)
         
+        return self._summarize_hashtag_usage(hashtag_counts, len(all_hashtags), len(tweets))
+    
+    def _sketch(self, capacity):
+        """Build a heavy-hitter sketch of a given capacity."""
+        if self.sketch_factory is None:
+            raise ValueError("sketch_capacity requires an analyzer with a sketch_factory")
+        return self.sketch_factory(capacity)
+    
+    def _sketch_hashtag_usage(self, tweets, sketch):
+        """Analyze hashtag usage with a bounded heavy-hitter sketch."""
+        for tweet in tweets:
+            hashtags = tweet.get('hashtags')
+            if hashtags is not None:
+                sketch.update(hashtags)
+        
+        return {
+            'total_hashtags': sketch.total,
+            'avg_hashtags_per_tweet': sketch.total / len(tweets),
+            'top_hashtags': sketch.most_common(10)
+        }
+    
+    def _summarize_hashtag_usage(self, hashtag_counts, total_hashtags, tweet_count, include_frequency=True):
+        """Summarize hashtag usage from hashtag counts."""
         # Calculate hashtag statistics
-        total_hashtags = len(all_hashtags)
         unique_hashtags = len(hashtag_counts)
-        avg_hashtags_per_tweet = total_hashtags / len(tweets) if tweets else 0
+        avg_hashtags_per_tweet = total_hashtags / tweet_count if tweet_count else 0
         
         # Get top hashtags
         top_hashtags = hashtag_counts.most_common(10)
         
-        return {
+        usage = {
             'total_hashtags': total_hashtags,
             'unique_hashtags': unique_hashtags,
             'avg_hashtags_per_tweet': avg_hashtags_per_tweet,
-            'top_hashtags': top_hashtags,
-            'hashtag_frequency': dict(hashtag_counts)
+            'top_hashtags': top_hashtags
         }
     
-    def analyze_all_engagement(self, tweets):
-        """Analyze all engagement aspects from tweets."""
+        if include_frequency:
+            usage['hashtag_frequency'] = dict(hashtag_counts)
+        
+        return usage
+    
+    def analyze_all_engagement(self, tweets, sections=None, hashtag_frequency=True):
+        """Analyze all engagement aspects from tweets in a single pass.
+        
+        sections limits the result to a subset of ENGAGEMENT_SECTIONS, and
+        hashtag_frequency=False drops the full per-hashtag counts from
+        'hashtag_usage'. Skipped sections are not computed at all.
+        """
         if not tweets:
             return None
         
+        sections = ENGAGEMENT_SECTIONS if sections is None else tuple(sections)
+        for section in sections:
+            if section not in ENGAGEMENT_SECTIONS:
+                raise ValueError(f"Unknown engagement section: {section}")
+        
+        want_posting = 'posting_patterns' in sections
+        want_metrics = 'engagement_metrics' in sections
+        want_interaction = 'interaction_patterns' in sections
+        want_questions = 'question_handling' in sections
+        want_hashtags = 'hashtag_usage' in sections
+        
+        timestamps = []
+        likes = []
+        retweets = []
+        all_hashtags = []
+        replies = retweeted = original = 0
+        question_tweets = question_marks = 0
+        
+        # Bind hot-loop callables once instead of per tweet
+        parse_timestamp = datetime.fromisoformat
+        add_timestamp = timestamps.append
+        add_like = likes.append
+        add_retweet = retweets.append
+        add_hashtags = all_hashtags.extend
+        
+        for tweet in tweets:
+            if want_posting:
+                created_at = tweet.get('created_at')
+                if created_at is not None:
+                    try:
+                        add_timestamp(parse_timestamp(created_at.replace('Z', '+00:00')))
+                    except ValueError:
+                        pass
+            
+            if want_metrics:
+                like_count = tweet.get('favorite_count')
+                if like_count is not None:
+                    add_like(like_count)
+                    retweet_count = tweet.get('retweet_count')
+                    if retweet_count is not None:
+                        add_retweet(retweet_count)
+            
+            if want_interaction:
+                is_reply = tweet.get('is_reply')
+                if is_reply:
+                    replies += 1
+                elif is_reply is not None:
+                    is_retweet = tweet.get('is_retweet')
+                    if is_retweet:
+                        retweeted += 1
+                    elif is_retweet is not None:
+                        original += 1
+            
+            if want_questions:
+                text = tweet.get('full_text')
+                if text and '?' in text:
+                    question_tweets += 1
+                    question_marks += text.count('?')
+            
+            if want_hashtags:
+                hashtags = tweet.get('hashtags')
+                if hashtags is not None:
+                    add_hashtags(hashtags)
+        
+        tweet_count = len(tweets)
+        results = {}
+        
+        for section in ENGAGEMENT_SECTIONS:
+            if section not in sections:
+                continue
+            if section == 'posting_patterns':
+                results[section] = self._summarize_posting_patterns(timestamps)
+            elif section == 'engagement_metrics':
+                results[section] = self._summarize_engagement_metrics(likes, retweets, tweet_count)
+            elif section == 'interaction_patterns':
+                results[section] = self._summarize_interaction_patterns(replies, retweeted, original)
+            elif section == 'question_handling':
+                results[section] = self._summarize_question_handling(question_tweets, question_marks, tweet_count)
+            elif section == 'hashtag_usage':
+                results[section] = self._summarize_hashtag_usage(
+                    Counter(all_hashtags), len(all_hashtags), tweet_count, include_frequency=hashtag_frequency
+                )
+        
+        return results
+    
+    def analyze_stream(self, tweets, sections=None, sketch_capacity=None):
+        """Analyze engagement from an iterable of tweets in constant memory.
+        
+        Accepts any iterable, such as a generator or a MongoDB cursor. Hashtag
+        usage is limited to totals, since exact per-hashtag counts would grow
+        with the history; pass sketch_capacity to also estimate top hashtags.
+        """
+        sketch = self._sketch(sketch_capacity) if sketch_capacity else None
+        accumulator = EngagementAccumulator(sketch=sketch).update(tweets)
+        return self.summarize_accumulator(accumulator, sections)
+    
+    def summarize_accumulator(self, accumulator, sections=None):
+        """Summarize an EngagementAccumulator, e.g. one merged across partitions."""
+        if not accumulator.tweet_count:
+            return None
+        
+        sections = ENGAGEMENT_SECTIONS if sections is None else tuple(sections)
+        for section in sections:
+            if section not in ENGAGEMENT_SECTIONS:
+                raise ValueError(f"Unknown engagement section: {section}")
+        
+        tweet_count = accumulator.tweet_count
+        results = {}
+        
+        if 'posting_patterns' in sections:
+            results['posting_patterns'] = self._summarize_accumulated_posting(accumulator)
+        
+        if 'engagement_metrics' in sections:
+            likes = accumulator.likes
+            retweets = accumulator.retweets
+            if likes.count and retweets.count:
+                results['engagement_metrics'] = {
+                    'avg_likes': _exact_mean(likes.total, likes.count),
+                    'avg_retweets': _exact_mean(retweets.total, retweets.count),
+                    'max_likes': likes.max,
+                    'max_retweets': retweets.max,
+                    'engagement_rate': (likes.total + retweets.total) / (tweet_count * 100)
+                }
+            else:
+                results['engagement_metrics'] = None
+        
+        if 'interaction_patterns' in sections:
+            results['interaction_patterns'] = self._summarize_interaction_patterns(
+                accumulator.replies, accumulator.retweeted, accumulator.original
+            )
+        
+        if 'question_handling' in sections:
+            results['question_handling'] = self._summarize_question_handling(
+                accumulator.question_tweets, accumulator.question_marks, tweet_count
+            )
+        
+        if 'hashtag_usage' in sections:
+            results['hashtag_usage'] = {
+                'total_hashtags': accumulator.total_hashtags,
+                'avg_hashtags_per_tweet': accumulator.total_hashtags / tweet_count
+            }
+            if accumulator.hashtag_sketch is not None:
+                results['hashtag_usage']['top_hashtags'] = accumulator.hashtag_sketch.most_common(10)
+        
+        return results
+    
+    def _summarize_accumulated_posting(self, accumulator):
+        """Summarize posting patterns from accumulated histograms."""
+        if not accumulator.timestamp_count:
+            return None
+        
+        # The mean of consecutive gaps between sorted posts telescopes to the overall span
+        if accumulator.timestamp_count > 1:
+            span_hours = (accumulator.last_timestamp - accumulator.first_timestamp) / 3600
+            avg_time_between_posts = span_hours / (accumulator.timestamp_count - 1)
+            posts_per_day = 24 / avg_time_between_posts if avg_time_between_posts > 0 else 0
+        else:
+            avg_time_between_posts = 0
+            posts_per_day = 0
+        
+        hour_distribution, peak_hour = accumulator.distribution(
+            accumulator.hour_counts, accumulator.hour_first_seen
+        )
+        day_counts, peak_day = accumulator.distribution(
+            accumulator.day_counts, accumulator.day_first_seen
+        )
+        
+        day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        
         return {
-            'posting_patterns': self.analyze_posting_patterns(tweets),
-            'engagement_metrics': self.analyze_engagement_metrics(tweets),
-            'interaction_patterns': self.analyze_interaction_patterns(tweets),
-            'question_handling': self.analyze_question_handling(tweets),
-            'hashtag_usage': self.analyze_hashtag_usage(tweets)
+            'posts_per_day': posts_per_day,
+            'avg_time_between_posts': avg_time_between_posts,
+            'peak_hour': peak_hour,
+            'peak_day': day_names[peak_day] if peak_day is not None else None,
+            'hour_distribution': hour_distribution,
+            'day_distribution': {day_names[day]: count for day, count in day_counts.items()}
         }
@@ -5,6 +5,11 @@ Persona learning package for Linkfo.
 from .learner import PersonaLearner
 from .text_analysis import TextAnalyzer
 from .engagement_analysis import EngagementAnalyzer
+from .vectorized_engagement import VectorizedEngagementAnalyzer
+from .streaming_engagement import EngagementAccumulator
 from .persona_model import PersonaModel
+from .persona_cache import PersonaCache
+from .persona_vectors import PersonaVectorIndex
 
-__all__ = ['PersonaLearner', 'TextAnalyzer', 'EngagementAnalyzer', 'PersonaModel']
+__all__ = ['PersonaLearner', 'TextAnalyzer', 'EngagementAnalyzer', 'VectorizedEngagementAnalyzer', 'EngagementAccumulator', 'PersonaModel',
+           'PersonaCache', 'PersonaVectorIndex']
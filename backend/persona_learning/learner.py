@@ -2,7 +2,7 @@
 Persona learner module for learning user personas from collected data.
 """
 from .text_analysis import TextAnalyzer
-from .engagement_analysis import EngagementAnalyzer
+from .vectorized_engagement import VectorizedEngagementAnalyzer
 from .persona_model import PersonaModel
 from . import config
 
@@ -12,7 +12,7 @@ class PersonaLearner:
     def __init__(self):
         """Initialize persona learner."""
         self.text_analyzer = TextAnalyzer()
-        self.engagement_analyzer = EngagementAnalyzer()
+        self.engagement_analyzer = VectorizedEngagementAnalyzer()
     
     def learn_persona(self, user_id, tweets, web_content):
         """Learn persona from collected data."""
@@ -22,11 +22,18 @@ class PersonaLearner:
             print(f"Not enough content for user {user_id}")
             return None
         
+        # Writing style needs the tweet text, which batches only carry when asked to
+        if self.engagement_analyzer.is_batch(tweets) and tweets.texts is None:
+            raise ValueError("Tweet batch has no text; build it with keep_text=True")
+        
         # Create persona model
         persona = PersonaModel(user_id)
         
         # Extract text content
-        tweet_texts = [tweet['full_text'] for tweet in tweets if 'full_text' in tweet]
+        if self.engagement_analyzer.is_batch(tweets):
+            tweet_texts = tweets.texts
+        else:
+            tweet_texts = [tweet['full_text'] for tweet in tweets if 'full_text' in tweet]
         web_texts = [content['content'] for content in web_content if 'content' in content]
         all_texts = tweet_texts + web_texts
         
@@ -40,7 +47,10 @@ class PersonaLearner:
         
         # Learn communication style
         if tweets:
-            engagement_data = self.engagement_analyzer.analyze_all_engagement(tweets)
+            engagement_data = self.engagement_analyzer.analyze_all_engagement(
+                tweets,
+                sections=('posting_patterns', 'interaction_patterns', 'question_handling')
+            )
             writing_style = self.text_analyzer.analyze_writing_style(tweet_texts)
             
             communication_style = {
@@ -0,0 +1,111 @@
+"""
+Persona cache module for serving persona models without re-learning them.
+"""
+from collections import OrderedDict
+from .learner import PersonaLearner
+from .persona_model import PersonaModel
+from . import config
+
+class PersonaCache:
+    """Two-tier persona model cache.
+    
+    The first tier is an in-process LRU of deserialized PersonaModel objects,
+    the second is the persona cache collection in the Database. Entries are
+    keyed by user_id and a fingerprint of the user's content, so saving new
+    content for a user makes the cached persona stale automatically.
+    """
+    
+    def __init__(self, db, learner=None, capacity=256):
+        """Initialize persona cache on top of a Database."""
+        self.db = db
+        self.learner = learner or PersonaLearner()
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        
+        # Drop in-process entries as soon as this process saves new content
+        self.db.add_content_listener(self.invalidate)
+    
+    def fingerprint(self, user_id):
+        """Get the fingerprint of a user's current content, or None if the database is unavailable."""
+        version = self.db.get_content_version(user_id)
+        if version is None:
+            return None
+        return f"{config.PERSONA_MODEL_VERSION}:{version}"
+    
+    def get(self, user_id, fingerprint=None):
+        """Get a cached persona model, or None if missing, stale or the content version is unknown."""
+        if fingerprint is None:
+            fingerprint = self.fingerprint(user_id)
+        if fingerprint is None:
+            return None
+        
+        entry = self.entries.get(user_id)
+        if entry and entry[0] == fingerprint:
+            self.entries.move_to_end(user_id)
+            self.memory_hits += 1
+            return entry[1]
+        
+        stored = self.db.get_cached_persona(user_id)
+        if stored and stored.get('fingerprint') == fingerprint:
+            persona = PersonaModel.loads(stored['persona'])
+            self._remember(user_id, fingerprint, persona)
+            self.store_hits += 1
+            return persona
+        
+        self.misses += 1
+        return None
+    
+    def put(self, user_id, fingerprint, persona):
+        """Store a persona model in both tiers, unless there is no fingerprint to key it by."""
+        if fingerprint is None:
+            return
+        self._remember(user_id, fingerprint, persona)
+        self.db.save_cached_persona(user_id, fingerprint, persona.to_bytes())
+    
+    def get_or_learn(self, user_id):
+        """Get a persona model, learning it only if the user's content changed."""
+        # Take the fingerprint first so content saved while learning invalidates the result
+        fingerprint = self.fingerprint(user_id)
+        
+        # Without a content version, learn without reading or writing the cache
+        if fingerprint is not None:
+            persona = self.get(user_id, fingerprint)
+            if persona is not None:
+                return persona
+        
+        tweets = list(self.db.iter_tweets(user_id, fields=config.LEARNING_TWEET_FIELDS,
+                                          limit=config.MAX_CONTENT_ITEMS))
+        web_content = list(self.db.iter_web_content(user_id, fields=config.LEARNING_CONTENT_FIELDS,
+                                                    limit=config.MAX_CONTENT_ITEMS))
+        
+        persona = self.learner.learn_persona(user_id, tweets, web_content)
+        if persona is not None:
+            self.put(user_id, fingerprint, persona)
+        
+        return persona
+    
+    def invalidate(self, user_id):
+        """Drop a user's persona from the in-process tier."""
+        self.entries.pop(user_id, None)
+    
+    def _remember(self, user_id, fingerprint, persona):
+        """Add an entry to the in-process LRU, evicting the oldest if full."""
+        self.entries[user_id] = (fingerprint, persona)
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+    
+    def stats(self):
+        """Get cache hit/miss counters."""
+        lookups = self.memory_hits + self.store_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'store_hits': self.store_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.store_hits) / lookups if lookups else 0.0,
+            'size': len(self.entries)
+        }
@@ -2,14 +2,66 @@
 Persona model module for creating and managing persona models.
 """
 import json
+import struct
+import time
+import zlib
 from datetime import datetime
 from . import config
 
+# Binary encoding: header, then (tag, length, payload) sections
+BINARY_MAGIC = b'LKPM'
+BINARY_FORMAT_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sBH')
+BINARY_SECTION = struct.Struct('<BI')
+COMPRESSED_FLAG = 0x80
+COMPRESS_THRESHOLD = 256  # bytes
+
+SECTION_IDS = {
+    'core': 0,
+    'knowledge_domains': 1,
+    'communication_style': 2,
+    'personality_traits': 3,
+    'values_and_interests': 4
+}
+SECTION_NAMES = {section_id: name for name, section_id in SECTION_IDS.items()}
+
+# Sections left encoded by from_bytes until first accessed
+LAZY_SECTIONS = ('values_and_interests',)
+
+def _section(name):
+    """Property for a persona section that may still be encoded."""
+    slot = '_' + name
+    
+    def getter(self):
+        value = getattr(self, slot)
+        if value is None and self._raw_sections and name in self._raw_sections:
+            value = self._decode_section(name)
+        return value
+    
+    def setter(self, value):
+        setattr(self, slot, value)
+        if self._raw_sections:
+            self._raw_sections.pop(name, None)
+    
+    return property(getter, setter)
+
 class PersonaModel:
     """Persona model for representing a user's online persona."""
     
+    __slots__ = (
+        'user_id', 'version', 'created_at', '_updated_at',
+        '_knowledge_domains', '_communication_style', '_personality_traits', '_values_and_interests',
+        '_raw_sections', 'content_sample_size', 'confidence_score'
+    )
+    
+    knowledge_domains = _section('knowledge_domains')
+    communication_style = _section('communication_style')
+    personality_traits = _section('personality_traits')
+    values_and_interests = _section('values_and_interests')
+    
     def __init__(self, user_id):
         """Initialize persona model."""
+        self._raw_sections = None
         self.user_id = user_id
         self.version = config.PERSONA_MODEL_VERSION
         self.created_at = datetime.now().isoformat()
@@ -28,10 +80,25 @@ class PersonaModel:
         self.content_sample_size = 0
         self.confidence_score = 0.0
     
+    @property
+    def updated_at(self):
+        """ISO timestamp of the last update, formatted on first read."""
+        if isinstance(self._updated_at, float):
+            self._updated_at = datetime.fromtimestamp(self._updated_at).isoformat()
+        return self._updated_at
+    
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = value
+    
+    def _touch(self):
+        """Record an update without formatting a timestamp yet."""
+        self._updated_at = time.time()
+    
     def update_knowledge_domains(self, domains):
         """Update knowledge domains in the persona model."""
         self.knowledge_domains = domains
-        self.updated_at = datetime.now().isoformat()
+        self._touch()
     
     def update_communication_style(self, style):
         """Update communication style in the persona model."""
@@ -43,7 +110,7 @@ class PersonaModel:
             'engagement_level': self._derive_engagement_level(style),
             'helpfulness': self._derive_helpfulness(style)
         }
-        self.updated_at = datetime.now().isoformat()
+        self._touch()
     
     def _derive_response_speed(self, style):
         """Derive response speed from engagement analysis."""
@@ -84,18 +151,18 @@ class PersonaModel:
     def update_personality_traits(self, traits):
         """Update personality traits in the persona model."""
         self.personality_traits = traits
-        self.updated_at = datetime.now().isoformat()
+        self._touch()
     
     def update_values_and_interests(self, values_interests):
         """Update values and interests in the persona model."""
         self.values_and_interests = values_interests
-        self.updated_at = datetime.now().isoformat()
+        self._touch()
     
     def update_metadata(self, content_sample_size, confidence_score):
         """Update metadata in the persona model."""
         self.content_sample_size = content_sample_size
         self.confidence_score = confidence_score
-        self.updated_at = datetime.now().isoformat()
+        self._touch()
     
     def to_dict(self):
         """Convert persona model to dictionary."""
@@ -136,3 +203,102 @@ class PersonaModel:
         """Create persona model from JSON string."""
         data = json.loads(json_str)
         return cls.from_dict(data)
+    
+    def to_bytes(self):
+        """Convert persona model to the compact versioned binary encoding."""
+        core = [
+            self.user_id, self.version, self.created_at, self.updated_at,
+            self.content_sample_size, self.confidence_score
+        ]
+        
+        parts = [BINARY_HEADER.pack(BINARY_MAGIC, BINARY_FORMAT_VERSION, len(SECTION_IDS))]
+        parts.extend(self._encode_section('core', core))
+        
+        for name in ('knowledge_domains', 'communication_style', 'personality_traits', 'values_and_interests'):
+            raw = self._raw_sections.get(name) if self._raw_sections else None
+            if raw is not None:
+                # Still encoded, copy it through without decoding
+                tag, payload = raw
+                parts.append(BINARY_SECTION.pack(tag, len(payload)))
+                parts.append(payload)
+            else:
+                parts.extend(self._encode_section(name, getattr(self, name)))
+        
+        return b''.join(parts)
+    
+    def _encode_section(self, name, value):
+        """Encode a section as header and payload byte strings."""
+        tag = SECTION_IDS[name]
+        payload = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        
+        if len(payload) > COMPRESS_THRESHOLD:
+            compressed = zlib.compress(payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                tag |= COMPRESSED_FLAG
+        
+        return [BINARY_SECTION.pack(tag, len(payload)), payload]
+    
+    @staticmethod
+    def _decode_payload(tag, payload):
+        """Decode a section payload."""
+        if tag & COMPRESSED_FLAG:
+            payload = zlib.decompress(payload)
+        return json.loads(payload)
+    
+    def _decode_section(self, name):
+        """Decode a lazily loaded section on first access."""
+        tag, payload = self._raw_sections.pop(name)
+        value = self._decode_payload(tag, payload)
+        setattr(self, '_' + name, value)
+        return value
+    
+    @classmethod
+    def from_bytes(cls, data, lazy_sections=LAZY_SECTIONS):
+        """Create persona model from the binary encoding produced by to_bytes."""
+        view = memoryview(data)
+        magic, format_version, section_count = BINARY_HEADER.unpack_from(view, 0)
+        if magic != BINARY_MAGIC:
+            raise ValueError("Not a binary persona model")
+        if format_version > BINARY_FORMAT_VERSION:
+            raise ValueError(f"Unsupported persona model format version: {format_version}")
+        
+        model = None
+        offset = BINARY_HEADER.size
+        
+        for _ in range(section_count):
+            tag, length = BINARY_SECTION.unpack_from(view, offset)
+            offset += BINARY_SECTION.size
+            payload = bytes(view[offset:offset + length])
+            offset += length
+            
+            name = SECTION_NAMES.get(tag & ~COMPRESSED_FLAG)
+            if name is None:
+                continue  # Section from a newer format, skip it
+            
+            if name == 'core':
+                user_id, version, created_at, updated_at, sample_size, confidence = cls._decode_payload(tag, payload)
+                model = cls(user_id)
+                model.version = version
+                model.created_at = created_at
+                model.updated_at = updated_at
+                model.content_sample_size = sample_size
+                model.confidence_score = confidence
+            elif name in lazy_sections:
+                if model._raw_sections is None:
+                    model._raw_sections = {}
+                model._raw_sections[name] = (tag, payload)
+                setattr(model, '_' + name, None)
+            else:
+                setattr(model, '_' + name, cls._decode_payload(tag, payload))
+        
+        return model
+    
+    @classmethod
+    def loads(cls, data):
+        """Create persona model from binary, JSON or dictionary form."""
+        if isinstance(data, dict):
+            return cls.from_dict(data)
+        if isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:4]) == BINARY_MAGIC:
+            return cls.from_bytes(data)
+        return cls.from_json(data)
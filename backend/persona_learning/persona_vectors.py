@@ -0,0 +1,252 @@
+"""
+Sparse TF-IDF persona vectors and similar-creator search.
+"""
+import re
+import numpy as np
+from scipy import sparse
+from . import config
+
+# Lowercase word tokens, as data_collection's search_index.tokenize splits them
+TOKEN_PATTERN = re.compile(r'[^\W\d_]+')
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+class PersonaVectorIndex:
+    """TF-IDF vectors over every user's content with top-k cosine search.
+    
+    Each user's term counts are kept as a sparse row and corpus document
+    frequencies (one "document" per user) are updated incrementally as users
+    are added or replaced. The normalized TF-IDF matrix is rebuilt lazily in
+    O(nnz) the first time it is needed after a change, leaving out terms
+    used by more than config.MAX_VECTOR_DOC_FREQ of users, which carry
+    little signal but would make every pair of users similar.
+    """
+    
+    def __init__(self, tokenizer=None):
+        """Initialize an empty index, splitting texts with `tokenizer(text)` if given."""
+        self.tokenizer = tokenizer or tokenize
+        self.vocabulary = {}
+        self.doc_freq = np.zeros(1024, dtype=np.int64)
+        self.user_ids = []
+        self.user_rows = {}
+        self.rows = []
+        self._matrix = None
+        self._kept = None
+    
+    def add_user(self, user_id, texts):
+        """Add or replace a user's content, given as an iterable of texts."""
+        counts = {}
+        for text in texts:
+            for token in self.tokenizer(text):
+                if len(token) >= config.MIN_VECTOR_TOKEN_LENGTH:
+                    counts[token] = counts.get(token, 0) + 1
+        
+        columns = np.fromiter((self._column(token) for token in counts), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        order = np.argsort(columns)
+        row = (columns[order], values[order])
+        
+        if user_id in self.user_rows:
+            position = self.user_rows[user_id]
+            self.doc_freq[self.rows[position][0]] -= 1
+            self.rows[position] = row
+        else:
+            self.user_rows[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            self.rows.append(row)
+        
+        self.doc_freq[row[0]] += 1
+        self._matrix = None
+    
+    def add_user_content(self, user_id, tweets, web_content):
+        """Add a user from stored tweet and web content documents."""
+        texts = [tweet['full_text'] for tweet in tweets if 'full_text' in tweet]
+        texts += [content['content'] for content in web_content if 'content' in content]
+        self.add_user(user_id, texts)
+    
+    def _column(self, token):
+        """Get the column of a token, growing the vocabulary if needed."""
+        column = self.vocabulary.get(token)
+        if column is None:
+            column = len(self.vocabulary)
+            self.vocabulary[token] = column
+            if column >= len(self.doc_freq):
+                self.doc_freq = np.concatenate([self.doc_freq, np.zeros_like(self.doc_freq)])
+        return column
+    
+    def idf(self):
+        """Smoothed inverse document frequency of every vocabulary term."""
+        df = self.doc_freq[:len(self.vocabulary)]
+        return np.log((1 + len(self.user_ids)) / (1 + df)) + 1
+    
+    def kept_terms(self):
+        """Boolean mask of the vocabulary terms used in the vectors."""
+        df = self.doc_freq[:len(self.vocabulary)]
+        if len(self.user_ids) < config.MIN_USERS_FOR_DF_PRUNING:
+            return np.ones(len(df), dtype=bool)
+        return df <= config.MAX_VECTOR_DOC_FREQ * len(self.user_ids)
+    
+    @property
+    def matrix(self):
+        """L2-normalized TF-IDF matrix with one row per user, as CSR."""
+        if self._matrix is None:
+            self._kept = self.kept_terms()
+            self._matrix = self._build_matrix(self._kept)
+        return self._matrix
+    
+    def _build_matrix(self, kept):
+        """Build the TF-IDF matrix from the per-user term counts of kept terms."""
+        shape = (len(self.user_ids), len(self.vocabulary))
+        if not self.rows:
+            return sparse.csr_matrix(shape)
+        
+        lengths = np.array([len(columns) for columns, _ in self.rows], dtype=np.int64)
+        row_ids = np.repeat(np.arange(shape[0]), lengths)
+        indices = np.concatenate([columns for columns, _ in self.rows])
+        counts = np.concatenate([values for _, values in self.rows])
+        
+        mask = kept[indices]
+        row_ids, indices, counts = row_ids[mask], indices[mask], counts[mask]
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(row_ids, minlength=shape[0]))])
+        
+        # Sublinear term frequency
+        data = (1 + np.log(counts)) * self.idf()[indices]
+        
+        norms = np.sqrt(np.bincount(row_ids, weights=data * data, minlength=shape[0]))
+        norms[norms == 0] = 1
+        data /= norms[row_ids]
+        
+        return sparse.csr_matrix((data, indices, indptr), shape=shape)
+    
+    def vector(self, user_id):
+        """Get a user's normalized TF-IDF vector as a 1-row CSR matrix."""
+        position = self.user_rows[user_id]
+        return self.matrix[position]
+    
+    def top_terms(self, user_id, n=10):
+        """Get a user's highest-weighted terms."""
+        row = self.vector(user_id)
+        terms = list(self.vocabulary)
+        order = np.argsort(-row.data)[:n]
+        return [(terms[row.indices[i]], float(row.data[i])) for i in order]
+    
+    def most_similar(self, user_id, top_k=10):
+        """Get the top_k users most similar to a user by cosine similarity."""
+        if user_id not in self.user_rows:
+            return []
+        
+        position = self.user_rows[user_id]
+        scores = (self.matrix @ self.matrix[position].T).toarray().ravel()
+        scores[position] = -1
+        return self._top(scores, top_k)
+    
+    def similar_to_texts(self, texts, top_k=10):
+        """Get the top_k users most similar to arbitrary texts."""
+        matrix = self.matrix
+        counts = {}
+        for text in texts:
+            for token in self.tokenizer(text):
+                column = self.vocabulary.get(token)
+                if column is not None and self._kept[column]:
+                    counts[column] = counts.get(column, 0) + 1
+        if not counts:
+            return []
+        
+        columns = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        values = (1 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))) * self.idf()[columns]
+        values /= np.linalg.norm(values)
+        
+        query = np.zeros(len(self.vocabulary), dtype=np.float64)
+        query[columns] = values
+        return self._top(matrix @ query, top_k)
+    
+    def all_most_similar(self, top_k=10, block_size=None, block_nnz=None):
+        """Get the top_k neighbours of every user using a blocked sparse product.
+        
+        Rows are processed at most `block_size` at a time and the sparse block
+        of scores is scanned row by row. A row's scores have at most as many
+        nonzeros as the summed document frequencies of its terms, so blocks
+        are also cut before that bound exceeds `block_nnz`, which keeps memory
+        bounded regardless of the number of users.
+        """
+        block_size = block_size or config.SIMILARITY_BLOCK_SIZE
+        block_nnz = block_nnz or config.SIMILARITY_BLOCK_NNZ
+        matrix = self.matrix
+        transposed = matrix.T.tocsr()
+        neighbours = {}
+        
+        # Upper bound on each row's score nonzeros, accumulated over rows
+        row_ids = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        bounds = np.cumsum(np.bincount(row_ids, weights=np.diff(transposed.indptr)[matrix.indices],
+                                       minlength=matrix.shape[0]))
+        
+        start = 0
+        while start < matrix.shape[0]:
+            used = bounds[start - 1] if start else 0
+            end = int(np.searchsorted(bounds, used + block_nnz, side='right'))
+            end = min(max(end, start + 1), start + block_size)
+            
+            block = matrix[start:end] @ transposed
+            for offset in range(block.shape[0]):
+                position = start + offset
+                row_start, row_end = block.indptr[offset], block.indptr[offset + 1]
+                columns = block.indices[row_start:row_end]
+                scores = block.data[row_start:row_end].copy()
+                scores[columns == position] = -1
+                
+                if scores.size > top_k:
+                    candidates = np.argpartition(-scores, top_k)[:top_k]
+                else:
+                    candidates = np.arange(scores.size)
+                candidates = candidates[np.argsort(-scores[candidates])]
+                neighbours[self.user_ids[position]] = [
+                    (self.user_ids[columns[i]], float(scores[i])) for i in candidates if scores[i] > 0
+                ]
+            start = end
+        
+        return neighbours
+    
+    def _top(self, scores, top_k):
+        """Get (user_id, score) pairs for the top_k positive scores."""
+        scores = np.asarray(scores).ravel()
+        if scores.size > top_k:
+            candidates = np.argpartition(-scores, top_k)[:top_k]
+        else:
+            candidates = np.arange(scores.size)
+        candidates = candidates[np.argsort(-scores[candidates])]
+        return [(self.user_ids[i], float(scores[i])) for i in candidates if scores[i] > 0]
+    
+    def save(self, path):
+        """Save the vocabulary, document frequencies and term counts to an .npz file."""
+        lengths = np.array([len(columns) for columns, _ in self.rows], dtype=np.int64)
+        np.savez_compressed(
+            path,
+            terms=np.array(list(self.vocabulary), dtype=object),
+            doc_freq=self.doc_freq[:len(self.vocabulary)],
+            user_ids=np.array(self.user_ids, dtype=object),
+            lengths=lengths,
+            columns=np.concatenate([columns for columns, _ in self.rows]) if self.rows else np.zeros(0, dtype=np.int64),
+            counts=np.concatenate([values for _, values in self.rows]) if self.rows else np.zeros(0)
+        )
+    
+    @classmethod
+    def load(cls, path, tokenizer=None):
+        """Load an index saved with save()."""
+        data = np.load(path, allow_pickle=True)
+        index = cls(tokenizer)
+        index.vocabulary = {term: column for column, term in enumerate(data['terms'])}
+        index.doc_freq = np.concatenate([data['doc_freq'], np.zeros(1024, dtype=np.int64)])
+        index.user_ids = list(data['user_ids'])
+        index.user_rows = {user_id: position for position, user_id in enumerate(index.user_ids)}
+        
+        offsets = np.concatenate([[0], np.cumsum(data['lengths'])])
+        columns = data['columns']
+        counts = data['counts']
+        index.rows = [(columns[offsets[i]:offsets[i + 1]], counts[offsets[i]:offsets[i + 1]])
+                      for i in range(len(index.user_ids))]
+        return index
+    
+    def __len__(self):
+        return len(self.user_ids)
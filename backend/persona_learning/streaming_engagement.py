@@ -0,0 +1,224 @@
+"""
+Streaming engagement accumulator for analyzing long tweet histories in bounded memory.
+"""
+from datetime import datetime, timezone
+
+class RunningStats:
+    """Online count, mean, variance and maximum using Welford's algorithm."""
+    
+    def __init__(self):
+        """Initialize running statistics."""
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max = None
+    
+    def add(self, value):
+        """Add a single value."""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.max is None or value > self.max:
+            self.max = value
+    
+    def merge(self, other):
+        """Merge statistics from another partition (Chan et al. parallel update)."""
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.total, self.mean, self.m2, self.max = (
+                other.count, other.total, other.mean, other.m2, other.max
+            )
+            return self
+        
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+    
+    @property
+    def variance(self):
+        """Population variance of the values seen so far."""
+        return self.m2 / self.count if self.count else 0.0
+    
+    @property
+    def stddev(self):
+        """Population standard deviation of the values seen so far."""
+        return self.variance ** 0.5
+
+class EngagementAccumulator:
+    """Constant-memory accumulator of engagement statistics.
+    
+    Consumes tweets one at a time from any iterable (a list, generator or
+    MongoDB cursor) and keeps only fixed-size counters, so accumulators
+    built over separate partitions can be merged.
+    """
+    
+    def __init__(self, sketch=None):
+        """Initialize engagement accumulator, optionally tracking top hashtags in a sketch.
+        
+        `sketch` is an empty heavy-hitter sketch with update, merge and
+        most_common, such as data_collection's SpaceSaving.
+        """
+        self.tweet_count = 0
+        
+        # Posting patterns: mean gap of sorted timestamps is (last - first) / (n - 1)
+        self.timestamp_count = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.hour_counts = [0] * 24
+        self.day_counts = [0] * 7
+        # Earliest timestamp per bucket, to break ties the way Counter does
+        self.hour_first_seen = [None] * 24
+        self.day_first_seen = [None] * 7
+        
+        # Engagement metrics
+        self.likes = RunningStats()
+        self.retweets = RunningStats()
+        
+        # Interaction patterns
+        self.replies = 0
+        self.retweeted = 0
+        self.original = 0
+        
+        # Question handling
+        self.question_tweets = 0
+        self.question_marks = 0
+        
+        # Hashtag usage
+        self.total_hashtags = 0
+        self.hashtag_sketch = sketch
+    
+    def add(self, tweet):
+        """Add a single tweet."""
+        self.tweet_count += 1
+        
+        created_at = tweet.get('created_at')
+        if created_at is not None:
+            self._add_timestamp(created_at)
+        
+        like_count = tweet.get('favorite_count')
+        if like_count is not None:
+            self.likes.add(like_count)
+            retweet_count = tweet.get('retweet_count')
+            if retweet_count is not None:
+                self.retweets.add(retweet_count)
+        
+        is_reply = tweet.get('is_reply')
+        if is_reply:
+            self.replies += 1
+        elif is_reply is not None:
+            is_retweet = tweet.get('is_retweet')
+            if is_retweet:
+                self.retweeted += 1
+            elif is_retweet is not None:
+                self.original += 1
+        
+        text = tweet.get('full_text')
+        if text and '?' in text:
+            self.question_tweets += 1
+            self.question_marks += text.count('?')
+        
+        hashtags = tweet.get('hashtags')
+        if hashtags is not None:
+            self.total_hashtags += len(hashtags)
+            if self.hashtag_sketch is not None:
+                self.hashtag_sketch.update(hashtags)
+    
+    def _add_timestamp(self, value):
+        """Add a tweet timestamp given as an ISO string or datetime."""
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                return
+        
+        # Hours and weekdays use the wall-clock time, instants use UTC
+        instant = value.timestamp() if value.tzinfo else value.replace(tzinfo=timezone.utc).timestamp()
+        
+        self.timestamp_count += 1
+        if self.first_timestamp is None or instant < self.first_timestamp:
+            self.first_timestamp = instant
+        if self.last_timestamp is None or instant > self.last_timestamp:
+            self.last_timestamp = instant
+        
+        hour = value.hour
+        day = value.weekday()
+        self.hour_counts[hour] += 1
+        self.day_counts[day] += 1
+        if self.hour_first_seen[hour] is None or instant < self.hour_first_seen[hour]:
+            self.hour_first_seen[hour] = instant
+        if self.day_first_seen[day] is None or instant < self.day_first_seen[day]:
+            self.day_first_seen[day] = instant
+    
+    def update(self, tweets):
+        """Add every tweet from an iterable."""
+        for tweet in tweets:
+            self.add(tweet)
+        return self
+    
+    def merge(self, other):
+        """Merge another accumulator into this one."""
+        self.tweet_count += other.tweet_count
+        
+        self.timestamp_count += other.timestamp_count
+        self.first_timestamp = self._min(self.first_timestamp, other.first_timestamp)
+        self.last_timestamp = self._max(self.last_timestamp, other.last_timestamp)
+        for hour in range(24):
+            self.hour_counts[hour] += other.hour_counts[hour]
+            self.hour_first_seen[hour] = self._min(self.hour_first_seen[hour], other.hour_first_seen[hour])
+        for day in range(7):
+            self.day_counts[day] += other.day_counts[day]
+            self.day_first_seen[day] = self._min(self.day_first_seen[day], other.day_first_seen[day])
+        
+        self.likes.merge(other.likes)
+        self.retweets.merge(other.retweets)
+        
+        self.replies += other.replies
+        self.retweeted += other.retweeted
+        self.original += other.original
+        
+        self.question_tweets += other.question_tweets
+        self.question_marks += other.question_marks
+        
+        self.total_hashtags += other.total_hashtags
+        if self.hashtag_sketch is not None and other.hashtag_sketch is not None:
+            self.hashtag_sketch.merge(other.hashtag_sketch)
+        elif other.hashtag_sketch is not None:
+            self.hashtag_sketch = other.hashtag_sketch
+        return self
+    
+    @staticmethod
+    def _min(a, b):
+        """Minimum of two optional values."""
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return min(a, b)
+    
+    @staticmethod
+    def _max(a, b):
+        """Maximum of two optional values."""
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return max(a, b)
+    
+    def distribution(self, counts, first_seen):
+        """Nonzero bucket counts in first-seen order, and the peak bucket."""
+        buckets = sorted(
+            (bucket for bucket, count in enumerate(counts) if count),
+            key=lambda bucket: first_seen[bucket]
+        )
+        distribution = {bucket: counts[bucket] for bucket in buckets}
+        peak = max(distribution.items(), key=lambda item: item[1])[0] if distribution else None
+        return distribution, peak
@@ -0,0 +1,269 @@
+"""
+Vectorized engagement analysis module for long tweet histories.
+"""
+from datetime import datetime
+import numpy as np
+from .engagement_analysis import EngagementAnalyzer, ENGAGEMENT_SECTIONS
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# 1970-01-01 was a Thursday
+EPOCH_WEEKDAY = 3
+
+class VectorizedEngagementAnalyzer(EngagementAnalyzer):
+    """Engagement analyzer that computes statistics with NumPy arrays.
+    
+    Produces the same output as EngagementAnalyzer, but converts timestamps
+    once into datetime64 arrays instead of building per-tweet Python objects.
+    """
+    
+    def _parse_timestamps(self, tweets):
+        """Parse tweet timestamps into UTC epoch seconds and local wall-clock times."""
+        values = []
+        for tweet in tweets:
+            value = tweet.get('created_at')
+            if isinstance(value, str):
+                values.append(value)
+        
+        if not values:
+            return None, None
+        
+        # Split into 'YYYY-MM-DDTHH:MM:SS' and the offset suffix
+        offsets = {}
+        wall_clock = []
+        offset_seconds = []
+        for value in values:
+            suffix = value[19:]
+            if suffix not in offsets:
+                offsets[suffix] = self._parse_offset(suffix)
+            offset = offsets[suffix]
+            if offset is None:
+                continue
+            wall_clock.append(value[:19])
+            offset_seconds.append(offset)
+        
+        if not wall_clock:
+            return None, None
+        
+        try:
+            local = np.array(wall_clock, dtype='datetime64[s]')
+        except ValueError:
+            # Fall back to filtering out malformed timestamps one by one
+            valid = []
+            valid_offsets = []
+            for value, offset in zip(wall_clock, offset_seconds):
+                try:
+                    np.datetime64(value, 's')
+                except ValueError:
+                    continue
+                valid.append(value)
+                valid_offsets.append(offset)
+            if not valid:
+                return None, None
+            local = np.array(valid, dtype='datetime64[s]')
+            offset_seconds = valid_offsets
+        
+        utc = local.astype(np.int64) - np.array(offset_seconds, dtype=np.int64)
+        
+        return utc, local
+    
+    def _parse_offset(self, suffix):
+        """Parse an ISO timestamp suffix into a UTC offset in seconds, or None if invalid."""
+        try:
+            timestamp = datetime.fromisoformat('2000-01-01T00:00:00' + suffix.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        
+        offset = timestamp.utcoffset()
+        return int(offset.total_seconds()) if offset is not None else 0
+    
+    def _distribution(self, values, size):
+        """Count values in first-occurrence order, matching Counter semantics."""
+        counts = np.bincount(values, minlength=size)
+        _, first_index = np.unique(values, return_index=True)
+        ordered = values[np.sort(first_index)]
+        
+        distribution = {int(value): int(counts[value]) for value in ordered}
+        
+        # Counter.most_common keeps the first-seen key among ties
+        peak = max(distribution.items(), key=lambda item: item[1])[0] if distribution else None
+        
+        return distribution, peak
+    
+    def analyze_posting_patterns(self, tweets):
+        """Analyze posting patterns from tweets."""
+        if not tweets:
+            return None
+        
+        utc, local = self._parse_timestamps(tweets)
+        if utc is None:
+            return None
+        
+        return self._posting_patterns_from_arrays(utc, local.astype(np.int64))
+    
+    def _posting_patterns_from_arrays(self, utc, local_seconds):
+        """Summarize posting patterns from UTC and wall-clock epoch seconds."""
+        # Sort by instant, keeping wall-clock times aligned
+        order = np.argsort(utc, kind='stable')
+        utc = utc[order]
+        local_seconds = local_seconds[order]
+        
+        # Calculate posting frequency
+        if len(utc) > 1:
+            time_diffs = np.diff(utc) / 3600  # Convert to hours
+            avg_time_between_posts = float(time_diffs.mean())
+            posts_per_day = 24 / avg_time_between_posts if avg_time_between_posts > 0 else 0
+        else:
+            avg_time_between_posts = 0
+            posts_per_day = 0
+        
+        # Analyze posting times
+        hours = (local_seconds // 3600) % 24
+        weekdays = (local_seconds // 86400 + EPOCH_WEEKDAY) % 7
+        
+        hour_distribution, peak_hour = self._distribution(hours, 24)
+        day_counts, peak_day = self._distribution(weekdays, 7)
+        
+        return {
+            'posts_per_day': posts_per_day,
+            'avg_time_between_posts': avg_time_between_posts,
+            'peak_hour': peak_hour,
+            'peak_day': DAY_NAMES[peak_day] if peak_day is not None else None,
+            'hour_distribution': hour_distribution,
+            'day_distribution': {DAY_NAMES[day]: count for day, count in day_counts.items()}
+        }
+    
+    def analyze_engagement_metrics(self, tweets):
+        """Analyze engagement metrics from tweets."""
+        if not tweets:
+            return None
+        
+        likes = np.fromiter(
+            (tweet['favorite_count'] for tweet in tweets if 'favorite_count' in tweet),
+            dtype=np.int64
+        )
+        retweets = np.fromiter(
+            (tweet['retweet_count'] for tweet in tweets
+             if 'favorite_count' in tweet and 'retweet_count' in tweet),
+            dtype=np.int64
+        )
+        
+        return self._engagement_metrics_from_arrays(likes, retweets, len(tweets))
+    
+    def _engagement_metrics_from_arrays(self, likes, retweets, tweet_count):
+        """Summarize engagement metrics from like and retweet count arrays."""
+        if not likes.size or not retweets.size:
+            return None
+        
+        return {
+            'avg_likes': float(likes.mean()),
+            'avg_retweets': float(retweets.mean()),
+            'max_likes': int(likes.max()),
+            'max_retweets': int(retweets.max()),
+            'engagement_rate': int(likes.sum() + retweets.sum()) / (tweet_count * 100)
+        }
+    
+    @staticmethod
+    def is_batch(tweets):
+        """Check whether tweets are a columnar batch (such as data_collection's TweetBatch)."""
+        return hasattr(tweets, 'created_at') and hasattr(tweets, 'hashtag_ids')
+    
+    def analyze_all_engagement(self, tweets, sections=None, hashtag_frequency=True):
+        """Analyze all engagement aspects, vectorizing the timestamp and count sections."""
+        if not tweets:
+            return None
+        
+        if self.is_batch(tweets):
+            return self.analyze_batch(tweets, sections, hashtag_frequency)
+        
+        sections = ENGAGEMENT_SECTIONS if sections is None else tuple(sections)
+        vectorized = {
+            'posting_patterns': self.analyze_posting_patterns,
+            'engagement_metrics': self.analyze_engagement_metrics
+        }
+        
+        # Remaining sections still share a single pass over the tweets
+        remaining = [section for section in sections if section not in vectorized]
+        partial = super().analyze_all_engagement(tweets, remaining, hashtag_frequency) if remaining else {}
+        
+        results = {}
+        for section in ENGAGEMENT_SECTIONS:
+            if section in vectorized and section in sections:
+                results[section] = vectorized[section](tweets)
+            elif section in partial:
+                results[section] = partial[section]
+        
+        return results
+    
+    def analyze_batch(self, batch, sections=None, hashtag_frequency=True):
+        """Analyze engagement directly from the columns of a TweetBatch.
+        
+        Timestamps in a batch are UTC, so hour and weekday distributions are
+        in UTC as well, which matches tweets collected by TwitterConnector.
+        """
+        if not len(batch):
+            return None
+        
+        sections = ENGAGEMENT_SECTIONS if sections is None else tuple(sections)
+        for section in sections:
+            if section not in ENGAGEMENT_SECTIONS:
+                raise ValueError(f"Unknown engagement section: {section}")
+        
+        tweet_count = len(batch)
+        results = {}
+        
+        if 'posting_patterns' in sections:
+            created_at = batch.created_at[batch.created_at != batch.MISSING]
+            results['posting_patterns'] = (
+                self._posting_patterns_from_arrays(created_at, created_at) if created_at.size else None
+            )
+        
+        if 'engagement_metrics' in sections:
+            has_likes = batch.favorite_count != batch.MISSING
+            has_both = has_likes & (batch.retweet_count != batch.MISSING)
+            results['engagement_metrics'] = self._engagement_metrics_from_arrays(
+                batch.favorite_count[has_likes].astype(np.int64),
+                batch.retweet_count[has_both].astype(np.int64),
+                tweet_count
+            )
+        
+        if 'interaction_patterns' in sections:
+            is_reply = batch.is_reply
+            is_retweet = batch.is_retweet & ~is_reply
+            replies = int(is_reply.sum())
+            retweets = int(is_retweet.sum())
+            results['interaction_patterns'] = self._summarize_interaction_patterns(
+                replies, retweets, tweet_count - replies - retweets
+            )
+        
+        if 'question_handling' in sections:
+            results['question_handling'] = self._summarize_question_handling(
+                int(np.count_nonzero(batch.question_marks)),
+                int(batch.question_marks.sum()),
+                tweet_count
+            )
+        
+        if 'hashtag_usage' in sections:
+            results['hashtag_usage'] = self._hashtag_usage_from_batch(batch, hashtag_frequency)
+        
+        return results
+    
+    def _hashtag_usage_from_batch(self, batch, include_frequency):
+        """Summarize hashtag usage from interned hashtag ids."""
+        counts = np.bincount(batch.hashtag_ids, minlength=len(batch.hashtag_vocab))
+        used = np.flatnonzero(counts)
+        
+        # Ids are assigned in first-seen order, so a stable sort keeps Counter tie-breaking
+        top = used[np.argsort(-counts[used], kind='stable')[:10]]
+        
+        usage = {
+            'total_hashtags': int(batch.hashtag_ids.size),
+            'unique_hashtags': int(used.size),
+            'avg_hashtags_per_tweet': int(batch.hashtag_ids.size) / len(batch),
+            'top_hashtags': [(batch.hashtag_vocab[term_id], int(counts[term_id])) for term_id in top]
+        }
+        
+        if include_frequency:
+            usage['hashtag_frequency'] = {batch.hashtag_vocab[term_id]: int(counts[term_id]) for term_id in used}
+        
+        return usage
@@ -0,0 +1,83 @@
+# backend/scripts/benchmark_engagement.py
+
+import sys
+import os
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from persona_learning.engagement_analysis import EngagementAnalyzer
+from persona_learning.vectorized_engagement import VectorizedEngagementAnalyzer
+
+def generate_tweets(count, seed=42):
+    """Generate a synthetic tweet history."""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    tweets = []
+    
+    for i in range(count):
+        created_at = start + timedelta(seconds=rng.randint(0, 3 * 365 * 86400))
+        tweets.append({
+            'id_str': str(i),
+            'created_at': created_at.isoformat(),
+            'full_text': f'Benchmark tweet number {i}?' if i % 4 == 0 else f'Benchmark tweet number {i}',
+            'favorite_count': rng.randint(0, 500),
+            'retweet_count': rng.randint(0, 100),
+            'hashtags': [f'tag{rng.randint(0, 50)}'] if i % 3 == 0 else [],
+            'is_retweet': i % 7 == 0,
+            'is_reply': i % 5 == 0
+        })
+    
+    return tweets
+
+def time_call(func, tweets, repeat):
+    """Return the best wall-clock time of a call over several runs."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(tweets)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def results_match(expected, actual):
+    """Compare analyzer results, allowing for floating point rounding."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        return expected.keys() == actual.keys() and all(
+            results_match(expected[key], actual[key]) for key in expected
+        )
+    if isinstance(expected, float) or isinstance(actual, float):
+        return math.isclose(expected, actual, rel_tol=1e-9)
+    return expected == actual
+
+def main():
+    """Main function to benchmark engagement analysis."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    
+    tweets = generate_tweets(count)
+    baseline = EngagementAnalyzer()
+    vectorized = VectorizedEngagementAnalyzer()
+    
+    results = {'tweets': count}
+    
+    for name in ['analyze_posting_patterns', 'analyze_engagement_metrics']:
+        baseline_time, baseline_result = time_call(getattr(baseline, name), tweets, repeat)
+        vectorized_time, vectorized_result = time_call(getattr(vectorized, name), tweets, repeat)
+        
+        results[name] = {
+            'baseline_seconds': round(baseline_time, 4),
+            'vectorized_seconds': round(vectorized_time, 4),
+            'speedup': round(baseline_time / vectorized_time, 2) if vectorized_time > 0 else None,
+            'matches': results_match(baseline_result, vectorized_result)
+        }
+    
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
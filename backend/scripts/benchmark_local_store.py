@@ -0,0 +1,52 @@
+# backend/scripts/benchmark_local_store.py
+
+import sys
+import os
+import json
+import tempfile
+import time
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_collection.local_store import LocalDatabase
+from benchmark_engagement import generate_tweets
+
+def main():
+    """Main function to benchmark the local corpus store."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    tweets = generate_tweets(count)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        db = LocalDatabase(directory)
+        
+        start = time.perf_counter()
+        db.save_tweets(tweets, 'benchmark')
+        save_seconds = time.perf_counter() - start
+        
+        # Reopen so reads start from the files on disk
+        db.disconnect()
+        db = LocalDatabase(directory)
+        
+        start = time.perf_counter()
+        batch = db.get_tweet_batch('benchmark')
+        batch_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        newest = db.get_tweets('benchmark', limit=1000)
+        newest_seconds = time.perf_counter() - start
+        
+        db.disconnect()
+    
+    results = {
+        'tweets': count,
+        'save_seconds': round(save_seconds, 4),
+        'tweet_batch_seconds': round(batch_seconds, 4),
+        'tweet_batch_size': len(batch),
+        'newest_1000_seconds': round(newest_seconds, 4),
+        'newest_1000_size': len(newest)
+    }
+    
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
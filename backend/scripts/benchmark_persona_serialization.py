@@ -0,0 +1,73 @@
+# backend/scripts/benchmark_persona_serialization.py
+
+import sys
+import os
+import json
+import time
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from persona_learning.persona_model import PersonaModel
+from persona_learning import config
+
+def build_persona():
+    """Build a persona model with realistically sized sections."""
+    persona = PersonaModel('benchmark-user')
+    
+    persona.update_knowledge_domains({
+        domain: {'score': 0.5, 'confidence': 0.7, 'keywords': keywords[:8]}
+        for domain, keywords in config.DOMAIN_KEYWORDS.items()
+    })
+    persona.update_communication_style({
+        'formality': 'informal',
+        'verbosity': 'concise',
+        'expressiveness': 'expressive',
+        'posting_patterns': {'posts_per_day': 3.2},
+        'interaction_patterns': {'interaction_style': 'conversational'},
+        'question_handling': {'question_style': 'balanced'}
+    })
+    persona.update_personality_traits({
+        trait: {'value': 'balanced', 'confidence': 0.4}
+        for trait in config.PERSONALITY_MARKERS
+    })
+    persona.update_values_and_interests({
+        'values': [{'statement': f'I believe value statement number {i} matters a lot', 'score': i / 50} for i in range(50)],
+        'interests': [{'topic': f'interest-{i}', 'mentions': i} for i in range(100)]
+    })
+    persona.update_metadata(850, 0.72)
+    
+    return persona
+
+def time_call(func, repeat):
+    """Return the mean wall-clock time of a call in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    """Main function to benchmark persona model serialization."""
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    
+    persona = build_persona()
+    json_data = persona.to_json()
+    binary_data = persona.to_bytes()
+    
+    # The binary form must round-trip to the same dictionary as JSON
+    assert PersonaModel.from_bytes(binary_data).to_dict() == PersonaModel.from_json(json_data).to_dict()
+    assert PersonaModel.from_bytes(PersonaModel.from_json(json_data).to_bytes()).to_dict() == persona.to_dict()
+    
+    results = {
+        'json_bytes': len(json_data.encode('utf-8')),
+        'binary_bytes': len(binary_data),
+        'json_encode_us': round(time_call(persona.to_json, repeat), 1),
+        'binary_encode_us': round(time_call(persona.to_bytes, repeat), 1),
+        'json_decode_us': round(time_call(lambda: PersonaModel.from_json(json_data), repeat), 1),
+        'binary_decode_us': round(time_call(lambda: PersonaModel.from_bytes(binary_data), repeat), 1),
+        'binary_decode_eager_us': round(time_call(lambda: PersonaModel.from_bytes(binary_data, lazy_sections=()), repeat), 1)
+    }
+    
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# backend/scripts/benchmark_tweet_batch.py
+
+import sys
+import os
+import json
+import time
+import tracemalloc
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_collection.tweet_batch import TweetBatch
+from persona_learning.engagement_analysis import EngagementAnalyzer
+from persona_learning.vectorized_engagement import VectorizedEngagementAnalyzer
+from benchmark_engagement import generate_tweets
+
+def measure(build):
+    """Return the object built by a callable and the memory it retains."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+def main():
+    """Main function to benchmark the columnar tweet batch."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    
+    tweets, dict_bytes = measure(lambda: generate_tweets(count))
+    batch, batch_bytes = measure(lambda: TweetBatch.from_documents(tweets))
+    
+    start = time.perf_counter()
+    EngagementAnalyzer().analyze_all_engagement(tweets)
+    dict_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    VectorizedEngagementAnalyzer().analyze_batch(batch)
+    batch_seconds = time.perf_counter() - start
+    
+    results = {
+        'tweets': count,
+        'dict_bytes_per_tweet': round(dict_bytes / count, 1),
+        'batch_bytes_per_tweet': round(batch_bytes / count, 1),
+        'memory_ratio': round(dict_bytes / batch_bytes, 1) if batch_bytes else None,
+        'dict_analysis_seconds': round(dict_seconds, 4),
+        'batch_analysis_seconds': round(batch_seconds, 4)
+    }
+    
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
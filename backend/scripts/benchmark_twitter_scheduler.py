@@ -0,0 +1,101 @@
+# backend/scripts/benchmark_twitter_scheduler.py
+
+import sys
+import os
+import json
+import time
+import tweepy
+from requests.adapters import HTTPAdapter
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_collection import config
+from data_collection.twitter_connector import TwitterConnector
+from data_collection.twitter_scheduler import TwitterFetchScheduler
+from fake_twitter_api import FakeTwitterAPI
+
+class PlainHTTPAdapter(HTTPAdapter):
+    """Sends the https:// requests tweepy builds to the plain HTTP fake server."""
+    
+    def send(self, request, **kwargs):
+        request.url = 'http://' + request.url[len('https://'):]
+        return super().send(request, **kwargs)
+
+def fake_connector(server):
+    """TwitterConnector talking to a FakeTwitterAPI, recording when each user gets their first page."""
+    config.TWITTER_API_HOST = server.host
+    connector = TwitterConnector()
+    auth = tweepy.OAuth1UserHandler('key', 'secret', 'token', 'token-secret')
+    connector.api = tweepy.API(auth, host=server.host, wait_on_rate_limit=False)
+    connector.api.session.mount(f'https://{server.host}/', PlainHTTPAdapter())
+    connector.connected = True
+    
+    connector.first_page_at = {}
+    get_timeline_page = connector.get_timeline_page
+    
+    def timed_page(username, **kwargs):
+        page = get_timeline_page(username, **kwargs)
+        connector.first_page_at.setdefault(username, time.perf_counter())
+        return page
+    
+    connector.get_timeline_page = timed_page
+    return connector
+
+def summarize(name, connector, server, usernames, tweets, seconds, started):
+    """Throughput and fairness figures of one run."""
+    waits = sorted(connector.first_page_at.get(username, time.perf_counter()) - started for username in usernames)
+    return {
+        'mode': name,
+        'seconds': round(seconds, 2),
+        'tweets': tweets,
+        'api_calls': server.stats['calls'],
+        'rate_limited': server.stats['rate_limited'],
+        'tweets_per_second': round(tweets / seconds, 1) if seconds else 0,
+        'median_seconds_to_first_page': round(waits[len(waits) // 2], 2),
+        'max_seconds_to_first_page': round(waits[-1], 2)
+    }
+
+def main():
+    """Benchmark sequential and scheduled timeline collection against the fake API.
+    
+    Usage: benchmark_twitter_scheduler.py [USERS] [TWEETS_PER_USER] [CALLS_PER_WINDOW] [WINDOW_SECONDS]
+    """
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    tweets_per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+    window = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+    usernames = [f"user{i}" for i in range(users)]
+    
+    config.TWITTER_RATE_LIMITS = {'statuses/user_timeline': (limit, window)}
+    results = []
+    
+    # One user after the other, as collect_twitter_data does
+    server = FakeTwitterAPI(0, limit, window, tweets_per_user).start()
+    connector = fake_connector(server)
+    started = time.perf_counter()
+    tweets = sum(len(connector.get_user_tweets(username, count=tweets_per_user, days_back=365)) for username in usernames)
+    results.append(summarize('sequential', connector, server, usernames, tweets,
+                             time.perf_counter() - started, started))
+    server.shutdown()
+    
+    # Let the client's budget window from the first run expire
+    time.sleep(window)
+    
+    # Pages interleaved across users
+    server = FakeTwitterAPI(0, limit, window, tweets_per_user).start()
+    connector = fake_connector(server)
+    scheduler = TwitterFetchScheduler(connector)
+    for username in usernames:
+        scheduler.add_user(username, count=tweets_per_user, days_back=365)
+    started = time.perf_counter()
+    collected = scheduler.run()
+    tweets = sum(len(timeline) for timeline in collected.values())
+    results.append(summarize('scheduled', connector, server, usernames, tweets,
+                             time.perf_counter() - started, started))
+    server.shutdown()
+    
+    print(json.dumps({'users': users, 'tweets_per_user': tweets_per_user, 'limit': limit,
+                      'window': window, 'results': results}, indent=2))
+
+if __name__ == "__main__":
+    main()
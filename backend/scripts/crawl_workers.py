@@ -0,0 +1,71 @@
+# backend/scripts/crawl_workers.py
+
+import sys
+import os
+import json
+import time
+import uuid
+from multiprocessing import Process
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_collection.database import Database
+from data_collection.web_scraper import WebScraper
+from data_collection.frontier import score_url
+
+def run_worker(start_url, crawl_id, max_pages, user_id):
+    """Crawl from a shared frontier until it is exhausted or max_pages are fetched."""
+    db = Database()
+    scraper = WebScraper()
+    frontier = db.get_crawl_frontier(crawl_id, score=score_url, interval=scraper.politeness.interval)
+    if frontier is None:
+        print(json.dumps({"error": "Could not connect to MongoDB"}))
+        return
+    
+    started = time.time()
+    scraper.start_job()
+    pages = scraper.crawl_website(start_url, max_pages=max_pages, score=score_url, frontier=frontier)
+    frontier.close()
+    
+    if user_id:
+        for page in pages:
+            db.save_web_content(page, user_id)
+    
+    print(json.dumps({
+        'worker': frontier.worker_id,
+        'pages': len(pages),
+        'fetched': scraper.crawl_stats['fetched'],
+        'seconds': round(time.time() - started, 2)
+    }))
+    db.disconnect()
+
+def main():
+    """Run several crawl workers sharing one MongoDB frontier.
+    
+    Usage: crawl_workers.py START_URL [WORKERS] [MAX_PAGES_PER_WORKER] [CRAWL_ID] [USER_ID]
+    
+    Workers started later with the same CRAWL_ID, also on other machines,
+    join the same crawl.
+    """
+    if len(sys.argv) < 2:
+        print(json.dumps({"error": "Start URL is required"}))
+        sys.exit(1)
+    
+    start_url = sys.argv[1]
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    max_pages = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+    crawl_id = sys.argv[4] if len(sys.argv) > 4 else uuid.uuid4().hex
+    user_id = sys.argv[5] if len(sys.argv) > 5 else None
+    
+    print(json.dumps({'crawl_id': crawl_id, 'workers': workers}))
+    
+    processes = [Process(target=run_worker, args=(start_url, crawl_id, max_pages, user_id)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
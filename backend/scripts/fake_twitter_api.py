@@ -0,0 +1,193 @@
+# backend/scripts/fake_twitter_api.py
+
+import sys
+import json
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Twitter's v1.1 timestamp format
+TWITTER_TIME_FORMAT = '%a %b %d %H:%M:%S +0000 %Y'
+
+class RateWindow:
+    """Fixed rate limit window of one endpoint, as the Twitter API enforces it."""
+    
+    def __init__(self, limit, window):
+        """Initialize window of `limit` calls per `window` seconds."""
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = int(time.time() + window)
+        self.lock = threading.Lock()
+    
+    def take(self):
+        """Count a call, returning (allowed, remaining, reset epoch second)."""
+        with self.lock:
+            if time.time() >= self.reset_at:
+                self.remaining = self.limit
+                self.reset_at = int(time.time() + self.window)
+            if self.remaining <= 0:
+                return False, 0, self.reset_at
+            self.remaining -= 1
+            return True, self.remaining, self.reset_at
+
+class FakeTwitterAPI(ThreadingHTTPServer):
+    """Local stand-in for the Twitter v1.1 endpoints TwitterConnector uses.
+    
+    Every user has `tweets_per_user` synthetic tweets spread over the last
+    year. Each endpoint has its own rate limit window reported in
+    x-rate-limit-* headers, answering 429 once it is used up.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, port=0, limit=900, window=15 * 60, tweets_per_user=1000, latency=0.0):
+        """Initialize server on 127.0.0.1:port (0 picks a free port)."""
+        super().__init__(('127.0.0.1', port), FakeTwitterHandler)
+        self.limit = limit
+        self.window = window
+        self.tweets_per_user = tweets_per_user
+        self.latency = latency
+        self.windows = {}
+        self.windows_lock = threading.Lock()
+        self.stats = {'calls': 0, 'rate_limited': 0}
+    
+    @property
+    def host(self):
+        """host:port the server listens on."""
+        return f"127.0.0.1:{self.server_address[1]}"
+    
+    def rate_window(self, endpoint):
+        """Get the rate limit window of an endpoint."""
+        with self.windows_lock:
+            if endpoint not in self.windows:
+                self.windows[endpoint] = RateWindow(self.limit, self.window)
+            return self.windows[endpoint]
+    
+    def start(self):
+        """Serve in a background thread and return self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+def fake_user(screen_name, tweets_per_user):
+    """User object of a synthetic account."""
+    user_id = zlib.crc32(screen_name.encode('utf-8')) % 10 ** 9
+    return {
+        'id': user_id,
+        'id_str': str(user_id),
+        'screen_name': screen_name,
+        'name': screen_name.title(),
+        'description': f"Synthetic account {screen_name}",
+        'location': '',
+        'url': None,
+        'followers_count': 1000,
+        'friends_count': 100,
+        'statuses_count': tweets_per_user,
+        'profile_image_url_https': '',
+        'created_at': datetime(2015, 1, 1, tzinfo=timezone.utc).strftime(TWITTER_TIME_FORMAT)
+    }
+
+def fake_timeline(screen_name, tweets_per_user, count, max_id=None):
+    """Newest-first page of a synthetic user's timeline."""
+    user = fake_user(screen_name, tweets_per_user)
+    base_id = user['id'] * 10 ** 6
+    now = datetime.now(timezone.utc)
+    spacing = timedelta(days=365) / max(tweets_per_user, 1)
+    
+    # Tweet i (0 = newest) has id base_id + tweets_per_user - i
+    newest = tweets_per_user - 1
+    if max_id is not None:
+        newest = min(newest, max_id - base_id)
+    
+    statuses = []
+    for position in range(tweets_per_user - 1 - newest, tweets_per_user):
+        if len(statuses) >= count:
+            break
+        tweet_id = base_id + tweets_per_user - 1 - position
+        statuses.append({
+            'id': tweet_id,
+            'id_str': str(tweet_id),
+            'created_at': (now - spacing * position).strftime(TWITTER_TIME_FORMAT),
+            'full_text': f"Tweet {position} from {screen_name} about #topic{position % 7}",
+            'retweet_count': position % 11,
+            'favorite_count': position % 23,
+            'entities': {
+                'hashtags': [{'text': f"topic{position % 7}"}],
+                'urls': [],
+                'user_mentions': []
+            },
+            'in_reply_to_status_id': None,
+            'user': user
+        })
+    return statuses
+
+class FakeTwitterHandler(BaseHTTPRequestHandler):
+    """Request handler of FakeTwitterAPI."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        """Serve an API call."""
+        parsed = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        endpoint = parsed.path[len('/1.1/'):-len('.json')] if parsed.path.startswith('/1.1/') else parsed.path
+        server = self.server
+        
+        allowed, remaining, reset_at = server.rate_window(endpoint).take()
+        server.stats['calls'] += 1
+        if server.latency:
+            time.sleep(server.latency)
+        
+        if not allowed:
+            server.stats['rate_limited'] += 1
+            self._send(429, {'errors': [{'code': 88, 'message': 'Rate limit exceeded'}]}, remaining, reset_at)
+        elif endpoint == 'account/verify_credentials':
+            self._send(200, fake_user('linkfo', 0), remaining, reset_at)
+        elif endpoint == 'users/show':
+            self._send(200, fake_user(params.get('screen_name', 'user'), server.tweets_per_user), remaining, reset_at)
+        elif endpoint == 'statuses/user_timeline':
+            max_id = int(params['max_id']) if 'max_id' in params else None
+            statuses = fake_timeline(params.get('screen_name', 'user'), server.tweets_per_user,
+                                     int(params.get('count', 20)), max_id)
+            self._send(200, statuses, remaining, reset_at)
+        else:
+            self._send(404, {'errors': [{'code': 34, 'message': 'Sorry, that page does not exist'}]},
+                       remaining, reset_at)
+    
+    def _send(self, status, payload, remaining, reset_at):
+        """Send a JSON response with rate limit headers."""
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('x-rate-limit-limit', str(self.server.limit))
+        self.send_header('x-rate-limit-remaining', str(remaining))
+        self.send_header('x-rate-limit-reset', str(reset_at))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """Keep benchmark output quiet."""
+
+def main():
+    """Run the fake API until interrupted.
+    
+    Usage: fake_twitter_api.py [PORT] [CALLS_PER_WINDOW] [WINDOW_SECONDS] [TWEETS_PER_USER]
+    """
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8900
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 900
+    window = int(sys.argv[3]) if len(sys.argv) > 3 else 15 * 60
+    tweets_per_user = int(sys.argv[4]) if len(sys.argv) > 4 else 1000
+    
+    server = FakeTwitterAPI(port, limit, window, tweets_per_user)
+    print(json.dumps({'host': server.host, 'limit': limit, 'window': window}))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
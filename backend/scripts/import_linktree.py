@@ -19,6 +19,7 @@ def main():
     
     # Create scraper
     scraper = LinktreeScraper()
+    scraper.start_job()
     
     # Extract profile
     profile = scraper.extract_profile(username)
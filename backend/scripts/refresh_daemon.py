@@ -0,0 +1,51 @@
+# backend/scripts/refresh_daemon.py
+
+import sys
+import os
+import json
+import signal
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_collection.collector import DataCollector
+from data_collection.refresh_scheduler import RefreshScheduler
+from persona_learning.vectorized_engagement import VectorizedEngagementAnalyzer
+
+def main():
+    """Run the adaptive refresh daemon, or schedule a user for it.
+    
+    Usage:
+        refresh_daemon.py
+        refresh_daemon.py schedule USER_ID TWITTER_USERNAME|- [WEBSITE_URL]
+    
+    Run a single daemon per database; users scheduled from other processes
+    are picked up within config.REFRESH_RELOAD_SECONDS.
+    """
+    collector = DataCollector()
+    scheduler = RefreshScheduler(collector, analyzer=VectorizedEngagementAnalyzer())
+    
+    if len(sys.argv) > 1 and sys.argv[1] == 'schedule':
+        if len(sys.argv) < 4:
+            print(json.dumps({"error": "User ID and Twitter username (or -) are required"}))
+            sys.exit(1)
+        
+        sources = {}
+        if sys.argv[3] != '-':
+            sources['twitter_username'] = sys.argv[3]
+        if len(sys.argv) > 4:
+            sources['website_url'] = sys.argv[4]
+        
+        scheduler.load()
+        scheduler.schedule_user(sys.argv[2], sources)
+        print(json.dumps({"scheduled": sys.argv[2], "sources": sources}))
+        sys.exit(0)
+    
+    # Finish the current collection on shutdown
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: scheduler.stop())
+    
+    scheduler.run()
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()